@@ -0,0 +1,331 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from bot.config import settings, subscribe
+from bot.metrics import metrics
+from bot.snapshot import register_section
+from agent.llm import get_llm
+from agent.resilience import LLMUnavailable, guarded_invoke
+from agent.prompts import parser, batch_parser, build_parse_prompt, build_batch_parse_prompt
+
+logger = logging.getLogger(__name__)
+
+
+# (account, normalized instruction)
+_Key = Tuple[Optional[str], str]
+
+
+class _Call:
+    """
+    One distinct instruction of one account waiting for a parse result.
+    Any number of graph runs may wait on the same call (single-flight).
+    """
+
+    __slots__ = ("account", "instruction", "enqueued", "batched", "done", "result", "error", "waiters")
+
+    def __init__(self, account: Optional[str], instruction: str):
+        self.account = account
+        self.instruction = instruction
+        self.enqueued = time.perf_counter()
+        self.batched = False
+        self.done = False
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[Exception] = None
+        self.waiters = 1
+
+
+def _normalize(instruction: str) -> str:
+    return " ".join(instruction.split())
+
+
+class ParseCoalescer:
+    """
+    Merges concurrent parse requests before they reach the LLM.
+
+    - Single-flight: identical in-flight instructions share one result.
+    - Micro-batching: distinct instructions that arrive within `window_ms`
+      of each other are sent as one multi-instruction structured-output
+      call (up to `max_batch`), and the results are split back to each
+      waiting caller.
+    - Result cache: the last `cache_size` successful parses are kept
+      (LRU), so a repeated instruction skips the LLM altogether.
+
+    All three are scoped to the account: a batch prompt only ever holds
+    one account's instructions, and results are never shared across
+    accounts, so text from one user can't steer the parse of another's.
+
+    The first caller with a queued instruction becomes its account's
+    batch leader. It waits out the window (or until the batch is full),
+    takes the batch and runs it; everyone else blocks on a condition
+    variable. If a batch fails, its callers get LLMUnavailable and take
+    the rule-based fallback rather than one LLM call each.
+    """
+
+    def __init__(self, window_ms: float = 0.0, max_batch: int = 8, cache_size: int = 0):
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.cache_size = cache_size
+
+        self._cond = threading.Condition()
+        self._inflight: Dict[_Key, _Call] = {}
+        self._pending: List[_Call] = []
+        # Accounts with a leader waiting out its window.
+        self._leading: Set[Optional[str]] = set()
+        self._results: "OrderedDict[_Key, Dict[str, Any]]" = OrderedDict()
+
+    def parse(self, instruction: str, account: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return the structured order dict for `instruction` (sent for
+        `account`), or raise the parse error.
+        """
+
+        key = (account, _normalize(instruction))
+        metrics.counter("coalescer.requests").inc()
+
+        with self._cond:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                metrics.counter("coalescer.cache_hits").inc()
+                return dict(cached)
+
+            call = self._inflight.get(key)
+
+            if call is not None:
+                call.waiters += 1
+                metrics.counter("coalescer.singleflight_hits").inc()
+            else:
+                call = _Call(*key)
+                self._inflight[key] = call
+                self._pending.append(call)
+                if len(self._queued(account)) >= self.max_batch:
+                    self._cond.notify_all()
+
+            while not call.done:
+                if not call.batched and account not in self._leading:
+                    batch = self._lead(account)
+                    self._cond.release()
+                    try:
+                        self._execute(batch)
+                    finally:
+                        self._cond.acquire()
+                        self._finish(batch)
+                else:
+                    self._cond.wait()
+
+        if call.error is not None:
+            raise call.error
+
+        return dict(call.result)
+
+    # -----------------------------------------------------
+    # Batching (called with the condition held)
+    # -----------------------------------------------------
+
+    def _queued(self, account: Optional[str]) -> List[_Call]:
+        return [call for call in self._pending if call.account == account]
+
+    def _lead(self, account: Optional[str]) -> List[_Call]:
+        self._leading.add(account)
+
+        deadline = time.perf_counter() + self.window
+        while len(self._queued(account)) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            self._cond.wait(remaining)
+
+        batch = self._queued(account)[:self.max_batch]
+        taken = set(map(id, batch))
+        self._pending = [call for call in self._pending if id(call) not in taken]
+
+        for call in batch:
+            call.batched = True
+
+        # Let the owner of any leftover instruction lead the next batch.
+        self._leading.discard(account)
+        self._cond.notify_all()
+
+        return batch
+
+    def _finish(self, batch: List[_Call]):
+        for call in batch:
+            call.done = True
+            key = (call.account, call.instruction)
+            self._inflight.pop(key, None)
+            if call.error is None and call.result is not None:
+                self._remember(key, call.result)
+        self._cond.notify_all()
+
+    def _remember(self, key: _Key, result: Dict[str, Any]):
+        if self.cache_size <= 0:
+            return
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+
+    # -----------------------------------------------------
+    # Result cache
+    # -----------------------------------------------------
+
+    def cached_results(self) -> List[Tuple[_Key, Dict[str, Any]]]:
+        """
+        Cached ((account, instruction), result) pairs, least recently used first.
+        """
+
+        with self._cond:
+            return list(self._results.items())
+
+    def load_results(self, results: List[Tuple[_Key, Dict[str, Any]]]):
+        with self._cond:
+            for key, result in results:
+                self._remember(key, result)
+
+    def clear_results(self):
+        with self._cond:
+            self._results.clear()
+
+    # -----------------------------------------------------
+    # LLM calls (called without the condition held)
+    # -----------------------------------------------------
+
+    def _execute(self, batch: List[_Call]):
+        started = time.perf_counter()
+
+        for call in batch:
+            metrics.histogram("coalescer.wait_ms").observe((started - call.enqueued) * 1000)
+
+        metrics.histogram("coalescer.batch_size", bounds=(1, 2, 4, 8, 16, 32, 64)).observe(len(batch))
+
+        if len(batch) == 1:
+            self._execute_single(batch[0])
+        else:
+            self._execute_batch(batch)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.counter("coalescer.llm_calls").inc()
+
+        # Every waiter beyond the one call made is a provider call avoided.
+        saved = sum(call.waiters for call in batch) - 1
+        if saved > 0:
+            metrics.counter("coalescer.calls_saved").inc(saved)
+            metrics.counter("coalescer.saved_ms").inc(saved * elapsed_ms)
+
+    def _execute_single(self, call: _Call):
+        try:
+            response = guarded_invoke("parse", build_parse_prompt(call.instruction), settings.LLM_PARSE_TIMEOUT_MS)
+
+            if not response.content:
+                raise ValueError("Empty LLM response.")
+
+            call.result = parser.parse(response.content.strip()).model_dump()
+
+        except Exception as e:
+            call.error = e
+
+    def _execute_batch(self, batch: List[_Call]):
+        # One call per batch, whatever happens: retrying each instruction
+        # on failure would multiply the wait behind a slow or confused
+        # provider. Callers given LLMUnavailable take the rule-based parser.
+        try:
+            response = guarded_invoke(
+                "parse",
+                build_batch_parse_prompt(c.instruction for c in batch),
+                settings.LLM_PARSE_TIMEOUT_MS,
+            )
+            orders = batch_parser.parse(response.content.strip()).orders
+
+            if len(orders) != len(batch):
+                raise ValueError(f"Batch returned {len(orders)} results for {len(batch)} instructions.")
+
+        except LLMUnavailable as e:
+            for call in batch:
+                call.error = e
+            return
+
+        except Exception as e:
+            logger.warning(f"[COALESCER] Batch of {len(batch)} failed; using the rule-based parser.", exc_info=True)
+            metrics.counter("coalescer.batch_failures").inc()
+            error = LLMUnavailable(f"Batched parse failed: {e}")
+            for call in batch:
+                call.error = error
+            return
+
+        for call, order in zip(batch, orders):
+            if order is not None:
+                call.result = order.model_dump()
+            else:
+                call.error = LLMUnavailable("LLM returned no order for this instruction in its batch.")
+
+
+_coalescer: Optional[ParseCoalescer] = None
+_coalescer_lock = threading.Lock()
+
+
+def get_coalescer() -> ParseCoalescer:
+    """
+    Process-wide coalescer configured from settings.
+    """
+
+    global _coalescer
+
+    if _coalescer is None:
+        with _coalescer_lock:
+            if _coalescer is None:
+                _coalescer = ParseCoalescer(
+                    window_ms=settings.LLM_BATCH_WINDOW_MS,
+                    max_batch=settings.LLM_MAX_BATCH,
+                    cache_size=settings.LLM_PARSE_CACHE_SIZE,
+                )
+
+    return _coalescer
+
+
+def _on_settings_change(old, new, changed):
+    coalescer = _coalescer
+    if coalescer is not None:
+        coalescer.window = new.LLM_BATCH_WINDOW_MS / 1000.0
+        coalescer.max_batch = max(1, new.LLM_MAX_BATCH)
+        coalescer.cache_size = new.LLM_PARSE_CACHE_SIZE
+        # Results of another model (or a smaller cache) no longer apply.
+        if changed & {"LLM_PROVIDER", "LLM_MODEL", "LLM_PARSE_CACHE_SIZE"}:
+            coalescer.clear_results()
+
+
+subscribe(_on_settings_change)
+
+
+# =========================================================
+# =================== WARM-START SNAPSHOT =================
+# =========================================================
+# The result cache is saved with the model that produced it and only
+# restored for the same model (bot/snapshot.py). After a restore the
+# LLM client is built in the background, so the first uncached parse
+# doesn't pay for it either.
+
+def _model() -> str:
+    return f"{settings.LLM_PROVIDER}:{settings.LLM_MODEL}"
+
+
+def _dump_results() -> bytes:
+    results = _coalescer.cached_results() if _coalescer is not None else []
+    # Decimals are written as their exact text, which Order.create parses.
+    return json.dumps({"model": _model(), "results": results}, separators=(",", ":"), default=str).encode()
+
+
+def _load_results(body: bytes):
+    data = json.loads(body)
+    if data["model"] == _model():
+        # Keys are [account, instruction]. Entries of older snapshots
+        # (instruction alone) may come from mixed-account batches: dropped.
+        get_coalescer().load_results([
+            (tuple(key), result) for key, result in data["results"] if isinstance(key, list)
+        ])
+
+
+register_section("parse_cache", _dump_results, _load_results, refresh=get_llm)
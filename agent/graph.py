@@ -1,53 +1,126 @@
+from typing import Any, Dict, Iterator, Optional, Tuple
+
 from langgraph.graph import StateGraph, END
+from bot.config import pin_settings
+from bot.profiling import profile_request
+from bot.tracing import span
 from agent.state import TradingState
 from agent.nodes import (
     parse_node,
-    validation_node,
     execution_node,
     summary_node,
+    error_summary_node,
 )
 
 
+def traced_node(name: str, fn):
+    """
+    Run a node inside a span parented on the run's trace_parent, with
+    the run's settings snapshot pinned. The state carries both because
+    langgraph may run nodes on other threads than the caller's.
+    """
+
+    def node(state):
+        with pin_settings(state.get("config_version")), \
+                span(f"agent.{name}", parent=state.get("trace_parent")) as current:
+            state = fn(state)
+            error = state.get("validation_error") or state.get("risk_error")
+            if error:
+                current.set_attribute("agent.error", error)
+            return state
+
+    return node
+
+
+def _failed(state) -> bool:
+    return bool(state.get("validation_error") or state.get("risk_error"))
+
+
+def _after_parse(state):
+    return "error_summary" if _failed(state) else "execute"
+
+
+def _after_execute(state):
+    return "error_summary" if _failed(state) else "summarize"
+
+
 def build_graph():
     """
     Build and compile the LangGraph workflow.
+
+    parse ── execute ── summarize ── END
+    A step that fails (parse, the pre-trade checks in execute, the
+    submission) routes straight to error_summary → END, so the
+    remaining nodes don't run at all.
     """
 
     workflow = StateGraph(TradingState)
 
     # Add nodes
-    workflow.add_node("parse", parse_node)
-    workflow.add_node("validate", validation_node)
-    workflow.add_node("execute", execution_node)
-    workflow.add_node("summarize", summary_node)
+    workflow.add_node("parse", traced_node("parse", parse_node))
+    workflow.add_node("execute", traced_node("execute", execution_node))
+    workflow.add_node("summarize", traced_node("summarize", summary_node))
+    workflow.add_node("error_summary", traced_node("error_summary", error_summary_node))
 
     # Entry point
     workflow.set_entry_point("parse")
 
     # Flow definition
-    workflow.add_edge("parse", "validate")
-    workflow.add_edge("validate", "execute")
-    workflow.add_edge("execute", "summarize")
+    workflow.add_conditional_edges("parse", _after_parse, ["execute", "error_summary"])
+    workflow.add_conditional_edges("execute", _after_execute, ["summarize", "error_summary"])
     workflow.add_edge("summarize", END)
+    workflow.add_edge("error_summary", END)
 
     return workflow.compile()
 
 
-def run_agent(user_input: str):
-    """
-    Execute the trading agent workflow.
-    """
-
-    graph = build_graph()
-
-    initial_state = {
+def _initial_state(user_input: str, account: Optional[str], current, config) -> Dict[str, Any]:
+    return {
         "raw_input": user_input,
+        "account": account,
         "structured_order": None,
         "validation_error": None,
+        "risk_error": None,
         "execution_result": None,
         "summary": None,
+        "trace_parent": current.traceparent,
+        "config_version": config.version,
     }
 
-    final_state = graph.invoke(initial_state)
 
-    return final_state
\ No newline at end of file
+def run_agent(user_input: str, account: Optional[str] = None, graph=None, trace_parent: Optional[str] = None):
+    """
+    Execute the trading agent workflow.
+    An account tag in the input ("@hedge ...") overrides `account`.
+    Pass a compiled `graph` to reuse it across calls.
+    The run is one span, under `trace_parent` (a traceparent string,
+    e.g. from another process) or the caller's current span, and one
+    profile when profiling is on. It uses one settings snapshot
+    throughout, even if the configuration is reloaded meanwhile.
+    """
+
+    graph = graph or build_graph()
+
+    with pin_settings() as config, span("agent.run", parent=trace_parent) as current, \
+            profile_request("agent"):
+        final_state = graph.invoke(_initial_state(user_input, account, current, config))
+
+    return final_state
+
+
+def stream_agent(
+    user_input: str, account: Optional[str] = None, graph=None, trace_parent: Optional[str] = None
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    run_agent one node at a time: yields (node name, state returned by
+    the node) as each node finishes; merging them in order gives the
+    final state. The span and settings pin stay open between steps, so
+    iterate it to the end on one thread.
+    """
+
+    graph = graph or build_graph()
+
+    with pin_settings() as config, span("agent.run", parent=trace_parent) as current, \
+            profile_request("agent"):
+        for step in graph.stream(_initial_state(user_input, account, current, config)):
+            yield from step.items()
@@ -0,0 +1,260 @@
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+from bot.config import settings, subscribe
+from agent.rules import parse_instruction, template_summary
+from agent.prompts import PARSE_MARKER, BATCH_MARKER, SUMMARY_MARKER
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# =================== TOKEN ACCOUNTING ====================
+# =========================================================
+
+def estimate_tokens(text: str) -> int:
+    """
+    Provider-independent token estimate (~4 characters per token).
+    Used whenever a provider does not report usage itself.
+    """
+
+    return math.ceil(len(text) / 4) if text else 0
+
+
+class LLMResponse:
+    """
+    Minimal response object: `.content` like a LangChain AIMessage,
+    plus the token usage charged for the call.
+    """
+
+    __slots__ = ("content", "prompt_tokens", "completion_tokens", "latency")
+
+    def __init__(self, content: str, prompt_tokens: int, completion_tokens: int, latency: float):
+        self.content = content
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.latency = latency
+
+
+# =========================================================
+# ======================= PROVIDERS =======================
+# =========================================================
+
+class LLMProvider:
+    """
+    Base class for LLM backends.
+    Subclasses implement _generate(prompt) -> (content, prompt_tokens, completion_tokens);
+    token counts may be None, in which case the shared estimator is used.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def invoke(self, prompt: str) -> LLMResponse:
+        started = time.perf_counter()
+        content, prompt_tokens, completion_tokens = self._generate(prompt)
+        latency = time.perf_counter() - started
+
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(prompt)
+        if completion_tokens is None:
+            completion_tokens = estimate_tokens(content)
+
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+        return LLMResponse(content, prompt_tokens, completion_tokens, latency)
+
+    def _generate(self, prompt: str):
+        raise NotImplementedError
+
+    def usage(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "provider": self.name,
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.prompt_tokens + self.completion_tokens,
+            }
+
+
+class GeminiProvider(LLMProvider):
+    """
+    Google Gemini via LangChain. Imported lazily so offline runs never
+    need the Google SDK or an API key.
+    """
+
+    name = "gemini"
+
+    def __init__(self, model: str, api_key: str, temperature: float = 0):
+        super().__init__()
+
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
+        self.model = model
+        self.client = ChatGoogleGenerativeAI(
+            model=model,
+            google_api_key=api_key,
+            temperature=temperature,
+        )
+
+    def _generate(self, prompt: str):
+        response = self.client.invoke(prompt)
+
+        usage = getattr(response, "usage_metadata", None) or {}
+        return (
+            response.content,
+            usage.get("input_tokens"),
+            usage.get("output_tokens"),
+        )
+
+
+class LocalProvider(LLMProvider):
+    """
+    Deterministic offline provider.
+
+    Returns a recorded response when one exists for the instruction (or
+    the SHA-256 of the full prompt), otherwise answers parse prompts with
+    the rule-based parser and summary prompts with a template. An optional
+    fixed latency emulates provider round-trips for load tests.
+    """
+
+    name = "local"
+
+    def __init__(self, responses: Optional[Dict[str, str]] = None, latency_ms: float = 0.0):
+        super().__init__()
+        self.responses = responses or {}
+        self.latency = latency_ms / 1000.0
+
+    @classmethod
+    def from_file(cls, path: Optional[str], latency_ms: float = 0.0) -> "LocalProvider":
+        """
+        Load recorded responses from a JSON object {key: response}.
+        """
+
+        responses = {}
+        if path:
+            with open(path, "r") as f:
+                responses = json.load(f)
+            logger.info(f"[LLM] Loaded {len(responses)} recorded responses from {path}")
+
+        return cls(responses=responses, latency_ms=latency_ms)
+
+    @staticmethod
+    def prompt_key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def _generate(self, prompt: str):
+        if self.latency:
+            time.sleep(self.latency)
+
+        instruction = None
+        if PARSE_MARKER in prompt:
+            instruction = prompt.rsplit(PARSE_MARKER, 1)[1].strip()
+
+        recorded = self.responses.get(instruction) if instruction else None
+        if recorded is None:
+            recorded = self.responses.get(self.prompt_key(prompt))
+        if recorded is not None:
+            return recorded, None, None
+
+        if instruction is not None:
+            try:
+                return json.dumps(parse_instruction(instruction)), None, None
+            except ValueError as e:
+                # Mirrors the LLM's behaviour: output that fails schema parsing.
+                return json.dumps({"error": str(e)}), None, None
+
+        if BATCH_MARKER in prompt:
+            numbered = prompt.rsplit(BATCH_MARKER, 1)[1].strip().splitlines()
+            return json.dumps({"orders": [self._parse_or_none(line) for line in numbered]}), None, None
+
+        if SUMMARY_MARKER in prompt:
+            data = prompt.rsplit(SUMMARY_MARKER, 1)[1].strip()
+            try:
+                result = json.loads(data)
+            except ValueError:
+                result = None
+            return template_summary(result) if result else data, None, None
+
+        return "", None, None
+
+    def _parse_or_none(self, numbered_line: str):
+        instruction = numbered_line.split(".", 1)[1].strip()
+        recorded = self.responses.get(instruction)
+        if recorded is not None:
+            return json.loads(recorded)
+        try:
+            return parse_instruction(instruction)
+        except ValueError:
+            return None
+
+
+# =========================================================
+# =================== PROVIDER SELECTION ==================
+# =========================================================
+
+_provider: Optional[LLMProvider] = None
+_provider_lock = threading.Lock()
+
+
+def build_provider() -> LLMProvider:
+    """
+    Construct the provider selected by settings.LLM_PROVIDER.
+    """
+
+    if settings.LLM_PROVIDER == "local":
+        return LocalProvider.from_file(settings.LLM_REPLAY_FILE, latency_ms=settings.LLM_LATENCY_MS)
+
+    return GeminiProvider(model=settings.LLM_MODEL, api_key=settings.GOOGLE_API_KEY)
+
+
+def get_llm() -> LLMProvider:
+    """
+    Process-wide provider, created on first use.
+    """
+
+    global _provider
+
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = build_provider()
+                logger.info(f"[LLM] Using provider: {_provider.name}")
+
+    return _provider
+
+
+def set_llm(provider: Optional[LLMProvider]):
+    """
+    Replace the process-wide provider (None resets to the configured one).
+    """
+
+    global _provider
+
+    with _provider_lock:
+        _provider = provider
+
+
+_PROVIDER_SETTINGS = {"LLM_PROVIDER", "LLM_MODEL", "GOOGLE_API_KEY", "LLM_REPLAY_FILE", "LLM_LATENCY_MS"}
+
+
+def _on_settings_change(old, new, changed):
+    # Calls already running finish on the old provider.
+    if changed & _PROVIDER_SETTINGS:
+        set_llm(None)
+
+
+subscribe(_on_settings_change)
@@ -1,25 +1,25 @@
+import json
 import logging
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.output_parsers import PydanticOutputParser
 
+from bot.models import Order, OrderAction, CANCEL, CLOSE, MODIFY, as_dict
+from bot.validators import validate_order_model, validate_side, validate_symbol, ValidationError
+from bot.accounts import extract_account, get_router
+from bot.algos import get_background_engine, parent_order_for
 from bot.config import settings
-from bot.validators import validate_order, ValidationError
-from bot.orders import OrderService
-from agent.schema import TradingOrderSchema
+from bot.risk import check_action, check_order
+from bot.metrics import metrics
+from bot.tracing import span
+from agent.coalescer import get_coalescer
+from agent.prompts import build_summary_prompt
+from agent.resilience import LLMUnavailable, guarded_invoke
+from agent.rules import parse_instruction, parse_management, template_summary
 
 logger = logging.getLogger(__name__)
 
-# =========================================================
-# ================= LLM INITIALIZATION ====================
-# =========================================================
-
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    google_api_key=settings.GOOGLE_API_KEY,
-    temperature=0,
-)
-
-parser = PydanticOutputParser(pydantic_object=TradingOrderSchema)
+# Prompts and output parsers live in agent/prompts.py; the LLM comes from
+# agent.llm.get_llm(), selected by settings.LLM_PROVIDER. Every LLM call is
+# bounded by a per-node budget (agent/resilience.py); when the provider is
+# slow or the breaker is open, nodes fall back to agent/rules.py.
 
 # =========================================================
 # ====================== PARSE NODE =======================
@@ -28,144 +28,40 @@ parser = PydanticOutputParser(pydantic_object=TradingOrderSchema)
 def parse_node(state):
     logger.info("========== PARSE NODE STARTED ==========")
 
-    format_instructions = parser.get_format_instructions()
-
-    prompt = f"""
-    You are a deterministic trading instruction parser for a Binance Futures USDT-M system.
-
-    Your ONLY task:
-    Convert a user trading instruction into a structured trading order.
-
-    You are NOT allowed to:
-    - Provide explanations.
-    - Provide commentary.
-    - Add extra fields.
-    - Invent values.
-    - Guess missing required information.
-    - Modify quantities or prices.
-    - Assume leverage, margin, stop loss, or take profit.
-
-    You must strictly follow the transformation rules below.
-
-    --------------------------------------------------
-    REQUIRED OUTPUT FIELDS
-    --------------------------------------------------
-    symbol: string
-    side: BUY or SELL
-    order_type: MARKET or LIMIT
-    quantity: numeric
-    price: numeric or null
-
-    No additional fields are allowed.
-
-    --------------------------------------------------
-    SYMBOL RULES
-    --------------------------------------------------
-    - Convert BTC → BTCUSDT
-    - Convert ETH → ETHUSDT
-    - If only base asset provided → default to USDT pair
-    - Keep symbol uppercase
-    - Do NOT invent unsupported symbols
-    - If symbol cannot be determined → fail parsing
-
-    --------------------------------------------------
-    SIDE RULES
-    --------------------------------------------------
-    - "long" → BUY
-    - "buy" → BUY
-    - "short" → SELL
-    - "sell" → SELL
-    - Only BUY or SELL allowed
-    - If side not clearly stated → fail parsing
-
-    --------------------------------------------------
-    ORDER TYPE RULES
-    --------------------------------------------------
-    - If explicit price is mentioned → LIMIT
-    - If no price mentioned → MARKET
-    - Only MARKET or LIMIT allowed
-
-    --------------------------------------------------
-    QUANTITY RULES
-    --------------------------------------------------
-    - Extract the exact numeric quantity mentioned
-    - Do NOT infer or calculate quantity
-    - If quantity missing → fail parsing
-
-    --------------------------------------------------
-    PRICE RULES
-    --------------------------------------------------
-    - For MARKET orders → price must be null
-    - For LIMIT orders → extract numeric price
-    - If LIMIT but price missing → fail parsing
-
-    --------------------------------------------------
-    FAILURE RULE
-    --------------------------------------------------
-    If ANY required field (symbol, side, quantity, order_type) 
-    cannot be confidently determined:
-    Return a parsing failure according to the output schema.
-    Do NOT guess.
-
-    --------------------------------------------------
-    EXAMPLES
-    --------------------------------------------------
-
-    Example 1:
-    Input: "Buy 0.01 BTC at market"
-
-    Expected Output:
-    symbol: BTCUSDT
-    side: BUY
-    order_type: MARKET
-    quantity: 0.01
-    price: null
-
-    Example 2:
-    Input: "Short 0.5 ETH at 2800"
-
-    Expected Output:
-    symbol: ETHUSDT
-    side: SELL
-    order_type: LIMIT
-    quantity: 0.5
-    price: 2800
-
-    Example 3 (Invalid Case):
-    Input: "Buy BTC"
-
-    Reason:
-    Quantity missing → parsing must fail.
-
-    --------------------------------------------------
-
-    You MUST strictly follow the schema format below:
-
-    {format_instructions}
-
-    Now parse this instruction:
-    {state['raw_input']}
-    """.strip()
-
-
-
     try:
         logger.info(f"[PARSE] Raw Input: {state['raw_input']}")
 
-        response = llm.invoke(prompt)
-
-        if not response.content:
-            raise ValueError("Empty LLM response.")
-
-        logger.info("[PARSE] LLM response received. Parsing structured output...")
-
-        structured_response = parser.parse(response.content.strip())
-        order_dict = structured_response.model_dump()
-
-        state["structured_order"] = order_dict
+        # The account tag is routing, not order content: strip it before the
+        # LLM so the prompt (and the coalescing key) stays the same.
+        account, instruction = extract_account(state["raw_input"])
+        if account:
+            state["account"] = account
+            logger.info(f"[PARSE] Account: {account}")
+
+        # Cancel / modify instructions are recognized by rule, so the
+        # order schema the LLM fills in stays unchanged.
+        action_dict = parse_management(instruction)
+
+        if action_dict is not None:
+            order = OrderAction.create(**action_dict)
+        else:
+            # Identical in-flight instructions share one LLM call and distinct
+            # ones of the same account may be micro-batched; see agent/coalescer.py.
+            with span("llm.parse") as current:
+                try:
+                    order_dict = get_coalescer().parse(instruction, state.get("account"))
+                except LLMUnavailable as e:
+                    logger.warning(f"[PARSE] {e} Falling back to the rule-based parser.")
+                    metrics.counter("llm.parse.fallbacks").inc()
+                    current.set_attribute("llm.fallback", True)
+                    order_dict = parse_instruction(instruction)
+
+            order = Order.create(**order_dict)
+
+        state["structured_order"] = order
         state["validation_error"] = None
 
-        logger.info(f"[PARSE] Parsing successful: {order_dict}")
+        logger.info(f"[PARSE] Parsing successful: {order}")
 
     except Exception as e:
         state["validation_error"] = f"Parsing failed: {str(e)}"
@@ -177,43 +73,74 @@ def parse_node(state):
 
 
 # =========================================================
-# =================== VALIDATION NODE =====================
+# =================== PRE-TRADE CHECKS ====================
 # =========================================================
+# Validation and risk limits are independent; each reports into its own
+# state key. They run at the top of the execution node rather than as
+# graph nodes of their own (or parallel branches): each takes
+# microseconds, less than a langgraph step or a pool thread costs.
 
-def validation_node(state):
-    logger.info("========== VALIDATION NODE STARTED ==========")
+def pre_trade_checks(state):
+    order = state["structured_order"]
+    return {
+        "validation_error": _validation_error(order, state.get("account")),
+        "risk_error": _risk_error(order),
+    }
 
-    if state.get("validation_error"):
-        logger.warning("[VALIDATION] Skipped due to previous error.")
-        logger.info("========== VALIDATION NODE COMPLETED ==========")
-        return state
 
+def _validation_error(order, account):
     try:
-        order = state["structured_order"]
-        logger.info(f"[VALIDATION] Validating order: {order}")
-
-        validate_order(
-            symbol=order["symbol"],
-            side=order["side"],
-            order_type=order["order_type"],
-            quantity=order["quantity"],
-            price=order.get("price"),
-        )
+        if isinstance(order, OrderAction):
+            _validate_action(order)
+        else:
+            validate_order_model(order)
+        get_router().get(account)
 
-        state["validation_error"] = None
-        logger.info("[VALIDATION] Validation successful.")
+        logger.info(f"[VALIDATION] Valid: {order}")
+        return None
 
     except ValidationError as ve:
-        state["validation_error"] = str(ve)
         logger.warning(f"[VALIDATION] Validation failed: {ve}")
+        return str(ve)
 
     except Exception:
-        state["validation_error"] = "Validation failed."
         logger.error("[VALIDATION] Unexpected validation error.", exc_info=True)
+        return "Validation failed."
 
-    logger.info("========== VALIDATION NODE COMPLETED ==========")
 
-    return state
+def _validate_action(action: OrderAction):
+    validate_symbol(action.symbol)
+
+    if action.side is not None:
+        validate_side(action.side)
+
+    if action.action in (CANCEL, MODIFY) and not action.order_ids:
+        raise ValidationError(f"{action.action} requires an order id.")
+
+    if action.action == MODIFY:
+        for name, value in (("Quantity", action.quantity), ("Price", action.price)):
+            if value is not None and value <= 0:
+                raise ValidationError(f"{name} must be greater than 0.")
+
+    if action.action == CLOSE and action.quantity is not None and action.quantity <= 0:
+        raise ValidationError("Quantity must be greater than 0.")
+
+
+def _risk_error(order):
+    try:
+        if isinstance(order, OrderAction):
+            check_action(order)
+        else:
+            check_order(order)
+        return None
+
+    except ValidationError as ve:
+        logger.warning(f"[RISK] Rejected: {ve}")
+        return str(ve)
+
+    except Exception:
+        logger.error("[RISK] Unexpected risk check error.", exc_info=True)
+        return "Risk check failed."
 
 
 # =========================================================
@@ -223,30 +150,30 @@ def validation_node(state):
 def execution_node(state):
     logger.info("========== EXECUTION NODE STARTED ==========")
 
-    if state.get("validation_error"):
-        logger.warning("[EXECUTION] Skipped due to validation error.")
+    checks = pre_trade_checks(state)
+    if checks["validation_error"] or checks["risk_error"]:
         logger.info("========== EXECUTION NODE COMPLETED ==========")
-        return state
+        return checks
 
-    service = OrderService()
     order = state["structured_order"]
 
     try:
-        logger.info(f"[EXECUTION] Executing order: {order}")
-
-        result = service.execute_order(
-            symbol=order["symbol"],
-            side=order["side"],
-            order_type=order["order_type"],
-            quantity=order["quantity"],
-            price=order.get("price"),
-        )
+        if isinstance(order, OrderAction):
+            return _execute_action(state, order)
+
+        if order.algo is not None:
+            return _execute_algo(state, order)
+
+        account = get_router().get(state.get("account"))
+        logger.info(f"[EXECUTION] Executing order: {order} | account={account.name}")
+
+        report = account.service.submit(order)
 
-        state["execution_result"] = result
+        state["execution_result"] = report
 
         logger.info(
-            f"[EXECUTION] Success | Order ID: {result.get('orderId')} | "
-            f"Status: {result.get('status')}"
+            f"[EXECUTION] Success | Order ID: {report.order_id} | "
+            f"Status: {report.status}"
         )
 
     except Exception as e:
@@ -258,6 +185,60 @@ def execution_node(state):
     return state
 
 
+def _execute_algo(state, order: Order):
+    """
+    Hand a sliced parent order to the background algo engine.
+    The node returns as soon as the schedule is accepted.
+    """
+
+    parent = parent_order_for(order, account=state.get("account"))
+
+    get_background_engine().submit(parent)
+
+    state["execution_result"] = parent.to_dict(include_children=False)
+
+    logger.info(
+        f"[EXECUTION] {parent.algo} parent accepted | Parent ID: {parent.parent_id} | "
+        f"Children: {len(parent.children)}"
+    )
+    logger.info("========== EXECUTION NODE COMPLETED ==========")
+
+    return state
+
+
+def _execute_action(state, action: OrderAction):
+    """
+    Cancel or amend resting orders, or close a position. A modify or
+    close reports its order like a placement; cancels report counts and
+    the ids not found.
+    """
+
+    account = get_router().get(state.get("account"))
+    logger.info(f"[EXECUTION] Managing orders: {action} | account={account.name}")
+
+    reports = account.service.apply(action)
+
+    if action.action in (MODIFY, CLOSE):
+        state["execution_result"] = reports[0]
+    else:
+        cancelled = [report for report in reports if report is not None]
+        state["execution_result"] = {
+            "action": action.action,
+            "symbol": action.symbol,
+            "side": action.side,
+            "canceled": len(cancelled),
+            "orderIds": [report.order_id for report in cancelled],
+            "notFound": [
+                order_id for order_id, report in zip(action.order_ids, reports) if report is None
+            ],
+        }
+
+    logger.info(f"[EXECUTION] {action.action} done | {action.symbol} | {len(reports)} order(s)")
+    logger.info("========== EXECUTION NODE COMPLETED ==========")
+
+    return state
+
+
 # =========================================================
 # ===================== SUMMARY NODE ======================
 # =========================================================
@@ -265,13 +246,7 @@ def execution_node(state):
 def summary_node(state):
     logger.info("========== SUMMARY NODE STARTED ==========")
 
-    if state.get("validation_error"):
-        logger.warning("[SUMMARY] Generating error summary.")
-        state["summary"] = f"❌ Error: {state['validation_error']}"
-        logger.info("========== SUMMARY NODE COMPLETED ==========")
-        return state
-
-    result = state.get("execution_result")
+    result = as_dict(state.get("execution_result"))
 
     if not result:
         logger.warning("[SUMMARY] No execution result found.")
@@ -279,33 +254,46 @@ def summary_node(state):
         logger.info("========== SUMMARY NODE COMPLETED ==========")
         return state
 
-    prompt = f"""
-You are a professional trading execution analyst for a Binance Futures trading system.
-
-Generate a concise, factual explanation of the executed trade.
-
-Rules:
-- No trading advice.
-- No speculation.
-- Only use provided execution data.
-- 4–6 sentences maximum.
-
-Execution Data:
-{result}
-""".strip()
+    prompt = build_summary_prompt(json.dumps(result, indent=2, default=str))
 
     try:
         logger.info("[SUMMARY] Generating execution summary via LLM.")
 
-        response = llm.invoke(prompt)
+        with span("llm.summary"):
+            response = guarded_invoke("summary", prompt, settings.LLM_SUMMARY_TIMEOUT_MS)
 
         state["summary"] = response.content
         logger.info("[SUMMARY] Summary generation successful.")
 
+    except LLMUnavailable as e:
+        logger.warning(f"[SUMMARY] {e} Using the template summary.")
+        metrics.counter("llm.summary.fallbacks").inc()
+        state["summary"] = template_summary(result)
+
     except Exception:
         logger.error("[SUMMARY] Summary generation failed.", exc_info=True)
         state["summary"] = "Summary generation failed."
 
     logger.info("========== SUMMARY NODE COMPLETED ==========")
 
-    return state
\ No newline at end of file
+    return state
+
+# =========================================================
+# =================== ERROR SUMMARY NODE ==================
+# =========================================================
+
+def error_summary_node(state):
+    """
+    Terminal for failed runs: the graph routes here from whichever step
+    failed, skipping the rest. A risk rejection is reported through
+    validation_error like any other, so callers check one key.
+    """
+
+    error = state.get("validation_error") or state.get("risk_error")
+
+    logger.warning(f"[SUMMARY] Run failed: {error}")
+
+    state["validation_error"] = error
+    state["summary"] = f"❌ Error: {error}"
+
+    return state
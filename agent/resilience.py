@@ -0,0 +1,259 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Optional
+
+from bot.config import settings, subscribe
+from bot.metrics import metrics
+from agent.llm import LLMResponse, get_llm
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUnavailable(Exception):
+    """
+    Raised when a guarded LLM call times out, fails, or is short-circuited
+    by an open breaker. Callers fall back to the deterministic path.
+    """
+
+
+# =========================================================
+# ==================== LATENCY TRACKER ====================
+# =========================================================
+
+class LatencyTracker:
+    """
+    Rolling window of successful call latencies (seconds).
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        q-th percentile (0-100), or None until enough samples are seen.
+        """
+
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+
+        index = min(len(ordered) - 1, int(q / 100 * len(ordered)))
+        return ordered[index]
+
+
+# =========================================================
+# ==================== CIRCUIT BREAKER ====================
+# =========================================================
+
+class CircuitBreaker:
+    """
+    closed → open after `failure_threshold` consecutive failures.
+    open → half_open once `reset_timeout` seconds have passed; a single
+    probe call is let through. A successful probe closes the breaker,
+    a failed one re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_inflight = False
+
+        metrics.gauge(f"breaker.{name}.state").set(self.state)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self._transition(self.HALF_OPEN)
+
+            if self._probe_inflight:
+                return False
+
+            self._probe_inflight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probe_inflight = False
+            if self.state != self.CLOSED:
+                self._transition(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_inflight = False
+
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                self.opened_at = time.monotonic()
+                self._transition(self.OPEN)
+
+    def _transition(self, state: str):
+        logger.warning(f"[BREAKER] {self.name}: {self.state} → {state}")
+        metrics.counter(f"breaker.{self.name}.transitions.{self.state}_to_{state}").inc()
+        metrics.gauge(f"breaker.{self.name}.state").set(state)
+        self.state = state
+
+
+# =========================================================
+# ====================== GUARDED CALL =====================
+# =========================================================
+
+# Timed-out attempts cannot be cancelled; they finish in the background
+# and their results are discarded.
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm")
+
+_breaker: Optional[CircuitBreaker] = None
+_trackers: Dict[str, LatencyTracker] = {}
+_state_lock = threading.Lock()
+
+
+def get_breaker() -> CircuitBreaker:
+    """
+    One breaker per process: provider degradation affects every node.
+    """
+
+    global _breaker
+
+    with _state_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                "llm",
+                failure_threshold=settings.LLM_BREAKER_FAILURES,
+                reset_timeout=settings.LLM_BREAKER_RESET_S,
+            )
+        return _breaker
+
+
+def _on_settings_change(old, new, changed):
+    with _state_lock:
+        if _breaker is not None:
+            _breaker.failure_threshold = max(1, new.LLM_BREAKER_FAILURES)
+            _breaker.reset_timeout = new.LLM_BREAKER_RESET_S
+
+
+subscribe(_on_settings_change)
+
+
+def _tracker(node: str) -> LatencyTracker:
+    with _state_lock:
+        if node not in _trackers:
+            _trackers[node] = LatencyTracker()
+        return _trackers[node]
+
+
+def guarded_invoke(node: str, prompt: str, budget_ms: float) -> LLMResponse:
+    """
+    Invoke the LLM within a latency budget.
+
+    If the first attempt is still running after the node's observed p95
+    (settings.LLM_HEDGE_PERCENTILE), a second identical request is sent
+    and whichever answers first wins. Raises LLMUnavailable on timeout,
+    on failure of every attempt, when the provider can't be built, or
+    while the breaker is open.
+    """
+
+    # Resolved before allow(): a provider that fails to build must not
+    # claim the half-open probe slot.
+    try:
+        llm = get_llm()
+    except Exception as e:
+        metrics.counter(f"llm.{node}.errors").inc()
+        raise LLMUnavailable(f"LLM provider unavailable: {e}") from e
+
+    breaker = get_breaker()
+
+    if not breaker.allow():
+        metrics.counter(f"llm.{node}.short_circuited").inc()
+        raise LLMUnavailable("LLM circuit breaker is open.")
+
+    try:
+        return _invoke(node, llm, prompt, budget_ms, breaker)
+    except LLMUnavailable:
+        raise
+    except BaseException:
+        # Anything unexpected still settles the call, or a half-open
+        # breaker would wait on its probe forever.
+        breaker.record_failure()
+        raise
+
+
+def _invoke(node: str, llm, prompt: str, budget_ms: float, breaker: CircuitBreaker) -> LLMResponse:
+    tracker = _tracker(node)
+    budget = budget_ms / 1000.0
+
+    started = time.perf_counter()
+    deadline = started + budget
+
+    hedge_after = None
+    if settings.LLM_HEDGE_PERCENTILE > 0:
+        hedge_after = tracker.percentile(settings.LLM_HEDGE_PERCENTILE)
+
+    attempts = {_executor.submit(llm.invoke, prompt)}
+    hedged = False
+    last_error: Optional[BaseException] = None
+
+    while attempts:
+        if hedge_after is not None and not hedged:
+            timeout = min(hedge_after, deadline - time.perf_counter())
+        else:
+            timeout = deadline - time.perf_counter()
+
+        done, attempts = wait(attempts, timeout=max(0.0, timeout), return_when=FIRST_COMPLETED)
+
+        for future in done:
+            if future.exception() is None:
+                elapsed = time.perf_counter() - started
+                tracker.record(elapsed)
+                breaker.record_success()
+
+                metrics.histogram(f"llm.{node}.latency_ms").observe(elapsed * 1000)
+                if hedged:
+                    metrics.counter(f"llm.{node}.hedge_completions").inc()
+                return future.result()
+
+            last_error = future.exception()
+            metrics.counter(f"llm.{node}.errors").inc()
+
+        if time.perf_counter() >= deadline:
+            break
+
+        if not done and hedge_after is not None and not hedged:
+            hedged = True
+            metrics.counter(f"llm.{node}.hedges").inc()
+            logger.info(f"[LLM] {node}: no response after {hedge_after * 1000:.0f}ms, sending hedged request.")
+            attempts.add(_executor.submit(llm.invoke, prompt))
+
+    breaker.record_failure()
+
+    if attempts:
+        metrics.counter(f"llm.{node}.timeouts").inc()
+        raise LLMUnavailable(f"LLM {node} call exceeded its {budget_ms:.0f}ms budget.")
+
+    raise LLMUnavailable(f"LLM {node} call failed: {last_error}") from last_error
@@ -0,0 +1,260 @@
+import re
+from typing import Any, Dict, Optional
+
+# =========================================================
+# ============ DETERMINISTIC INSTRUCTION PARSER ===========
+# =========================================================
+# A small rule-based parser that follows the same rules as the LLM
+# prompt in parse_node. It backs the local LLM provider (offline runs,
+# load tests) and is good enough for the common phrasings:
+#
+#   "Buy 0.01 BTC at market"
+#   "Short 0.5 ETH at 2800"
+#   "Sell 1 BTC via TWAP over 30 minutes in 6 slices"
+#   "Cancel all my BTC buy orders"
+#   "Amend order 123456 on ETH to 0.5 at 3000"
+#   "Close my BTC position"
+
+_SIDES = {"buy": "BUY", "long": "BUY", "sell": "SELL", "short": "SELL"}
+_QUOTES = ("USDT", "USDC", "BUSD")
+_NUMBER = r"(\d+(?:\.\d+)?)"
+
+_ORDER_RE = re.compile(
+    rf"\b(buy|long|sell|short)\s+{_NUMBER}\s+([a-z0-9]+)\b",
+    re.IGNORECASE,
+)
+_PRICE_RE = re.compile(rf"(?:\bat\b|@)\s*\$?{_NUMBER}", re.IGNORECASE)
+_DURATION_RE = re.compile(rf"\bover\s+{_NUMBER}\s*(s|sec|secs|seconds?|m|min|mins|minutes?|h|hr|hrs|hours?)\b",
+                          re.IGNORECASE)
+_SLICES_RE = re.compile(r"\b(?:in\s+)?(\d+)\s+(?:slices?|clips?|child orders?)\b", re.IGNORECASE)
+_CLIP_RE = re.compile(rf"\b(?:showing|clip(?:\s+size)?(?:\s+of)?|visible)\s+{_NUMBER}", re.IGNORECASE)
+_LEVELS_RE = re.compile(r"\b(\d+)\s+levels?\b", re.IGNORECASE)
+_STEP_RE = re.compile(rf"\b(?:every|step(?:\s+of)?|spaced)\s+\$?{_NUMBER}", re.IGNORECASE)
+
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600}
+
+_MANAGE_RE = re.compile(r"^\s*(cancel|amend|modify|change|edit|move|close|flatten)\b", re.IGNORECASE)
+_AMOUNT_RE = re.compile(rf"(?<![a-z0-9.]){_NUMBER}\b", re.IGNORECASE)
+_IDS_RE = re.compile(r"\b(?:orders?|ids?)\s+((?:#?\d+(?:\s*(?:,|and|&)\s*)?)+)", re.IGNORECASE)
+_ON_SYMBOL_RE = re.compile(r"\b(?:on|for|in)\s+([a-z][a-z0-9]*)\b", re.IGNORECASE)
+_WORD_RE = re.compile(r"[a-z][a-z0-9]*", re.IGNORECASE)
+_SET_PRICE_RE = re.compile(rf"\bprice\s+(?:to\s+)?\$?{_NUMBER}", re.IGNORECASE)
+_SET_QTY_RE = re.compile(rf"\b(?:qty|quantity|size)\s+(?:to\s+)?{_NUMBER}", re.IGNORECASE)
+_TO_RE = re.compile(rf"\bto\s+\$?{_NUMBER}", re.IGNORECASE)
+# Words between the verb and "orders" that are not the asset.
+_FILLER = {
+    "all", "my", "the", "open", "resting", "pending", "working", "limit", "of", "order", "orders",
+    "every", "any", "on", "for", "in", "id", "ids", "and", "please", "out",
+    "position", "positions", "whole", "entire",
+}
+
+
+def normalize_symbol(asset: str) -> str:
+    """
+    BTC → BTCUSDT; symbols that already carry a quote asset are kept.
+    """
+
+    asset = asset.upper()
+    if asset.endswith(_QUOTES):
+        return asset
+    return f"{asset}USDT"
+
+
+def parse_instruction(text: str) -> Dict[str, Any]:
+    """
+    Parse a natural-language instruction into TradingOrderSchema fields.
+    Raises ValueError when a required field cannot be determined.
+    """
+
+    match = _ORDER_RE.search(text)
+    if not match:
+        raise ValueError("Could not determine side, quantity and symbol.")
+
+    side_word, quantity, asset = match.groups()
+
+    order: Dict[str, Any] = {
+        "symbol": normalize_symbol(asset),
+        "side": _SIDES[side_word.lower()],
+        "order_type": "MARKET",
+        # Exact text, like the LLM's string output; see TradingOrderSchema.
+        "quantity": quantity,
+        "price": None,
+        "algo": None,
+        "duration_seconds": None,
+        "slices": None,
+        "clip_size": None,
+        "grid_levels": None,
+        "grid_step": None,
+    }
+
+    rest = text[match.end():]
+    lowered = rest.lower()
+
+    price = _PRICE_RE.search(rest)
+    if price and "at market" not in lowered:
+        order["order_type"] = "LIMIT"
+        order["price"] = price.group(1)
+
+    if "twap" in lowered:
+        order["algo"] = "TWAP"
+        duration = _DURATION_RE.search(rest)
+        if duration:
+            order["duration_seconds"] = float(duration.group(1)) * _UNIT_SECONDS[duration.group(2)[0].lower()]
+        slices = _SLICES_RE.search(rest)
+        if slices:
+            order["slices"] = int(slices.group(1))
+
+    elif "iceberg" in lowered:
+        order["algo"] = "ICEBERG"
+        clip = _CLIP_RE.search(rest)
+        if clip:
+            order["clip_size"] = float(clip.group(1))
+
+    elif "grid" in lowered:
+        order["algo"] = "GRID"
+        levels = _LEVELS_RE.search(rest)
+        if levels:
+            order["grid_levels"] = int(levels.group(1))
+        step = _STEP_RE.search(rest)
+        if step:
+            order["grid_step"] = float(step.group(1))
+
+    return order
+
+
+def parse_management(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Recognize cancel / cancel-all / modify / close-position instructions
+    and return OrderAction.create() fields, or None for anything else
+    (new orders). Raises ValueError when it is one but the symbol or ids
+    are missing.
+    """
+
+    match = _MANAGE_RE.match(text)
+    if not match:
+        return None
+
+    verb = match.group(1).lower()
+    rest = text[match.end():]
+
+    if verb in ("close", "flatten"):
+        return _parse_close(rest)
+
+    ids_match = _IDS_RE.search(rest)
+    order_ids = [int(i) for i in re.findall(r"\d+", ids_match.group(1))] if ids_match else []
+
+    side = None
+    asset = None
+    on_symbol = _ON_SYMBOL_RE.search(rest)
+    if on_symbol and on_symbol.group(1).lower() not in _FILLER:
+        asset = on_symbol.group(1)
+
+    # "cancel all my BTC buy orders": the asset and side sit before "orders".
+    head = rest[:ids_match.start()] if ids_match else rest
+    for word in _WORD_RE.findall(head):
+        lowered = word.lower()
+        if lowered in _SIDES:
+            side = side or _SIDES[lowered]
+        elif lowered not in _FILLER and asset is None and not lowered.startswith("order"):
+            asset = word
+
+    if asset is None:
+        raise ValueError("Could not determine the symbol of the orders to manage.")
+
+    action: Dict[str, Any] = {
+        "action": "CANCEL",
+        "symbol": normalize_symbol(asset),
+        "order_ids": order_ids,
+        "side": side,
+        "quantity": None,
+        "price": None,
+    }
+
+    if verb == "cancel":
+        if not order_ids:
+            action["action"] = "CANCEL_ALL"
+        return action
+
+    if len(order_ids) != 1:
+        raise ValueError("Name exactly one order id to modify.")
+
+    action["action"] = "MODIFY"
+    tail = rest[ids_match.end():]
+
+    price = _SET_PRICE_RE.search(tail) or _PRICE_RE.search(tail)
+    quantity = _SET_QTY_RE.search(tail)
+    to = _TO_RE.search(tail)
+
+    # A bare "to N" is the size ("amend order 1 to 0.5 at 3000"), except
+    # for "move order 1 to 3000", and unless it was "price to N".
+    if to and not quantity and not (price and price.start() <= to.start() < price.end()):
+        if verb == "move" and not price:
+            price = to
+        else:
+            quantity = to
+
+    action["quantity"] = quantity.group(1) if quantity else None
+    action["price"] = price.group(1) if price else None
+
+    if action["quantity"] is None and action["price"] is None:
+        raise ValueError("Could not determine the new quantity or price.")
+
+    return action
+
+
+def _parse_close(rest: str) -> Dict[str, Any]:
+    # "close my BTC position", "close 0.005 of my ETH long", "flatten SOL".
+    # The position's own side decides the order side, so long/short are filler.
+    asset = next(
+        (word for word in _WORD_RE.findall(rest) if word.lower() not in _FILLER and word.lower() not in _SIDES),
+        None,
+    )
+    if asset is None:
+        raise ValueError("Could not determine the symbol of the position to close.")
+
+    amount = _AMOUNT_RE.search(rest)
+
+    return {
+        "action": "CLOSE",
+        "symbol": normalize_symbol(asset),
+        "order_ids": [],
+        "side": None,
+        "quantity": amount.group(1) if amount else None,
+        "price": None,
+    }
+
+
+# =========================================================
+# =================== TEMPLATE SUMMARY ====================
+# =========================================================
+
+def template_summary(result: Optional[Dict[str, Any]]) -> str:
+    """
+    Deterministic execution summary built only from the execution data.
+    """
+
+    if not result:
+        return "No execution result available."
+
+    if result.get("action"):
+        text = f"{result.get('action')} on {result.get('symbol')}: {result.get('canceled', 0)} order(s) cancelled"
+        if result.get("notFound"):
+            text += f", {len(result['notFound'])} not found ({', '.join(map(str, result['notFound']))})"
+        return text + "."
+
+    if result.get("parentId"):
+        return (
+            f"A {result.get('algo')} parent order {result.get('parentId')} was accepted to "
+            f"{result.get('side')} {result.get('quantity')} {result.get('symbol')} across "
+            f"{result.get('children')} child orders. Current status is {result.get('status')}."
+        )
+
+    price = result.get("price")
+    price_text = f" at a price of {price}" if price not in (None, "0", 0, "0.0") else ""
+
+    return (
+        f"A {result.get('type')} {result.get('side')} order for {result.get('origQty')} "
+        f"{result.get('symbol')} was submitted{price_text}. "
+        f"The exchange assigned order ID {result.get('orderId')} and reported status "
+        f"{result.get('status')} with {result.get('executedQty')} executed."
+    )
@@ -1,3 +1,4 @@
+from decimal import Decimal
 from pydantic import BaseModel, Field
 from typing import Optional
 
@@ -12,9 +13,35 @@ class TradingOrderSchema(BaseModel):
     order_type: str = Field(
         description="MARKET or LIMIT"
     )
-    quantity: float = Field(
-        description="Order quantity as a numeric value"
+    # Decimal (not float) so a quantity/price given as a string keeps its
+    # exact digits through to the scaled-integer Order.
+    quantity: Decimal = Field(
+        description="Order quantity as a decimal string exactly as stated, e.g. \"0.01\""
     )
-    price: Optional[float] = Field(
-        description="Limit price if order_type is LIMIT, otherwise null"
+    price: Optional[Decimal] = Field(
+        description="Limit price as a decimal string if order_type is LIMIT, otherwise null"
+    )
+    algo: Optional[str] = Field(
+        default=None,
+        description="Execution algorithm: TWAP, ICEBERG or GRID. Null for a single order"
+    )
+    duration_seconds: Optional[float] = Field(
+        default=None,
+        description="TWAP window length in seconds"
+    )
+    slices: Optional[int] = Field(
+        default=None,
+        description="Number of TWAP child orders"
+    )
+    clip_size: Optional[float] = Field(
+        default=None,
+        description="ICEBERG visible quantity per child order"
+    )
+    grid_levels: Optional[int] = Field(
+        default=None,
+        description="Number of GRID price levels"
+    )
+    grid_step: Optional[float] = Field(
+        default=None,
+        description="Price distance between GRID levels"
     )
\ No newline at end of file
@@ -1,9 +1,23 @@
-from typing import TypedDict, Optional, Dict, Any
+from typing import TypedDict, Optional, Dict, Any, Union
+
+from bot.models import Order, OrderAction, ExecutionReport
 
 
 class TradingState(TypedDict):
     raw_input: str
-    structured_order: Optional[Dict[str, Any]]
+    # Target account (bot/accounts.py); None → settings.DEFAULT_ACCOUNT
+    account: Optional[str]
+    # OrderAction for cancel / modify instructions
+    structured_order: Optional[Union[Order, OrderAction]]
     validation_error: Optional[str]
-    execution_result: Optional[Dict[str, Any]]
-    summary: Optional[str]
\ No newline at end of file
+    # Pre-trade risk rejection (bot/risk.py); copied into validation_error
+    # when the run ends in error_summary
+    risk_error: Optional[str]
+    # ExecutionReport for single orders and modifies; the parent summary
+    # dict for algo orders; a cancel summary dict for cancels
+    execution_result: Optional[Union[ExecutionReport, Dict[str, Any]]]
+    summary: Optional[str]
+    # W3C traceparent of the agent.run span; nodes open their spans under it
+    trace_parent: Optional[str]
+    # Settings snapshot version the run started with; nodes pin it
+    config_version: Optional[int]
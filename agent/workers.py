@@ -0,0 +1,491 @@
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from multiprocessing.connection import wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bot.config import settings
+from bot.logging_config import setup_logging
+from bot.metrics import metrics
+from bot.models import as_dict
+from bot.tracing import current_traceparent
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# ===================== WORKER POOL =======================
+# =========================================================
+# Agent jobs are queued to N worker processes, each with its own warm
+# compiled graph, LLM provider and account router (held to 1/N of each
+# account's rate limit), so parsing, validation and blocking I/O of
+# concurrent jobs no longer share one interpreter's GIL. Workers are spawned rather than forked: the parent
+# already runs executor and coalescer threads, which a fork would copy
+# in an arbitrary state.
+#
+# Each worker has a pipe of its own and is handed one job at a time by
+# the parent, so the parent always knows which job a worker holds. A
+# worker that dies (crash, OOM kill) is noticed through its process
+# sentinel: the job it was running is marked FAILED, one it had not
+# started yet goes back to the queue, and the worker is respawned. A
+# shared multiprocessing.Queue can't offer that: a worker killed while
+# waiting on it keeps the queue's lock and stalls every other reader.
+
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+
+_FINISHED = (DONE, FAILED)
+
+
+@dataclass
+class Job:
+    """
+    Status of one queued agent run, as seen by the submitting process.
+    """
+
+    job_id: str
+    instruction: str
+    account: Optional[str]
+    status: str = PENDING
+    submitted_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    worker: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "jobId": self.job_id,
+            "status": self.status,
+            "instruction": self.instruction,
+            "account": self.account,
+            "worker": self.worker,
+            "submittedAt": self.submitted_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def _payload(state: Dict[str, Any]) -> Dict[str, Any]:
+    # Plain, picklable/JSON-able view of the final state.
+    return {
+        "account": state.get("account"),
+        "structured_order": as_dict(state.get("structured_order")),
+        "validation_error": state.get("validation_error"),
+        "execution_result": as_dict(state.get("execution_result")),
+        "summary": state.get("summary"),
+    }
+
+
+def _worker_main(conn, initializer: Optional[Callable], initargs: Tuple, processes: int = 1, index: int = 0):
+    """
+    Worker process loop: warm up once, then run jobs until a None
+    sentinel or the pool's end of the pipe closes. The account rate
+    limits are split over the pool's `processes` workers; worker `index`
+    keeps its own snapshot file, which its replacement restores.
+    """
+
+    from agent.graph import build_graph, run_agent
+    from agent.llm import get_llm
+    from bot.accounts import get_router, set_rate_share
+    from bot.snapshot import set_snapshot_role
+
+    set_rate_share(processes)
+    set_snapshot_role(f"worker-{index}")
+    if initializer is not None:
+        initializer(*initargs)
+
+    pid = os.getpid()
+    graph = build_graph()
+    get_llm()
+    get_router()
+
+    conn.send(("ready", None, pid, time.time()))
+
+    while True:
+        try:
+            item = conn.recv()
+        except EOFError:
+            break
+        if item is None:
+            break
+
+        job_id, instruction, account, trace_parent = item
+        conn.send(("started", job_id, pid, time.time()))
+
+        try:
+            state = run_agent(instruction, account, graph=graph, trace_parent=trace_parent)
+            conn.send(("done", job_id, _payload(state), time.time()))
+        except Exception as e:
+            logger.error(f"[WORKER] Job {job_id} failed", exc_info=True)
+            conn.send(("failed", job_id, f"{type(e).__name__}: {e}", time.time()))
+
+
+class _Worker:
+    """
+    One worker process, the parent's end of its pipe and the job it holds.
+    """
+
+    def __init__(self, index: int, process, conn):
+        self.index = index
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.job_id: Optional[str] = None
+
+
+class WorkerPool:
+    """
+    Process pool for run_agent jobs with pollable job status.
+
+        pool = WorkerPool(workers=4)
+        job_id = pool.submit("Buy 0.01 BTC at market")
+        pool.status(job_id)        # {"status": "RUNNING", ...}
+        pool.result(job_id)        # blocks until DONE/FAILED
+
+    `initializer(*initargs)` runs in every worker before it warms up
+    (default: the app's logging setup). `max_queue` bounds the number of
+    queued jobs; submit() blocks when it is full. Finished jobs are kept
+    for status queries up to `keep_finished`, oldest dropped first.
+    Dead workers are replaced (see above); `restarts` counts them.
+    """
+
+    # How often the collector rechecks its worker list without traffic.
+    POLL_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        initializer: Optional[Callable] = setup_logging,
+        initargs: Tuple = (),
+        max_queue: int = 0,
+        keep_finished: int = 10000,
+    ):
+        self.workers = workers or settings.AGENT_WORKERS or os.cpu_count() or 1
+        self.keep_finished = keep_finished
+        self.max_queue = max_queue
+        self.restarts = 0
+
+        self._context = multiprocessing.get_context("spawn")
+        self._initializer = initializer
+        self._initargs = initargs
+
+        self._state: Dict[str, Job] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        # Jobs not yet handed to a worker: (job_id, instruction, account, traceparent).
+        self._queue: "deque[Tuple]" = deque()
+        self._cond = threading.Condition()
+        self._ready = 0
+        self._closed = False
+        self._stopped = False
+        self._seq = itertools.count()
+        self._prefix = uuid.uuid4().hex[:8]
+
+        self._workers: List[_Worker] = [self._spawn(i) for i in range(self.workers)]
+
+        self._collector = threading.Thread(target=self._collect, name="agent-worker-results", daemon=True)
+        self._collector.start()
+
+        logger.info(f"[WORKER] Started {self.workers} agent worker processes")
+
+    def _spawn(self, index: int) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self._initializer, self._initargs, self.workers, index),
+            name=f"agent-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(index, process, parent_conn)
+
+    # -----------------------------------------------------
+    # Submission and polling
+    # -----------------------------------------------------
+
+    def submit(self, instruction: str, account: Optional[str] = None) -> str:
+        """
+        Queue an instruction and return its job id. The job's spans join
+        the caller's current trace.
+        """
+
+        if self._closed:
+            raise RuntimeError("Worker pool is closed.")
+
+        job_id = f"{self._prefix}-{next(self._seq)}"
+        job = Job(job_id=job_id, instruction=instruction, account=account, submitted_at=time.time())
+
+        with self._cond:
+            if self.max_queue:
+                self._cond.wait_for(lambda: len(self._queue) < self.max_queue or self._closed)
+                if self._closed:
+                    raise RuntimeError("Worker pool is closed.")
+            self._state[job_id] = job
+            self._queue.append((job_id, instruction, account, current_traceparent()))
+            self._dispatch()
+
+        metrics.counter("workers.submitted").inc()
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Current job record, or None for unknown (or pruned) job ids.
+        """
+
+        with self._cond:
+            job = self._state.get(job_id)
+            return job.to_dict() if job is not None else None
+
+    def result(self, job_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Wait for a job to finish and return its record.
+        Raises KeyError for unknown ids and TimeoutError past `timeout`.
+        """
+
+        with self._cond:
+            if job_id not in self._state:
+                raise KeyError(job_id)
+            finished = self._cond.wait_for(lambda: self._state[job_id].status in _FINISHED, timeout)
+            if not finished:
+                raise TimeoutError(f"Job {job_id} still {self._state[job_id].status} after {timeout}s")
+            return self._state[job_id].to_dict()
+
+    def run(self, instruction: str, account: Optional[str] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Submit and wait: returns the same keys as run_agent()'s final state,
+        with models as dicts. A crashed job raises RuntimeError.
+        """
+
+        job = self.result(self.submit(instruction, account), timeout)
+        if job["status"] == FAILED:
+            raise RuntimeError(job["error"])
+        return dict(job["result"], raw_input=instruction)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every worker has built its graph and clients.
+        """
+
+        with self._cond:
+            return self._cond.wait_for(lambda: self._ready >= self.workers, timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._state.values():
+                counts[job.status] += 1
+
+            counts["workers"] = self.workers
+            counts["alive"] = sum(worker.process.is_alive() for worker in self._workers)
+            counts["restarts"] = self.restarts
+        return counts
+
+    # -----------------------------------------------------
+    # Result collection
+    # -----------------------------------------------------
+
+    def _dispatch(self):
+        # Caller holds self._cond. Hand queued jobs to idle, warm workers.
+        for worker in self._workers:
+            if not self._queue:
+                return
+            if worker.ready and worker.job_id is None:
+                item = self._queue.popleft()
+                try:
+                    worker.conn.send(item)
+                except OSError:
+                    # Dying worker: the collector replaces it and the job waits.
+                    self._queue.appendleft(item)
+                    continue
+                worker.job_id = item[0]
+
+    def _collect(self):
+        while not self._stopped:
+            with self._cond:
+                workers = list(self._workers)
+
+            handles = {}
+            for worker in workers:
+                if worker.conn.closed:
+                    continue  # exited while the pool was closing
+                handles[worker.conn] = worker
+                handles[worker.process.sentinel] = worker
+
+            for handle in wait(list(handles), self.POLL_INTERVAL):
+                worker = handles[handle]
+                if handle is worker.conn:
+                    try:
+                        message = worker.conn.recv()
+                    except (EOFError, OSError):
+                        self._lost(worker)
+                        continue
+                    self._receive(worker, message)
+                else:
+                    self._lost(worker)
+
+    def _receive(self, worker: _Worker, message: Tuple):
+        kind, job_id, value, at = message
+
+        with self._cond:
+            if kind == "ready":
+                worker.ready = True
+                self._ready += 1
+            else:
+                job = self._state.get(job_id)
+                if job is not None:
+                    self._apply(job, kind, value, at)
+                if kind != "started":
+                    worker.job_id = None
+
+            self._dispatch()
+            self._cond.notify_all()
+
+    def _lost(self, worker: _Worker):
+        """
+        A worker's process exited or its pipe broke: settle its job and
+        start a replacement (unless the pool is closing).
+        """
+
+        # What it sent before dying (e.g. "done" for its last job) still counts.
+        try:
+            while worker.conn.poll():
+                self._receive(worker, worker.conn.recv())
+        except (EOFError, OSError):
+            pass
+
+        worker.process.join(1.0)
+
+        with self._cond:
+            if self._workers[worker.index] is not worker:
+                return  # already replaced
+
+            code = worker.process.exitcode
+            job = self._state.get(worker.job_id) if worker.job_id else None
+            if job is not None and job.status == PENDING and not self._closed:
+                # Handed over but never started: safe to run elsewhere.
+                self._queue.appendleft((job.job_id, job.instruction, job.account, None))
+            elif job is not None and job.status == PENDING:
+                self._apply(job, "failed", "Worker pool closed before the job ran.", time.time())
+            elif job is not None and job.status == RUNNING:
+                self._apply(job, "failed", f"Worker process exited (code {code}) while running the job.", time.time())
+            worker.job_id = None
+
+            if worker.ready:
+                self._ready -= 1
+            worker.conn.close()
+
+            if not self._closed:
+                logger.error(f"[WORKER] {worker.process.name} (pid {worker.process.pid}) exited with code {code}; restarting")
+                metrics.counter("workers.restarts").inc()
+                self.restarts += 1
+                self._workers[worker.index] = self._spawn(worker.index)
+
+            self._cond.notify_all()
+
+    def _apply(self, job: Job, kind: str, value: Any, at: float):
+        if kind == "started":
+            job.status = RUNNING
+            job.worker = value
+            job.started_at = at
+            metrics.histogram("workers.queue_wait_ms").observe((at - job.submitted_at) * 1000)
+            return
+
+        job.finished_at = at
+        if kind == "done":
+            job.status = DONE
+            job.result = value
+            metrics.counter("workers.completed").inc()
+        else:
+            job.status = FAILED
+            job.error = value
+            metrics.counter("workers.failed").inc()
+
+        if job.started_at is not None:
+            metrics.histogram("workers.run_ms").observe((at - job.started_at) * 1000)
+
+        self._finished[job.job_id] = None
+        while len(self._finished) > self.keep_finished:
+            old_id, _ = self._finished.popitem(last=False)
+            self._state.pop(old_id, None)
+
+    # -----------------------------------------------------
+    # Shutdown
+    # -----------------------------------------------------
+
+    def close(self, timeout: float = 10.0):
+        """
+        Let workers finish queued jobs, then stop them.
+        """
+
+        if self._closed:
+            return
+
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            self._cond.wait_for(
+                lambda: not self._queue and all(worker.job_id is None for worker in self._workers),
+                timeout,
+            )
+            workers = list(self._workers)
+            for worker in workers:
+                try:
+                    worker.conn.send(None)
+                except OSError:
+                    pass
+
+        for worker in workers:
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                logger.warning(f"[WORKER] {worker.process.name} did not stop in time; terminating")
+                worker.process.terminate()
+
+        self._stopped = True
+        self._collector.join(timeout)
+
+        with self._cond:
+            while self._queue:
+                job = self._state.get(self._queue.popleft()[0])
+                if job is not None:
+                    self._apply(job, "failed", "Worker pool closed before the job ran.", time.time())
+            self._cond.notify_all()
+
+        logger.info("[WORKER] Worker pool stopped")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> WorkerPool:
+    """
+    Process-wide worker pool, started on first use.
+    """
+
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WorkerPool()
+
+    return _pool
@@ -0,0 +1,532 @@
+import asyncio
+import contextvars
+import json
+import logging
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from decimal import Decimal
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from agent.graph import build_graph, run_agent, stream_agent
+from agent.llm import get_llm
+from bot.accounts import get_router
+from bot.config import settings, watch_settings
+from bot.metrics import metrics
+from bot.models import Order, as_dict
+from bot.snapshot import set_snapshot_role
+from bot.tracing import SERVER, span
+from bot.validators import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# ======================= HTTP API ========================
+# =========================================================
+# A headless JSON API next to the Streamlit app, on asyncio streams
+# (HTTP/1.1 with keep-alive, no extra dependencies):
+#
+#   GET  /health        accounts and admission queue depths
+#   POST /orders        {"symbol", "side", "type", "quantity", "price"?, "account"?}
+#   POST /orders/batch  {"orders": [...]}; one result per order, in order
+#   POST /agent         {"instruction", "account"?} → the agent's final state
+#   POST /agent/stream  same, as NDJSON lines: one per node, then "done"
+#
+# One event loop parses requests; the blocking work runs where it does
+# for the CLI and UI: orders on their account's executor (the shared,
+# warm OrderService of bot/accounts.py), agent runs on a pool of
+# API_AGENT_WORKERS threads sharing one compiled graph. Each request is
+# one span (under an incoming `traceparent` header, if any) that the
+# order and agent spans nest under.
+#
+# Backpressure: orders and agent runs each pass a bounded lane
+# (API_ORDER_QUEUE, API_AGENT_QUEUE items queued or running). A full
+# lane answers 503 with Retry-After right away instead of queueing
+# behind a slow exchange or LLM.
+#
+# Status codes: 400 malformed request, 422 rejected by validation or
+# risk checks (an agent run whose instruction was rejected, too),
+# 413 body or batch too large, 503 lane full, 500 execution failure.
+
+# Request line plus headers; larger heads get a 431.
+MAX_HEADER_BYTES = 16 * 1024
+
+ORDER_FIELDS = ("symbol", "side", "type", "quantity", "price", "account")
+
+# State keys only the graph uses; left out of streamed node events.
+_INTERNAL_KEYS = ("trace_parent", "config_version")
+
+
+class HTTPError(Exception):
+    """
+    Answer the request with `status` and {"error": message}.
+    """
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    version: str
+    headers: Dict[str, str]
+    body: bytes
+    keep_alive: bool
+
+    def payload(self) -> Dict[str, Any]:
+        """
+        The body as a JSON object.
+        """
+
+        try:
+            # Decimal: a JSON 0.0015 reaches to_units() as written, never as a float.
+            data = json.loads(self.body or b"null", parse_float=Decimal)
+        except ValueError:
+            raise HTTPError(400, "Body is not valid JSON.") from None
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Body must be a JSON object.")
+        return data
+
+
+class Lane:
+    """
+    Bounded admission for one kind of work: at most settings.<setting>
+    items queued or running. Only touched from the event loop thread.
+    """
+
+    def __init__(self, name: str, setting: str):
+        self.name = name
+        self.setting = setting
+        self.pending = 0
+
+    @property
+    def limit(self) -> int:
+        return getattr(settings, self.setting)
+
+    @contextmanager
+    def admit(self, count: int = 1):
+        # A batch larger than the whole lane still gets in when it is idle.
+        if self.pending and self.pending + count > self.limit:
+            metrics.counter(f"api.{self.name}.rejected").inc()
+            raise HTTPError(503, f"Too many {self.name} requests in flight; retry shortly.", {"Retry-After": "1"})
+
+        self.pending += count
+        metrics.gauge(f"api.{self.name}.pending").set(self.pending)
+        try:
+            yield
+        finally:
+            self.pending -= count
+            metrics.gauge(f"api.{self.name}.pending").set(self.pending)
+
+
+# =========================================================
+# ======================= VALIDATION ======================
+# =========================================================
+
+def _text(fields: Dict[str, Any], name: str, required: bool = False, numeric: bool = False) -> Any:
+    value = fields.get(name)
+
+    if value is None or value == "":
+        if required:
+            raise HTTPError(400, f"Missing field: {name}.")
+        return None
+
+    # bool is an int; "quantity": true is a mistake, not 1.
+    if isinstance(value, str) or (numeric and isinstance(value, (int, Decimal)) and not isinstance(value, bool)):
+        return value
+
+    raise HTTPError(400, f"{name} must be a {'string or number' if numeric else 'string'}.")
+
+
+def parse_order(fields: Any) -> Tuple[Optional[str], Order]:
+    """
+    (account, Order) from a JSON order object. Raises HTTPError(400).
+    """
+
+    if not isinstance(fields, dict):
+        raise HTTPError(400, "An order must be a JSON object.")
+
+    unknown = sorted(set(fields) - set(ORDER_FIELDS))
+    if unknown:
+        raise HTTPError(400, f"Unknown field(s): {', '.join(unknown)}.")
+
+    try:
+        order = Order.create(
+            _text(fields, "symbol", required=True),
+            _text(fields, "side", required=True),
+            _text(fields, "type", required=True),
+            _text(fields, "quantity", required=True, numeric=True),
+            _text(fields, "price", numeric=True),
+        )
+    except ValueError as e:
+        raise HTTPError(400, str(e)) from None
+
+    return _text(fields, "account"), order
+
+
+def parse_instruction(fields: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    """
+    (instruction, account) from an /agent request body.
+    """
+
+    instruction = _text(fields, "instruction", required=True).strip()
+    if not instruction:
+        raise HTTPError(400, "Missing field: instruction.")
+    return instruction, _text(fields, "account")
+
+
+def agent_result(state: Dict[str, Any], trace_id: Optional[str]) -> Dict[str, Any]:
+    return {
+        "account": state.get("account"),
+        "structured_order": as_dict(state.get("structured_order")),
+        "validation_error": state.get("validation_error"),
+        "execution_result": as_dict(state.get("execution_result")),
+        "summary": state.get("summary"),
+        "traceId": trace_id,
+    }
+
+
+def _json(payload: Any) -> bytes:
+    # default=str: echoed Decimal inputs and algo summaries json can't encode.
+    return json.dumps(payload, default=str).encode()
+
+
+# =========================================================
+# ========================= SERVER ========================
+# =========================================================
+
+class ApiServer:
+    """
+    The HTTP API on one event loop. Port 0 binds any free port;
+    `port` holds the bound one after start().
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 graph=None, agent_workers: Optional[int] = None):
+        self.host = host or settings.API_HOST
+        self.port = settings.API_PORT if port is None else port
+        self.graph = graph or build_graph()
+        self.agent_executor = ThreadPoolExecutor(
+            max_workers=agent_workers or settings.API_AGENT_WORKERS, thread_name_prefix="api-agent"
+        )
+
+        self.orders = Lane("orders", "API_ORDER_QUEUE")
+        self.agent = Lane("agent", "API_AGENT_QUEUE")
+
+        self._routes: Dict[str, Dict[str, Callable]] = {
+            "/health": {"GET": self._health},
+            "/orders": {"POST": self._orders},
+            "/orders/batch": {"POST": self._orders_batch},
+            "/agent": {"POST": self._agent},
+            "/agent/stream": {"POST": self._agent_stream},
+        }
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._connection, self.host, self.port, limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"[API] Listening on http://{self.host}:{self.port}")
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.agent_executor.shutdown(wait=False)
+
+    # -----------------------------------------------------
+    # Connections
+    # -----------------------------------------------------
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        metrics.counter("api.connections").inc()
+
+        try:
+            while True:
+                try:
+                    # Bounds the idle wait between requests, and slow uploads.
+                    request = await asyncio.wait_for(self._read_request(reader, writer), settings.API_KEEPALIVE_S)
+                except HTTPError as e:
+                    # The rest of the stream can't be trusted: answer and close.
+                    writer.write(self._response(e.status, _json({"error": str(e)}), False, e.headers))
+                    await writer.drain()
+                    break
+
+                if request is None or not await self._dispatch(request, writer):
+                    break
+
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Optional[Request]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise HTTPError(400, "Incomplete request.") from None
+            return None  # closed between requests
+        except asyncio.LimitOverrunError:
+            raise HTTPError(431, "Request head too large.") from None
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            raise HTTPError(400, "Malformed request line.") from None
+        if version not in ("HTTP/1.1", "HTTP/1.0"):
+            raise HTTPError(505, f"Unsupported protocol: {version}")
+
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, sep, value = line.partition(":")
+                if not sep:
+                    raise HTTPError(400, "Malformed header line.")
+                headers[name.strip().lower()] = value.strip()
+
+        if "transfer-encoding" in headers:
+            raise HTTPError(501, "Chunked request bodies are not supported; send Content-Length.")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length.") from None
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length.")
+        if length > settings.API_MAX_BODY_BYTES:
+            raise HTTPError(413, f"Body larger than {settings.API_MAX_BODY_BYTES} bytes.")
+
+        if length and headers.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+
+        body = await reader.readexactly(length) if length else b""
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = "keep-alive" in connection if version == "HTTP/1.0" else "close" not in connection
+
+        return Request(method, target.partition("?")[0], version, headers, body, keep_alive)
+
+    def _head(self, status: int, keep_alive: bool, headers: Dict[str, Any]) -> bytes:
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if keep_alive:
+            lines.append("Connection: keep-alive")
+            lines.append(f"Keep-Alive: timeout={settings.API_KEEPALIVE_S:g}")
+        else:
+            lines.append("Connection: close")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    def _response(self, status: int, body: bytes, keep_alive: bool, headers: Optional[Dict[str, str]] = None) -> bytes:
+        return self._head(
+            status, keep_alive, {"Content-Type": "application/json", "Content-Length": len(body), **(headers or {})}
+        ) + body
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter) -> bool:
+        """
+        Answer one request. Returns whether the connection stays open.
+        """
+
+        started = time.perf_counter()
+
+        with span(
+            "api.request", parent=request.headers.get("traceparent"), kind=SERVER,
+            **{"http.method": request.method, "http.target": request.path},
+        ) as current:
+            headers = None
+            try:
+                methods = self._routes.get(request.path)
+                if methods is None:
+                    raise HTTPError(404, f"No such endpoint: {request.path}")
+                handler = methods.get(request.method)
+                if handler is None:
+                    raise HTTPError(405, f"{request.path} accepts {', '.join(methods)}.", {"Allow": ", ".join(methods)})
+
+                status, payload = await handler(request, writer, current)
+
+            except HTTPError as e:
+                status, payload, headers = e.status, {"error": str(e)}, e.headers
+
+            except ValidationError as e:
+                status, payload = 422, {"error": str(e), "traceId": current.trace_id}
+
+            except ConnectionError:
+                raise  # the client went away mid-response
+
+            except Exception as e:
+                logger.error(f"[API] {request.method} {request.path} failed.", exc_info=True)
+                status, payload = 500, {"error": str(e), "traceId": current.trace_id}
+
+            current.set_attribute("http.status_code", status)
+
+            # None: the handler streamed its own response.
+            if payload is not None:
+                writer.write(self._response(status, _json(payload), request.keep_alive, headers))
+                await writer.drain()
+
+        metrics.counter(f"api.status.{status}").inc()
+        metrics.histogram("api.request_ms").observe((time.perf_counter() - started) * 1000)
+
+        return request.keep_alive
+
+    async def _run(self, executor: Executor, fn: Callable, *args) -> Any:
+        # In a copy of the request's context, so spans opened by `fn`
+        # nest under api.request.
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(executor, context.run, fn, *args)
+
+    # -----------------------------------------------------
+    # Handlers: (request, writer, span) → (status, payload)
+    # -----------------------------------------------------
+
+    async def _health(self, request: Request, writer, current):
+        return 200, {
+            "status": "ok",
+            "accounts": get_router().names(),
+            "queues": {
+                lane.name: {"pending": lane.pending, "limit": lane.limit} for lane in (self.orders, self.agent)
+            },
+        }
+
+    async def _submit(self, account: Optional[str], order: Order):
+        target = get_router().get(account)
+        return await self._run(target.executor, target.service.submit, order)
+
+    async def _orders(self, request: Request, writer, current):
+        account, order = parse_order(request.payload())
+
+        with self.orders.admit():
+            report = await self._submit(account, order)
+
+        return 200, {"order": order.to_dict(), "result": report.to_dict(), "traceId": current.trace_id}
+
+    async def _orders_batch(self, request: Request, writer, current):
+        entries = request.payload().get("orders")
+        if not isinstance(entries, list) or not entries:
+            raise HTTPError(400, "orders must be a non-empty list.")
+        if len(entries) > settings.API_MAX_BATCH:
+            raise HTTPError(413, f"At most {settings.API_MAX_BATCH} orders per batch.")
+
+        # Admitted as a whole, so a batch never runs half-accepted.
+        with self.orders.admit(len(entries)):
+            results = await asyncio.gather(*(self._batch_entry(fields) for fields in entries))
+
+        return 200, {"results": results, "traceId": current.trace_id}
+
+    async def _batch_entry(self, fields: Any) -> Dict[str, Any]:
+        # One record per order, as in bulk results files (bot/bulk.py).
+        try:
+            account, order = parse_order(fields)
+        except HTTPError as e:
+            return {"status": "REJECTED", "error": str(e), "input": fields}
+
+        try:
+            report = await self._submit(account, order)
+        except ValidationError as e:
+            return {"status": "REJECTED", "order": order.to_dict(), "error": str(e)}
+        except Exception as e:
+            logger.error(f"[API] Batch order failed | {order.symbol} | {order.side}", exc_info=True)
+            return {"status": "ERROR", "order": order.to_dict(), "error": str(e)}
+
+        return {"status": "OK", "order": order.to_dict(), "result": report.to_dict()}
+
+    async def _agent(self, request: Request, writer, current):
+        instruction, account = parse_instruction(request.payload())
+
+        with self.agent.admit():
+            state = await self._run(self.agent_executor, run_agent, instruction, account, self.graph)
+
+        return (422 if state.get("validation_error") else 200), agent_result(state, current.trace_id)
+
+    async def _agent_stream(self, request: Request, writer: asyncio.StreamWriter, current):
+        instruction, account = parse_instruction(request.payload())
+        loop = asyncio.get_running_loop()
+        # At most one event per node: bounded by the graph, not the client.
+        events: asyncio.Queue = asyncio.Queue()
+
+        def pump():
+            try:
+                for step in stream_agent(instruction, account, self.graph):
+                    loop.call_soon_threadsafe(events.put_nowait, step)
+            finally:
+                loop.call_soon_threadsafe(events.put_nowait, None)
+
+        # HTTP/1.0 has no chunked encoding: stream the lines and close.
+        chunked = request.version == "HTTP/1.1"
+        request.keep_alive = request.keep_alive and chunked
+
+        def frame(data: bytes) -> bytes:
+            return b"%x\r\n%s\r\n" % (len(data), data) if chunked else data
+
+        with self.agent.admit():
+            run = asyncio.ensure_future(self._run(self.agent_executor, pump))
+
+            headers = {"Content-Type": "application/x-ndjson"}
+            if chunked:
+                headers["Transfer-Encoding"] = "chunked"
+            writer.write(self._head(200, request.keep_alive, headers))
+
+            state: Dict[str, Any] = {}
+            try:
+                while (step := await events.get()) is not None:
+                    node, update = step
+                    state.update(update)
+                    event = {
+                        "event": "node",
+                        "node": node,
+                        "state": {key: as_dict(value) for key, value in update.items() if key not in _INTERNAL_KEYS},
+                    }
+                    writer.write(frame(_json(event) + b"\n"))
+                    await writer.drain()
+
+                try:
+                    await run
+                    final = {"event": "done", **agent_result(state, current.trace_id)}
+                except Exception as e:
+                    logger.error("[API] Agent stream failed.", exc_info=True)
+                    final = {"event": "error", "error": str(e), "traceId": current.trace_id}
+
+                writer.write(frame(_json(final) + b"\n") + (b"0\r\n\r\n" if chunked else b""))
+                await writer.drain()
+
+            finally:
+                # A client that went away doesn't stop the run; its slot
+                # is held until the run is done.
+                if not run.done():
+                    await asyncio.wait([run])
+
+        return 200, None
+
+
+# =========================================================
+# ========================= ENTRY =========================
+# =========================================================
+
+def serve(host: Optional[str] = None, port: Optional[int] = None):
+    """
+    Run the API until interrupted (cli.py serve). Accounts, the LLM
+    provider and the graph are built before the first request.
+    """
+
+    watch_settings()
+    set_snapshot_role("api")
+    get_router()
+    get_llm()
+    server = ApiServer(host=host, port=port)
+
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("[API] Stopped.")
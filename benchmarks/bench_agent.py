@@ -0,0 +1,55 @@
+"""
+Benchmarks for agent/: graph compilation and a full graph run against
+the zero-latency local LLM provider, so only LangGraph, parsing,
+validation, execution and logging overhead is measured.
+"""
+
+import agent.nodes as nodes
+from agent.graph import build_graph
+from agent.llm import LocalProvider, set_llm
+from benchmarks.harness import benchmark
+from bot.accounts import AccountRouter, set_router
+from bot.mock_client import MockBinanceFuturesClient
+
+
+def _install_stubs():
+    set_llm(LocalProvider())
+
+    # execution_node routes through the account router; make its mocks
+    # instant and unthrottled.
+    set_router(AccountRouter(
+        client_factory=lambda name, credentials: lambda: MockBinanceFuturesClient(latency=0),
+        rate_limit=0,
+    ))
+
+
+def _compiled_graph():
+    _install_stubs()
+    return build_graph()
+
+
+def _initial_state():
+    return {
+        "raw_input": "Buy 0.01 BTC at market",
+        "account": None,
+        "structured_order": None,
+        "validation_error": None,
+        "risk_error": None,
+        "execution_result": None,
+        "summary": None,
+    }
+
+
+@benchmark("graph.build_graph", rounds=5)
+def bench_build_graph():
+    build_graph()
+
+
+@benchmark("graph.invoke[local llm, mock]", setup=_compiled_graph, rounds=5)
+def bench_graph_invoke(graph):
+    graph.invoke(_initial_state())
+
+
+@benchmark("nodes.parse_node[local llm]", setup=_install_stubs)
+def bench_parse_node(_):
+    nodes.parse_node(_initial_state())
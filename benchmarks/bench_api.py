@@ -0,0 +1,171 @@
+"""
+Requests per second through the HTTP API (api/server.py) on localhost,
+against the stub LLM and a zero-latency mock exchange.
+
+The server runs in this process on its own event loop thread, with the
+shared graph and account executors it uses in production. A separate
+client process (so client and server don't share a GIL) keeps
+--connections keep-alive connections busy: closed loop, each sending its
+next request as soon as the previous answer arrives. After --warmup
+seconds, requests are counted for --duration seconds per endpoint and
+connection count.
+
+Reports successful requests/s (2xx only; 503s from a full admission
+lane are counted apart), latency percentiles and status counts. The
+`health` endpoint is the HTTP layer alone; `batch` also reports orders/s.
+
+    python -m benchmarks.bench_api
+    python -m benchmarks.bench_api --endpoints orders,batch --connections 1,8,32 --duration 5
+    python -m benchmarks.bench_api --exchange-latency-ms 5 --output api.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from benchmarks.bench_load import LatencyHistogram, _fmt, _install_stubs
+from benchmarks.bench_workers import _INSTRUCTIONS
+from benchmarks.harness import machine_info
+
+ENDPOINTS = ("health", "orders", "batch", "agent")
+
+_ORDERS = [
+    {"symbol": "BTCUSDT", "side": "BUY", "type": "MARKET", "quantity": "0.01"},
+    {"symbol": "BTCUSDT", "side": "SELL", "type": "MARKET", "quantity": "0.01"},
+    {"symbol": "ETHUSDT", "side": "BUY", "type": "LIMIT", "quantity": "0.5", "price": "2800"},
+    {"symbol": "ETHUSDT", "side": "SELL", "type": "LIMIT", "quantity": "0.5", "price": "3200"},
+]
+
+
+def _request(method: str, path: str, payload: Any = None) -> bytes:
+    body = json.dumps(payload).encode() if payload is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+    return (head + f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+
+def build_requests(endpoint: str, batch_size: int) -> List[bytes]:
+    if endpoint == "health":
+        return [_request("GET", "/health")]
+    if endpoint == "orders":
+        return [_request("POST", "/orders", order) for order in _ORDERS]
+    if endpoint == "batch":
+        orders = [_ORDERS[i % len(_ORDERS)] for i in range(batch_size)]
+        return [_request("POST", "/orders/batch", {"orders": orders})]
+    return [_request("POST", "/agent", {"instruction": instruction}) for instruction in _INSTRUCTIONS]
+
+
+# =========================================================
+# ======================== CLIENT =========================
+# =========================================================
+# Runs in the client process.
+
+async def _drive(port: int, requests: List[bytes], connections: int, warmup: float, duration: float) -> Dict[str, Any]:
+    histogram = LatencyHistogram()
+    statuses: Counter = Counter()
+    measure_from = time.perf_counter() + warmup
+    deadline = measure_from + duration
+
+    async def connection(offset: int):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        i = offset
+        try:
+            while True:
+                started = time.perf_counter()
+                if started >= deadline:
+                    break
+                writer.write(requests[i % len(requests)])
+                i += 1
+
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = head.find(b"Content-Length: ")
+                length = int(head[length + 16:head.index(b"\r\n", length)])
+                await reader.readexactly(length)
+
+                finished = time.perf_counter()
+                if started >= measure_from and finished <= deadline:
+                    statuses[int(head[9:12])] += 1
+                    histogram.record(finished - started)
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(connection(n) for n in range(connections)))
+
+    return {"statuses": dict(statuses), "latency": histogram.summary()}
+
+
+def run_client(port: int, requests: List[bytes], connections: int, warmup: float, duration: float) -> Dict[str, Any]:
+    return asyncio.run(_drive(port, requests, connections, warmup, duration))
+
+
+# =========================================================
+# ======================== SERVER =========================
+# =========================================================
+
+def start_server():
+    from api.server import ApiServer
+
+    server = ApiServer(port=0)
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="api-loop", daemon=True).start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    return server
+
+
+def _print_result(result: Dict[str, Any]):
+    lat = result["latency"]
+    per_order = f"  ({result['orders_per_s']:,.0f} orders/s)" if "orders_per_s" in result else ""
+    print(
+        f"{result['endpoint']:<8} {result['connections']:>5} conn  {result['requests_per_s']:>9,.0f} req/s{per_order}  "
+        f"p50 {_fmt(lat['p50_ms'])}  p99 {_fmt(lat['p99_ms'])}  max {_fmt(lat['max_ms'])} ms  "
+        f"statuses {result['statuses']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests per second through the HTTP API on localhost")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help=f"Comma-separated, from {', '.join(ENDPOINTS)}")
+    parser.add_argument("--connections", default="1,8,32", help="Comma-separated keep-alive connection counts")
+    parser.add_argument("--duration", type=float, default=5.0, help="Measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Unmeasured seconds before each run")
+    parser.add_argument("--batch-size", type=int, default=10, help="Orders per /orders/batch request")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Stub LLM latency per call")
+    parser.add_argument("--exchange-latency-ms", type=float, default=0.0, help="Mock exchange round-trip")
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    _install_stubs(args.llm_latency_ms, args.exchange_latency_ms, parse_cache=True)
+    server = start_server()
+
+    results = []
+    # Spawned, not forked: the child must not inherit the server's threads.
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as client:
+        for endpoint in args.endpoints.split(","):
+            requests = build_requests(endpoint, args.batch_size)
+            for connections in (int(c) for c in args.connections.split(",")):
+                run = client.submit(run_client, server.port, requests, connections, args.warmup, args.duration).result()
+                ok = sum(count for status, count in run["statuses"].items() if 200 <= status < 300)
+                result = {
+                    "endpoint": endpoint,
+                    "connections": connections,
+                    "requests_per_s": ok / args.duration,
+                    **run,
+                }
+                if endpoint == "batch":
+                    result["orders_per_s"] = ok * args.batch_size / args.duration
+                results.append(result)
+                _print_result(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"machine": machine_info(), "config": vars(args), "results": results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+Benchmarks for the order path in bot/: validation, execution against a
+zero-latency mock, cached positions, order model construction, fixed-point parse/format
+against Decimal, dashboard aggregates, tracing spans, logging and log
+tail reading.
+"""
+
+import logging
+import os
+import tempfile
+from decimal import Decimal
+
+import numpy as np
+
+from benchmarks.harness import benchmark
+from bot.analytics import OrderAggregates
+from bot.batch_validators import validate_orders_batch
+from bot.logging_config import read_log_tail
+from bot.fixedpoint import format_units, to_units
+from bot.mock_client import MockBinanceFuturesClient
+from bot.models import ExecutionReport, Order
+from bot.orders import OrderService
+from bot.tracing import span
+from bot.validators import validate_order, ValidationError
+
+
+# =========================================================
+# ====================== VALIDATION =======================
+# =========================================================
+
+@benchmark("validators.validate_order[market]")
+def bench_validate_market():
+    validate_order("BTCUSDT", "BUY", "MARKET", 0.01)
+
+
+@benchmark("validators.validate_order[limit]")
+def bench_validate_limit():
+    validate_order("ETHUSDT", "SELL", "LIMIT", 0.5, 2800.0)
+
+
+@benchmark("validators.validate_order[invalid]")
+def bench_validate_invalid():
+    try:
+        validate_order("BTCUSDT", "BUY", "LIMIT", 0.01, None)
+    except ValidationError:
+        pass
+
+
+def _batch_columns(n: int = 10_000):
+    rng = np.random.default_rng(0)
+    return (
+        np.array(["BTCUSDT", "ETHUSDT"] * (n // 2), dtype=object),
+        np.array(["BUY", "SELL"] * (n // 2), dtype=object),
+        np.array(["MARKET", "LIMIT"] * (n // 2), dtype=object),
+        rng.random(n),
+        rng.random(n) * 1000,
+    )
+
+
+@benchmark("batch_validators.validate_orders_batch[10k]", setup=_batch_columns, rounds=5)
+def bench_validate_batch(columns):
+    validate_orders_batch(*columns)
+
+
+# =========================================================
+# ======================= EXECUTION =======================
+# =========================================================
+
+def _service():
+    return OrderService(client=MockBinanceFuturesClient(latency=0))
+
+
+@benchmark("orders.execute_order[market]", setup=_service)
+def bench_execute_market(service):
+    service.execute_order("BTCUSDT", "BUY", "MARKET", 0.01)
+
+
+@benchmark("orders.execute_order[limit]", setup=_service)
+def bench_execute_limit(service):
+    service.execute_order("ETHUSDT", "SELL", "LIMIT", 0.5, 2800.0)
+
+
+def _account_state():
+    service = _service()
+    for symbol in ("BTCUSDT", "ETHUSDT", "SOLUSDT"):
+        service.execute_order(symbol, "BUY", "MARKET", 1)
+    state = service.account_state
+    state.refresh()
+    return state
+
+
+@benchmark("positions.position[cached]", setup=_account_state)
+def bench_position_cached(state):
+    state.position("BTCUSDT")
+
+
+@benchmark("positions.refresh[mock account endpoint] (baseline)", setup=_account_state)
+def bench_position_refresh(state):
+    state.refresh()
+
+
+@benchmark("models.Order.create")
+def bench_order_create():
+    Order.create("btcusdt", "buy", "limit", 0.01, 45000.0)
+
+
+def _report():
+    order = Order.create("BTCUSDT", "BUY", "LIMIT", "0.01", "45000")
+    return MockBinanceFuturesClient(latency=0).place_limit_order("BTCUSDT", "BUY", order.quantity, order.price)
+
+
+@benchmark("models.ExecutionReport.to_dict", setup=_report)
+def bench_report_to_dict(report):
+    report.to_dict()
+
+
+# =========================================================
+# ================ FIXED-POINT VS DECIMAL =================
+# =========================================================
+
+_QUANTITY_TEXTS = ["0.001", "0.015", "1.25", "12", "0.3", "250.125", "45000.5", "0.007"]
+_QUANTITY_UNITS = [to_units(text, 3) for text in _QUANTITY_TEXTS]
+_QUANTITY_DECIMALS = [Decimal(text) for text in _QUANTITY_TEXTS]
+_STEP = Decimal("0.001")
+
+
+@benchmark("fixedpoint.to_units[str x8]")
+def bench_fixed_parse():
+    for text in _QUANTITY_TEXTS:
+        to_units(text, 3)
+
+
+@benchmark("decimal.parse+check[str x8] (baseline)")
+def bench_decimal_parse():
+    # Same work as to_units: parse and reject digits beyond the precision.
+    for text in _QUANTITY_TEXTS:
+        number = Decimal(text)
+        if number.quantize(_STEP) != number:
+            raise ValueError(text)
+
+
+@benchmark("fixedpoint.format_units[x8]")
+def bench_fixed_format():
+    for units in _QUANTITY_UNITS:
+        format_units(units, 3)
+
+
+@benchmark("decimal.format[x8] (baseline)")
+def bench_decimal_format():
+    for number in _QUANTITY_DECIMALS:
+        f"{number.normalize():f}"
+
+
+@benchmark("fixedpoint.sum[x8]")
+def bench_fixed_sum():
+    sum(_QUANTITY_UNITS)
+
+
+@benchmark("decimal.sum[x8] (baseline)")
+def bench_decimal_sum():
+    sum(_QUANTITY_DECIMALS)
+
+
+# =========================================================
+# ======================== TRACING ========================
+# =========================================================
+
+@benchmark("tracing.span[nested x2]")
+def bench_span():
+    with span("orders.submit", symbol="BTCUSDT", side="BUY"):
+        with span("exchange.place_market_order"):
+            pass
+
+
+def _finished_span():
+    with span("orders.submit", symbol="BTCUSDT", side="BUY", account="default") as current:
+        pass
+    return current
+
+
+@benchmark("tracing.Span.to_otlp", setup=_finished_span)
+def bench_span_to_otlp(finished):
+    finished.to_otlp()
+
+
+# =========================================================
+# ======================== LOGGING ========================
+# =========================================================
+
+def _record():
+    formatter = logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+    record = logging.LogRecord(
+        "bot.orders", logging.INFO, __file__, 0,
+        "Executing order | BTCUSDT | BUY | MARKET | qty=0.01 | price=None", None, None,
+    )
+    return formatter, record
+
+
+@benchmark("logging.format_record", setup=_record)
+def bench_log_format(args):
+    formatter, record = args
+    formatter.format(record)
+
+
+@benchmark("logging.logger_info")
+def bench_logger_info():
+    logging.getLogger("bot.orders").info("Order executed successfully | Order ID: 1234567")
+
+
+# =========================================================
+# ======================= ANALYTICS =======================
+# =========================================================
+
+_HISTORY = 300_000
+
+
+def _history_reports():
+    symbols = ("BTCUSDT", "ETHUSDT", "BNBUSDT", "SOLUSDT")
+    return [
+        ExecutionReport(
+            order_id=i, symbol=symbols[i % 4], side="BUY" if i & 1 else "SELL", order_type="LIMIT",
+            status="FILLED" if i % 3 else "NEW", price=45000 + i % 100, orig_qty=100, executed_qty=100 if i % 3 else 0,
+        )
+        for i in range(_HISTORY)
+    ]
+
+
+def _aggregates():
+    aggregates = OrderAggregates()
+    # One day of history, 300k orders spread over every minute.
+    for i, report in enumerate(_history_reports()):
+        aggregates.record_report(report, latency_ms=5.0 + i % 50, at=1_700_000_000 + i * 86400 / _HISTORY)
+    return aggregates
+
+
+_AGG_REPORT = ExecutionReport(
+    order_id=1, symbol="BTCUSDT", side="BUY", order_type="LIMIT", status="FILLED",
+    price=450000, orig_qty=10, executed_qty=10,
+)
+
+
+@benchmark("analytics.record_report", setup=OrderAggregates)
+def bench_aggregates_record(aggregates):
+    aggregates.record_report(_AGG_REPORT, latency_ms=12.5)
+
+
+@benchmark("analytics.dashboard_read[300k orders]", setup=_aggregates, rounds=5)
+def bench_aggregates_read(aggregates):
+    aggregates.symbol_rows()
+    aggregates.totals()
+    aggregates.minute_series("notional", last=60)
+    aggregates.daily_series("volume")
+    aggregates.latency_buckets()
+
+
+@benchmark("analytics.rescan_history[300k orders] (baseline)", setup=_history_reports, rounds=3)
+def bench_rescan_history(reports):
+    totals = {}
+    for report in reports:
+        row = totals.setdefault(report.symbol, [0, 0, 0, 0])
+        row[0] += 1
+        row[1] += report.status == "FILLED"
+        row[2] += report.executed_qty
+        row[3] += report.executed_qty * report.price
+
+
+_TEMP_FILES = []
+
+
+def _log_file(size: int = 5 * 1024 * 1024):
+    line = "2024-01-01 00:00:00,000 | INFO | bot.orders | Executing order | BTCUSDT | BUY | MARKET | qty=0.01\n"
+    handle = tempfile.NamedTemporaryFile("w", suffix=".log", delete=False)
+    with handle:
+        handle.write(line * (size // len(line)))
+    _TEMP_FILES.append(handle.name)
+    return handle.name
+
+
+@benchmark("logs.read_log_tail[5MB]", setup=_log_file, rounds=5)
+def bench_log_tail(path):
+    read_log_tail(path, lines=80)
+
+
+@benchmark("logs.readlines_tail[5MB] (baseline)", setup=_log_file, rounds=5)
+def bench_log_readlines(path):
+    with open(path, "r") as f:
+        "".join(f.readlines()[-80:])
+
+
+def cleanup():
+    while _TEMP_FILES:
+        try:
+            os.remove(_TEMP_FILES.pop())
+        except OSError:
+            pass
@@ -0,0 +1,401 @@
+"""
+Open-loop load test of run_agent (or OrderService alone) at target
+arrival rates, against the local stub LLM and the mock exchange.
+
+Requests arrive on a fixed schedule (constant or Poisson) whether or not
+earlier ones have finished, the way independent users would send them,
+and are served by --concurrency threads. Latency is measured from each
+request's scheduled arrival, so time spent queued behind a slow request
+counts (no coordinated omission); service time from the moment a
+thread picks the request up is reported alongside. Per-node latencies
+come from the trace spans (agent.parse, orders.submit, exchange.*, ...).
+
+Each rate reports achieved throughput and log-linear (HdrHistogram
+layout) percentiles; the highest rate whose p99 stays within --slo-ms
+while keeping up with the schedule is reported as sustainable.
+
+    python -m benchmarks.bench_load --rates 20,50,100 --duration 10
+    python -m benchmarks.bench_load --target orders --arrival constant --rates 200,500 --output load.json
+    python -m benchmarks.bench_load --corpus instructions.txt --llm-latency-ms 300 --concurrency 32
+    python -m benchmarks.bench_load --compare old.json new.json
+"""
+
+import argparse
+import json
+import queue
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from benchmarks.bench_workers import _INSTRUCTIONS
+from benchmarks.harness import machine_info, quiet_logging
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+# =========================================================
+# ================== LATENCY HISTOGRAM ====================
+# =========================================================
+
+class LatencyHistogram:
+    """
+    Log-linear histogram over integer microseconds, in HdrHistogram's
+    layout: values below 2^bits are exact, and every power of two above
+    is split into 2^(bits-1) buckets, so a recorded value is off by at
+    most 1/2^(bits-1) (0.8% at the default 8 bits) at any magnitude.
+    Memory grows with the range of values seen, not their count.
+    """
+
+    def __init__(self, bits: int = 8):
+        self.bits = bits
+        self.half = 1 << (bits - 1)
+        self.counts: Counter = Counter()
+        self.count = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def _index(self, value: int) -> int:
+        shift = value.bit_length() - self.bits
+        if shift <= 0:
+            return value
+        return shift * self.half + (value >> shift)
+
+    def _highest(self, index: int) -> int:
+        """
+        Largest value that lands in bucket `index`.
+        """
+
+        if index < 2 * self.half:
+            return index
+        shift = index // self.half - 1
+        return ((index - shift * self.half + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        value = max(0, int(seconds * 1_000_000))
+        with self._lock:
+            self.counts[self._index(value)] += 1
+            self.count += 1
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        q-th percentile (0-100) in milliseconds, None when empty.
+        """
+
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(1, q / 100 * self.count)
+            seen = 0
+            for index in sorted(self.counts):
+                seen += self.counts[index]
+                if seen >= rank:
+                    return min(self._highest(index), self.max) / 1000
+        return self.max / 1000
+
+    def summary(self) -> Dict[str, Any]:
+        data = {"count": self.count, "max_ms": self.max / 1000 if self.count else None}
+        for q in PERCENTILES:
+            data[f"p{q:g}_ms"] = self.percentile(q)
+        return data
+
+
+class SpanLatencies:
+    """
+    Span exporter (bot/tracing.py) that records each finished span's
+    duration by name instead of writing it anywhere.
+    """
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def export(self, finished):
+        histogram = self.histograms.get(finished.name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(finished.name, LatencyHistogram())
+        histogram.record((finished.end_ns - finished.start_ns) / 1e9)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+
+# =========================================================
+# ======================= TARGETS =========================
+# =========================================================
+
+def _install_stubs(llm_latency_ms: float, exchange_latency_ms: float, parse_cache: bool):
+    from agent.coalescer import get_coalescer
+    from agent.llm import LocalProvider, set_llm
+    from bot.accounts import AccountRouter, set_router
+    from bot.mock_client import MockBinanceFuturesClient
+
+    quiet_logging()
+    set_llm(LocalProvider(latency_ms=llm_latency_ms))
+    set_router(AccountRouter(
+        client_factory=lambda name, credentials: lambda: MockBinanceFuturesClient(latency=exchange_latency_ms / 1000),
+        rate_limit=0,
+    ))
+    if not parse_cache:
+        get_coalescer().cache_size = 0
+        get_coalescer().clear_results()
+
+
+def agent_target(corpus: List[str]):
+    from agent.graph import build_graph, run_agent
+
+    graph = build_graph()
+
+    def call(i: int) -> bool:
+        state = run_agent(corpus[i % len(corpus)], graph=graph)
+        return not state.get("validation_error")
+
+    return call
+
+
+def orders_target(corpus: List[str]):
+    from agent.rules import parse_instruction
+    from bot.accounts import get_router
+    from bot.models import Order
+
+    orders = []
+    for instruction in corpus:
+        try:
+            orders.append(Order.create(**parse_instruction(instruction)))
+        except ValueError:
+            pass
+    if not orders:
+        raise SystemExit("No corpus line parses to an order.")
+
+    service = get_router().service()
+
+    def call(i: int) -> bool:
+        service.submit(orders[i % len(orders)])
+        return True
+
+    return call
+
+
+# =========================================================
+# ==================== OPEN-LOOP RUN ======================
+# =========================================================
+
+def arrivals(rate: float, duration: float, process: str, seed: int) -> List[float]:
+    """
+    Scheduled arrival offsets (seconds from start) over `duration`.
+    """
+
+    if process == "constant":
+        return [i / rate for i in range(int(rate * duration))]
+
+    rng = random.Random(seed)
+    offsets = []
+    at = rng.expovariate(rate)
+    while at < duration:
+        offsets.append(at)
+        at += rng.expovariate(rate)
+    return offsets
+
+
+def run_rate(call, rate: float, duration: float, process: str, concurrency: int, seed: int,
+             drain_timeout: float) -> Dict[str, Any]:
+    from bot.tracing import get_exporter, set_exporter
+
+    schedule = arrivals(rate, duration, process, seed)
+    pending: "queue.Queue[Optional[tuple]]" = queue.Queue()
+
+    latency = LatencyHistogram()
+    service = LatencyHistogram()
+    spans = SpanLatencies()
+    outcome = Counter()
+    outcome_lock = threading.Lock()
+    lag = LatencyHistogram()
+
+    def worker():
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            i, scheduled = item
+            picked = time.perf_counter()
+            try:
+                ok = call(i)
+            except Exception:
+                ok = False
+            done = time.perf_counter()
+            latency.record(done - scheduled)
+            service.record(done - picked)
+            with outcome_lock:
+                outcome["ok" if ok else "error"] += 1
+
+    previous = get_exporter()
+    set_exporter(spans)
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+
+    started = time.perf_counter()
+    for i, offset in enumerate(schedule):
+        scheduled = started + offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        # How late the generator itself was; large values mean the
+        # client, not the system under test, limited the rate.
+        lag.record(max(0.0, time.perf_counter() - scheduled))
+        pending.put((i, scheduled))
+    dispatched = time.perf_counter()
+
+    for _ in threads:
+        pending.put(None)
+    deadline = dispatched + drain_timeout
+    for t in threads:
+        t.join(max(0.0, deadline - time.perf_counter()))
+    finished = time.perf_counter()
+    set_exporter(previous)
+
+    completed = outcome["ok"] + outcome["error"]
+    elapsed = finished - started
+
+    return {
+        "target_rate": rate,
+        "requests": len(schedule),
+        "completed": completed,
+        "errors": outcome["error"],
+        "unfinished": len(schedule) - completed,
+        "seconds": elapsed,
+        "achieved_rate": completed / elapsed if elapsed else 0.0,
+        "latency": latency.summary(),
+        "service_time": service.summary(),
+        "generator_lag": lag.summary(),
+        "nodes": spans.summary(),
+    }
+
+
+def _sustainable(result: Dict[str, Any], slo_ms: float) -> bool:
+    p99 = result["latency"]["p99_ms"]
+    return (
+        not result["unfinished"]
+        and result["achieved_rate"] >= 0.95 * result["target_rate"]
+        and p99 is not None and p99 <= slo_ms
+    )
+
+
+def _fmt(value: Optional[float]) -> str:
+    return f"{value:>9.2f}" if value is not None else f"{'-':>9}"
+
+
+def _print_result(result: Dict[str, Any], ok: bool):
+    lat = result["latency"]
+    print(
+        f"{result['target_rate']:>8.1f}/s  achieved {result['achieved_rate']:>8.1f}/s  "
+        f"p50 {_fmt(lat['p50_ms'])}  p99 {_fmt(lat['p99_ms'])}  p99.9 {_fmt(lat['p99.9_ms'])}  "
+        f"max {_fmt(lat['max_ms'])} ms  service p99 {_fmt(result['service_time']['p99_ms'])} ms  "
+        f"errors {result['errors']}  unfinished {result['unfinished']}  {'ok' if ok else 'SLO MISSED'}"
+    )
+
+
+def _print_nodes(result: Dict[str, Any]):
+    for name, data in result["nodes"].items():
+        print(f"{'':>12}{name:<34} n={data['count']:<7} p50 {_fmt(data['p50_ms'])}  p99 {_fmt(data['p99_ms'])} ms")
+
+
+# =========================================================
+# ======================= COMPARE =========================
+# =========================================================
+
+def compare(baseline_path: str, candidate_path: str, threshold: float) -> int:
+    """
+    Print p99 latency and achieved rate per target rate for two reports;
+    returns 1 when a p99 got worse by more than `threshold` percent.
+    """
+
+    with open(baseline_path) as f:
+        base = {r["target_rate"]: r for r in json.load(f)["results"]}
+    with open(candidate_path) as f:
+        cand = {r["target_rate"]: r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"{'rate/s':>8} {'base p99 ms':>12} {'cand p99 ms':>12} {'change':>9} {'base /s':>9} {'cand /s':>9}")
+    for rate in sorted(set(base) & set(cand)):
+        old, new = base[rate]["latency"]["p99_ms"], cand[rate]["latency"]["p99_ms"]
+        change = (new - old) / old * 100 if old and new is not None else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        regressions += bool(flag)
+        print(
+            f"{rate:>8.1f} {_fmt(old):>12} {_fmt(new):>12} {change:>+8.1f}% "
+            f"{base[rate]['achieved_rate']:>9.1f} {cand[rate]['achieved_rate']:>9.1f}{flag}"
+        )
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load test of the agent pipeline")
+    parser.add_argument("--target", choices=["agent", "orders"], default="agent",
+                        help="run_agent through the graph, or OrderService.submit only")
+    parser.add_argument("--rates", default="10,20,50,100", help="Comma-separated arrival rates (requests/s)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of arrivals per rate")
+    parser.add_argument("--arrival", choices=["poisson", "constant"], default="poisson", help="Arrival process")
+    parser.add_argument("--concurrency", type=int, default=8, help="Threads serving requests")
+    parser.add_argument("--corpus", help="Instructions file, one per line (default: a small built-in set)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Stub LLM latency per call")
+    parser.add_argument("--exchange-latency-ms", type=float, default=0.0, help="Mock exchange round-trip")
+    parser.add_argument("--no-parse-cache", action="store_true", help="Send every instruction to the stub LLM")
+    parser.add_argument("--slo-ms", type=float, default=1000.0, help="p99 latency a sustainable rate must meet")
+    parser.add_argument("--seed", type=int, default=1, help="Poisson arrival seed")
+    parser.add_argument("--nodes", action="store_true", help="Print per-node latencies for each rate")
+    parser.add_argument("--output", help="Write the report as JSON")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CANDIDATE"), help="Compare two reports")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed p99 slowdown in percent (--compare)")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(*args.compare, args.threshold))
+
+    if args.corpus:
+        with open(args.corpus) as f:
+            corpus = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    else:
+        corpus = list(_INSTRUCTIONS)
+
+    _install_stubs(args.llm_latency_ms, args.exchange_latency_ms, not args.no_parse_cache)
+    call = (agent_target if args.target == "agent" else orders_target)(corpus)
+    for i in range(min(50, 10 * len(corpus))):  # warm-up: imports, graph, caches
+        call(i)
+
+    results = []
+    sustainable = None
+    for rate in (float(r) for r in args.rates.split(",")):
+        result = run_rate(call, rate, args.duration, args.arrival, args.concurrency, args.seed,
+                          drain_timeout=max(10.0, args.duration))
+        ok = _sustainable(result, args.slo_ms)
+        result["sustainable"] = ok
+        results.append(result)
+        _print_result(result, ok)
+        if args.nodes:
+            _print_nodes(result)
+        if ok:
+            sustainable = rate
+
+    print(f"\nSustainable rate (p99 <= {args.slo_ms:g} ms): {f'{sustainable:g}/s' if sustainable else 'none tested'}")
+
+    if args.output:
+        config = {key: value for key, value in vars(args).items() if key not in ("output", "compare", "threshold")}
+        with open(args.output, "w") as f:
+            json.dump({
+                "machine": machine_info(),
+                "config": config,
+                "corpus_size": len(corpus),
+                "sustainable_rate": sustainable,
+                "results": results,
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Memory and allocation footprint of holding N orders with their results
+in memory (e.g. a journal of a bulk run), comparing the slotted models
+with the dict representation they replaced.
+
+    python -m benchmarks.bench_memory                 # 1,000,000 orders
+    python -m benchmarks.bench_memory -n 100000 --output mem.json
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from benchmarks.harness import machine_info
+from bot.models import ExecutionReport, Order
+
+_SYMBOLS = ("BTCUSDT", "ETHUSDT")
+
+
+def _quantity(i: int) -> str:
+    return f"0.{i % 1000 + 1:03d}"
+
+
+def build_models(n: int):
+    journal = []
+    append = journal.append
+
+    for i in range(n):
+        order = Order.create(_SYMBOLS[i & 1], "BUY", "LIMIT", _quantity(i), "45000.5")
+        report = ExecutionReport(
+            order_id=i,
+            symbol=order.symbol,
+            side=order.side,
+            order_type=order.order_type,
+            status="NEW",
+            price=order.price,
+            orig_qty=order.quantity,
+        )
+        append((order, report))
+
+    return journal
+
+
+def build_dicts(n: int):
+    """
+    The previous shape: the parsed order dict plus the formatted response
+    dict, which carried a nested `raw` copy of the client response.
+    """
+
+    journal = []
+    append = journal.append
+
+    for i in range(n):
+        quantity = float(_quantity(i))
+        order = {
+            "symbol": _SYMBOLS[i & 1],
+            "side": "BUY",
+            "order_type": "LIMIT",
+            "quantity": quantity,
+            "price": 45000.5,
+        }
+        raw = {
+            "symbol": order["symbol"],
+            "side": "BUY",
+            "type": "LIMIT",
+            "status": "NEW",
+            "orderId": i,
+            "price": str(45000.5),
+            "origQty": str(quantity),
+            "executedQty": "0",
+        }
+        result = {
+            "orderId": raw["orderId"],
+            "symbol": raw["symbol"],
+            "side": raw["side"],
+            "type": raw["type"],
+            "status": raw["status"],
+            "price": raw["price"],
+            "origQty": raw["origQty"],
+            "executedQty": raw["executedQty"],
+            "raw": raw,
+        }
+        append((order, result))
+
+    return journal
+
+
+def measure(builder, n: int):
+    # Build time is taken without tracing, which would dominate it.
+    gc.collect()
+    started = time.perf_counter()
+    journal = builder(n)
+    elapsed = time.perf_counter() - started
+
+    del journal
+    gc.collect()
+    tracemalloc.start()
+
+    journal = builder(n)
+
+    current, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+
+    del journal
+    gc.collect()
+
+    return {
+        "orders": n,
+        "build_seconds": elapsed,
+        "retained_bytes": current,
+        "peak_bytes": peak,
+        "bytes_per_order": current / n,
+        "live_blocks": blocks,
+        "blocks_per_order": blocks / n,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order journal memory benchmark")
+    parser.add_argument("-n", type=int, default=1_000_000, help="Number of orders")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for name, builder in (("models", build_models), ("dicts", build_dicts)):
+        result = measure(builder, args.n)
+        results[name] = result
+        print(
+            f"{name:<8} {result['bytes_per_order']:>8.1f} B/order   "
+            f"{result['blocks_per_order']:>6.2f} blocks/order   "
+            f"peak {result['peak_bytes'] / 2 ** 20:>8.1f} MiB   {result['build_seconds']:.2f}s"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"machine": machine_info(), "memory": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Cost of the write-ahead outbox (bot/outbox.py) on order submission.
+Threads submit orders through OrderService against a mock exchange,
+without an outbox and with one; the report shows orders per second and
+fsyncs per order, which group commit keeps well under one as
+concurrency grows.
+
+    python -m benchmarks.bench_outbox
+    python -m benchmarks.bench_outbox -n 5000 --threads 1,8,32 --latency-ms 2 --dir /var/tmp/outbox-bench
+"""
+
+import argparse
+import json
+import shutil
+import tempfile
+import threading
+import time
+
+from benchmarks.harness import machine_info, quiet_logging
+from bot.metrics import metrics
+from bot.mock_client import MockBinanceFuturesClient
+from bot.models import Order
+from bot.orders import OrderService
+from bot.outbox import OrderOutbox
+from bot.analytics import OrderAggregates
+
+
+def measure(n: int, threads: int, latency_ms: float, directory=None, group_window_ms: float = 0.0):
+    outbox = OrderOutbox(directory, group_window_ms=group_window_ms) if directory else None
+    service = OrderService(
+        client=MockBinanceFuturesClient(latency=latency_ms / 1000),
+        aggregates=OrderAggregates(),
+        outbox=outbox,
+    )
+    order = Order.create("BTCUSDT", "BUY", "MARKET", "0.01")
+    commits_before = metrics.counter("outbox.commits").value
+
+    def worker(count):
+        for _ in range(count):
+            service.submit(order)
+
+    per_thread = n // threads
+    pool = [threading.Thread(target=worker, args=(per_thread,)) for _ in range(threads)]
+
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    if outbox is not None:
+        outbox.close()
+
+    orders = per_thread * threads
+    commits = metrics.counter("outbox.commits").value - commits_before
+
+    return {
+        "threads": threads,
+        "outbox": outbox is not None,
+        "orders": orders,
+        "seconds": elapsed,
+        "orders_per_second": orders / elapsed,
+        "fsyncs_per_order": commits / orders if outbox is not None else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write-ahead outbox overhead benchmark")
+    parser.add_argument("-n", type=int, default=2000, help="Orders per run")
+    parser.add_argument("--threads", default="1,4,16,64", help="Comma-separated submitting thread counts")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Mock exchange round-trip")
+    parser.add_argument("--group-window-ms", type=float, default=0.0, help="Writer linger before each commit")
+    parser.add_argument("--dir", help="Outbox directory (default: a temp dir; put it on the disk you care about)")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    quiet_logging()
+    directory = args.dir or tempfile.mkdtemp(prefix="outbox-bench-")
+
+    results = []
+    try:
+        for threads in (int(t) for t in args.threads.split(",")):
+            base = measure(args.n, threads, args.latency_ms)
+            wal = measure(args.n, threads, args.latency_ms, directory, args.group_window_ms)
+            results += [base, wal]
+            print(
+                f"{threads:>3} threads  no outbox {base['orders_per_second']:>9.1f} orders/s   "
+                f"outbox {wal['orders_per_second']:>9.1f} orders/s   "
+                f"{wal['fsyncs_per_order']:.3f} fsyncs/order"
+            )
+    finally:
+        if not args.dir:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"machine": machine_info(), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Cost of the sampling profiler (bot/profiling.py) on agent runs. The
+graph runs against the zero-latency local LLM and instant mock exchange,
+first unprofiled, then profiled at each sampling interval; the report
+shows the per-run latency and its overhead over the unprofiled run.
+
+    python -m benchmarks.bench_profiling
+    python -m benchmarks.bench_profiling -n 500 --intervals 1,10 --mode request
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import tempfile
+import time
+
+from agent.graph import run_agent
+from benchmarks.bench_agent import _compiled_graph
+from benchmarks.harness import machine_info, quiet_logging
+from bot.profiling import SamplingProfiler, WINDOW, REQUEST, set_profiler
+
+
+def measure(graph, n: int):
+    timings = []
+    for _ in range(n):
+        started = time.perf_counter()
+        run_agent("Buy 0.01 BTC at market", graph=graph)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sampling profiler overhead benchmark")
+    parser.add_argument("-n", type=int, default=200, help="Agent runs per measurement")
+    parser.add_argument("--intervals", default="1,5,10", help="Comma-separated sampling intervals (ms)")
+    parser.add_argument("--mode", choices=[REQUEST, WINDOW], default=WINDOW, help="Profile per request or per window")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    quiet_logging()
+    graph = _compiled_graph()
+    directory = tempfile.mkdtemp(prefix="profile-bench-")
+
+    results = []
+    try:
+        set_profiler(None)
+        measure(graph, 10)  # warm-up
+        base = measure(graph, args.n)
+        results.append({"interval_ms": None, "median_ms": base, "overhead": 0.0})
+        print(f"unprofiled      {base:>8.3f} ms/run")
+
+        for interval in (float(i) for i in args.intervals.split(",")):
+            set_profiler(SamplingProfiler(directory, mode=args.mode, interval_ms=interval))
+            profiled = measure(graph, args.n)
+            set_profiler(None)
+
+            overhead = profiled / base - 1
+            results.append({"interval_ms": interval, "median_ms": profiled, "overhead": overhead})
+            print(f"every {interval:>5.1f} ms  {profiled:>8.3f} ms/run  {overhead:>+7.1%}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"machine": machine_info(), "mode": args.mode, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Throughput of the agent worker pool (agent/workers.py) as workers are
+added, against the local stub LLM and a zero-latency mock exchange, so
+the jobs are CPU-bound graph runs. Each worker count runs the same jobs
+after all workers are warm; speedup is relative to one worker.
+
+    python -m benchmarks.bench_workers                    # 1, 2, 4 ... cpu_count workers
+    python -m benchmarks.bench_workers -n 2000 --workers 1,2,4,8 --output workers.json
+    python -m benchmarks.bench_workers --llm-latency-ms 50   # I/O-bound provider
+"""
+
+import argparse
+import json
+import os
+import time
+
+from benchmarks.harness import machine_info, quiet_logging
+from agent.graph import build_graph, run_agent
+from agent.workers import DONE, WorkerPool
+
+_INSTRUCTIONS = (
+    "Buy 0.01 BTC at market",
+    "Sell 0.5 ETH at 3000",
+    "Buy 1 BNB at market",
+    "Sell 0.002 BTC at 45000",
+)
+
+
+def _install_stubs(llm_latency_ms: float = 0.0):
+    """
+    Worker initializer: silent logging, stub LLM, instant unthrottled mock.
+    """
+
+    from agent.llm import LocalProvider, set_llm
+    from bot.accounts import AccountRouter, set_router
+    from bot.mock_client import MockBinanceFuturesClient
+
+    quiet_logging()
+    set_llm(LocalProvider(latency_ms=llm_latency_ms))
+    set_router(AccountRouter(
+        client_factory=lambda name, credentials: lambda: MockBinanceFuturesClient(latency=0),
+        rate_limit=0,
+    ))
+
+
+def _jobs(n: int):
+    return [_INSTRUCTIONS[i % len(_INSTRUCTIONS)] for i in range(n)]
+
+
+def measure_inline(n: int, llm_latency_ms: float):
+    _install_stubs(llm_latency_ms)
+    graph = build_graph()
+
+    started = time.perf_counter()
+    for instruction in _jobs(n):
+        run_agent(instruction, graph=graph)
+    elapsed = time.perf_counter() - started
+
+    return {"jobs": n, "seconds": elapsed, "jobs_per_second": n / elapsed}
+
+
+def measure_pool(workers: int, n: int, llm_latency_ms: float):
+    with WorkerPool(workers=workers, initializer=_install_stubs, initargs=(llm_latency_ms,)) as pool:
+        pool.wait_ready()
+
+        started = time.perf_counter()
+        job_ids = [pool.submit(instruction) for instruction in _jobs(n)]
+        jobs = [pool.result(job_id) for job_id in job_ids]
+        elapsed = time.perf_counter() - started
+
+    return {
+        "workers": workers,
+        "jobs": n,
+        "failed": sum(job["status"] != DONE for job in jobs),
+        "seconds": elapsed,
+        "jobs_per_second": n / elapsed,
+        "per_worker": {str(pid): count for pid, count in _per_worker(jobs).items()},
+    }
+
+
+def _per_worker(jobs):
+    counts = {}
+    for job in jobs:
+        counts[job["worker"]] = counts.get(job["worker"], 0) + 1
+    return counts
+
+
+def _default_workers():
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agent worker pool scaling benchmark")
+    parser.add_argument("-n", type=int, default=1000, help="Jobs per worker count")
+    parser.add_argument("--workers", help="Comma-separated worker counts (default: powers of two up to cpu_count)")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Stub LLM latency per call")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    counts = [int(w) for w in args.workers.split(",")] if args.workers else _default_workers()
+
+    inline = measure_inline(args.n, args.llm_latency_ms)
+    print(f"{'inline':<10} {inline['jobs_per_second']:>9.1f} jobs/s")
+
+    results = []
+    base = None
+    for workers in counts:
+        result = measure_pool(workers, args.n, args.llm_latency_ms)
+        base = base or result["jobs_per_second"]
+        result["speedup"] = result["jobs_per_second"] / base
+        result["efficiency"] = result["speedup"] / workers
+        results.append(result)
+        print(
+            f"{workers:>2} workers {result['jobs_per_second']:>9.1f} jobs/s   "
+            f"x{result['speedup']:.2f}   efficiency {result['efficiency']:.0%}   failed {result['failed']}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"machine": machine_info(), "inline": inline, "pool": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compare two benchmark result files.
+
+    python -m benchmarks.compare benchmarks/results/<old>.json benchmarks/results/<new>.json
+
+Exits with status 1 when any benchmark's median got slower than the
+threshold (default 10%), so it can gate CI.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path: str):
+    with open(path, "r") as f:
+        data = json.load(f)
+    return data["machine"], {b["name"]: b for b in data["benchmarks"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent")
+    args = parser.parse_args()
+
+    base_machine, base = load(args.baseline)
+    cand_machine, cand = load(args.candidate)
+
+    if base_machine.get("platform") != cand_machine.get("platform"):
+        print("Warning: results come from different machines; comparison is indicative only.\n")
+
+    regressions = 0
+
+    print(f"{'benchmark':<50} {'baseline µs':>12} {'candidate µs':>13} {'change':>9}")
+
+    for name in sorted(set(base) | set(cand)):
+        if name not in base or name not in cand:
+            print(f"{name:<50} {'(only in one run)':>36}")
+            continue
+
+        old = base[name]["median_ns"]
+        new = cand[name]["median_ns"]
+        change = (new - old) / old * 100
+
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+
+        print(f"{name:<50} {old / 1000:>12.2f} {new / 1000:>13.2f} {change:>+8.1f}%{flag}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
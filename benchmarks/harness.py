@@ -0,0 +1,155 @@
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Benchmarks run offline against the deterministic local LLM provider.
+os.environ.setdefault("LLM_PROVIDER", "local")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+_REGISTRY: List[Dict[str, Any]] = []
+
+
+# =========================================================
+# ====================== REGISTRATION =====================
+# =========================================================
+
+def benchmark(name: str, setup: Optional[Callable[[], Any]] = None, number: int = 0, rounds: int = 7):
+    """
+    Register a benchmark.
+
+    `setup` runs once and its return value is passed to the benchmarked
+    function. `number` is the inner loop count per round (0 = calibrate
+    so one round takes roughly 0.1s).
+    """
+
+    def decorator(fn):
+        _REGISTRY.append({"name": name, "fn": fn, "setup": setup, "number": number, "rounds": rounds})
+        return fn
+
+    return decorator
+
+
+def registered() -> List[Dict[str, Any]]:
+    return list(_REGISTRY)
+
+
+# =========================================================
+# ======================== TIMING =========================
+# =========================================================
+
+class _NullStream(io.TextIOBase):
+    def write(self, s):
+        return len(s)
+
+
+def quiet_logging():
+    """
+    Route INFO logging through the app's formatter into a null stream so
+    the logging cost on hot paths is measured without flooding the console.
+    """
+
+    from bot.logging_config import LOG_FORMAT, TraceFormatter
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    handler = logging.StreamHandler(_NullStream())
+    handler.setFormatter(TraceFormatter(LOG_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+def _calibrate(call: Callable[[], Any], target: float = 0.1) -> int:
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = time.perf_counter() - started
+        if elapsed >= target / 10 or number >= 10_000_000:
+            return max(1, int(number * target / max(elapsed, 1e-9)))
+        number *= 10
+
+
+def run_one(entry: Dict[str, Any]) -> Dict[str, Any]:
+    arg = entry["setup"]() if entry["setup"] else None
+    fn = entry["fn"]
+    call = (lambda: fn(arg)) if entry["setup"] else fn
+
+    call()  # warm-up
+    number = entry["number"] or _calibrate(call)
+
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(entry["rounds"]):
+            started = time.perf_counter_ns()
+            for _ in range(number):
+                call()
+            samples.append((time.perf_counter_ns() - started) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    return {
+        "name": entry["name"],
+        "number": number,
+        "rounds": entry["rounds"],
+        "min_ns": min(samples),
+        "median_ns": statistics.median(samples),
+        "mean_ns": statistics.fmean(samples),
+        "stdev_ns": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "ops_per_sec": 1e9 / statistics.median(samples),
+    }
+
+
+# =========================================================
+# ======================= METADATA ========================
+# =========================================================
+
+def _git(*args) -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", *args], cwd=ROOT, stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def write_results(results: List[Dict[str, Any]], path: Optional[str] = None) -> str:
+    info = machine_info()
+
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{(info['commit'] or 'unknown')[:12]}.json")
+
+    with open(path, "w") as f:
+        json.dump({"machine": info, "benchmarks": results}, f, indent=2)
+
+    return path
@@ -0,0 +1,54 @@
+"""
+Run the benchmark suite and store results as JSON.
+
+    python -m benchmarks.run                       # all benchmarks → benchmarks/results/<commit>.json
+    python -m benchmarks.run -k validate           # only names containing "validate"
+    python -m benchmarks.run --output base.json
+
+Compare two runs with benchmarks.compare.
+"""
+
+import argparse
+import importlib
+
+from benchmarks import harness
+
+MODULES = [
+    "benchmarks.bench_core",
+    "benchmarks.bench_agent",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run hot-path benchmarks")
+    parser.add_argument("-k", dest="filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+
+    harness.quiet_logging()
+
+    modules = [importlib.import_module(name) for name in MODULES]
+
+    results = []
+
+    try:
+        for entry in harness.registered():
+            if args.filter and args.filter not in entry["name"]:
+                continue
+
+            result = harness.run_one(entry)
+            results.append(result)
+            print(f"{result['name']:<50} {result['median_ns'] / 1000:>12.2f} µs   {result['ops_per_sec']:>14,.0f} ops/s")
+
+    finally:
+        for module in modules:
+            cleanup = getattr(module, "cleanup", None)
+            if cleanup:
+                cleanup()
+
+    path = harness.write_results(results, args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,601 @@
+import contextvars
+import dataclasses
+import json
+import logging
+import queue
+import re
+import struct
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from bot.config import settings, subscribe
+from bot.client import BinanceFuturesClient
+from bot.fixedpoint import SymbolPrecision, precision_for, register_precision
+from bot.metrics import metrics
+from bot.mock_client import MockBinanceFuturesClient, MockOrderBook
+from bot.models import ExecutionReport, Order
+from bot.orders import OrderService
+from bot.outbox import get_outbox
+from bot.snapshot import register_section, start_snapshots
+from bot.tracing import CLIENT, current_span, span
+from bot.validators import ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# ===================== RATE LIMITING =====================
+# =========================================================
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, up to `burst`.
+
+    acquire() reserves a token under the lock and sleeps outside it, so
+    waiting callers queue up in arrival order without holding the lock.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, blocking until it is available. Returns seconds waited.
+        """
+
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+
+        return wait
+
+    def configure(self, rate: float, burst: int):
+        """
+        Change the rate and burst in place; tokens already earned are kept
+        up to the new burst.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            if self.rate > 0:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = rate
+            self.burst = max(1, burst)
+            self._tokens = min(self._tokens, self.burst)
+
+
+# =========================================================
+# ====================== SYMBOL CACHE =====================
+# =========================================================
+
+class SymbolCache:
+    """
+    Per-account symbol rules with a TTL. Clients that can fetch exchange
+    info (symbol_info(symbol) → {"quantityPrecision", "pricePrecision"})
+    are asked once per symbol per TTL and the result feeds the
+    fixed-point precision table; otherwise the built-in table is used.
+    """
+
+    def __init__(self, loader: Optional[Callable[[str], Dict[str, Any]]] = None, ttl: float = 3600.0):
+        self.loader = loader
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, SymbolPrecision]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str) -> SymbolPrecision:
+        entry = self._entries.get(symbol)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                return entry[1]
+
+            precision = self._load(symbol)
+            self._entries[symbol] = (time.monotonic(), precision)
+            return precision
+
+    def _load(self, symbol: str) -> SymbolPrecision:
+        if self.loader is None:
+            return precision_for(symbol)
+
+        info = self.loader(symbol)
+        if not info:
+            raise ValidationError(f"Unknown symbol: {symbol}")
+
+        register_precision(symbol, int(info["quantityPrecision"]), int(info["pricePrecision"]))
+        return precision_for(symbol)
+
+    def export(self) -> List[Tuple[str, SymbolPrecision, float]]:
+        """
+        (symbol, precision, age in seconds) of every cached entry.
+        """
+
+        now = time.monotonic()
+        return [(symbol, precision, now - loaded) for symbol, (loaded, precision) in list(self._entries.items())]
+
+    def restore(self, entries: Iterable[Tuple[str, SymbolPrecision, float]]):
+        """
+        Seed the cache with exported entries, keeping their age, so
+        stale ones are still refreshed on time.
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            for symbol, precision, age in entries:
+                if self.loader is not None:
+                    register_precision(symbol, precision.quantity, precision.price)
+                self._entries[symbol] = (now - age, precision)
+
+    def refresh_stale(self) -> int:
+        """
+        Re-load entries older than the TTL; returns how many were.
+        """
+
+        if self.loader is None:
+            return 0
+
+        stale = [symbol for symbol, _, age in self.export() if age >= self.ttl]
+        for symbol in stale:
+            precision = self._load(symbol)
+            with self._lock:
+                self._entries[symbol] = (time.monotonic(), precision)
+        return len(stale)
+
+
+# =========================================================
+# ===================== POOLED CLIENT =====================
+# =========================================================
+
+class PooledClient:
+    """
+    Client facade for one account: a fixed pool of underlying clients
+    (one connection each), a rate limiter and a symbol cache. Exposes
+    the same place/cancel/modify interface as the single clients, so
+    OrderService works with it unchanged.
+    """
+
+    def __init__(self, account: str, factory: Callable[[], Any], size: int, limiter: TokenBucket,
+                 symbol_ttl: float = 3600.0):
+        self.account = account
+        self.limiter = limiter
+        self.size = max(1, size)
+
+        self._pool: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        for _ in range(self.size):
+            self._pool.put(factory())
+
+        sample = self._pool.queue[0]
+        self.BATCH_CANCEL_LIMIT = getattr(sample, "BATCH_CANCEL_LIMIT", 10)
+        # Mock clients of one account share a book of resting orders.
+        self.book: Optional[MockOrderBook] = getattr(sample, "book", None)
+
+        supports_info = hasattr(sample, "symbol_info")
+        self.symbols = SymbolCache(loader=self._symbol_info if supports_info else None, ttl=symbol_ttl)
+
+    def _symbol_info(self, symbol: str) -> Dict[str, Any]:
+        with self._checkout() as client:
+            return client.symbol_info(symbol)
+
+    @contextmanager
+    def _checkout(self):
+        started = time.perf_counter()
+        client = self._pool.get()
+        metrics.histogram(f"account.{self.account}.pool_wait_ms").observe((time.perf_counter() - started) * 1000)
+        try:
+            yield client
+        finally:
+            self._pool.put(client)
+
+    def _before_send(self, symbol: Optional[str], kind: str = "orders"):
+        if symbol:
+            self.symbols.get(symbol)
+
+        waited = self.limiter.acquire()
+        if waited:
+            metrics.histogram(f"account.{self.account}.rate_wait_ms").observe(waited * 1000)
+            current_span().set_attribute("ratelimit.wait_ms", waited * 1000)
+
+        metrics.counter(f"account.{self.account}.{kind}").inc()
+
+    def _send(self, kind: str, method: str, symbol: Optional[str], **kwargs):
+        # Covers the rate-limit wait and pool checkout as well as the request.
+        with span(f"exchange.{method}", kind=CLIENT, account=self.account, symbol=symbol):
+            self._before_send(symbol, kind)
+            with self._checkout() as client:
+                return getattr(client, method)(symbol=symbol, **kwargs)
+
+    def place_market_order(self, symbol: str, side: str, quantity: int, **extra) -> ExecutionReport:
+        return self._send("orders", "place_market_order", symbol, side=side, quantity=quantity, **extra)
+
+    def place_limit_order(self, symbol: str, side: str, quantity: int, price: int, **extra) -> ExecutionReport:
+        return self._send("orders", "place_limit_order", symbol, side=side, quantity=quantity, price=price, **extra)
+
+    def get_order(self, symbol: str, client_order_id: str) -> Optional[ExecutionReport]:
+        return self._send("queries", "get_order", symbol, client_order_id=client_order_id)
+
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[ExecutionReport]:
+        return self._send("queries", "get_open_orders", symbol)
+
+    def get_account(self) -> Dict[str, Any]:
+        with span("exchange.get_account", kind=CLIENT, account=self.account):
+            self._before_send(None, "queries")
+            with self._checkout() as client:
+                return client.get_account()
+
+    def cancel_order(self, symbol: str, order_id: int) -> ExecutionReport:
+        return self._send("cancels", "cancel_order", symbol, order_id=order_id)
+
+    def cancel_orders(self, symbol: str, order_ids: List[int]) -> List[Optional[ExecutionReport]]:
+        return self._send("cancels", "cancel_orders", symbol, order_ids=order_ids)
+
+    def cancel_all_orders(self, symbol: str) -> List[ExecutionReport]:
+        return self._send("cancels", "cancel_all_orders", symbol)
+
+    def modify_order(self, symbol: str, order_id: int, side: str, quantity: int, price: int) -> ExecutionReport:
+        return self._send("modifies", "modify_order", symbol, order_id=order_id, side=side,
+                          quantity=quantity, price=price)
+
+
+# =========================================================
+# ======================== ROUTER =========================
+# =========================================================
+
+class Account:
+    """
+    One trading account: its pooled client, OrderService and executor.
+    """
+
+    def __init__(self, name: str, client: PooledClient):
+        self.name = name
+        self.client = client
+        self.service = OrderService(client=client, outbox=get_outbox(), account=name)
+        # One worker per pooled connection; accounts never share threads,
+        # so a throttled or slow account cannot hold up the others.
+        self.executor = ThreadPoolExecutor(max_workers=client.size, thread_name_prefix=f"acct-{name}")
+
+
+def default_client_factory(name: str, credentials: Dict[str, Optional[str]]) -> Callable[[], Any]:
+    if settings.USE_MOCK:
+        # One book per account: every pooled mock sees the same resting orders.
+        book = MockOrderBook()
+        return lambda: MockBinanceFuturesClient(book=book)
+
+    return lambda: BinanceFuturesClient(
+        api_key=credentials.get("api_key"),
+        api_secret=credentials.get("secret_key"),
+        base_url=settings.BINANCE_BASE_URL,
+    )
+
+
+class AccountRouter:
+    """
+    Registry of accounts. Orders are routed by account name; unknown
+    names are rejected with a ValidationError.
+    """
+
+    def __init__(
+        self,
+        accounts: Optional[Dict[str, Dict[str, Optional[str]]]] = None,
+        client_factory: Callable[[str, Dict[str, Optional[str]]], Callable[[], Any]] = default_client_factory,
+        pool_size: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        rate_burst: Optional[int] = None,
+        default_account: Optional[str] = None,
+    ):
+        self.client_factory = client_factory
+        # Arguments left as None follow settings, including reloads.
+        self._overrides = (accounts, pool_size, rate_limit, rate_burst, default_account)
+
+        accounts, pool_size, rate_limit, rate_burst, default_account = self._resolve()
+
+        self.default_account = default_account
+        self._credentials = dict(accounts)
+        self.accounts: Dict[str, Account] = {
+            name: self._build(name, credentials, pool_size, rate_limit, rate_burst)
+            for name, credentials in accounts.items()
+        }
+
+        logger.info(f"[ACCOUNTS] Registered: {', '.join(self.accounts)} (default: {self.default_account})")
+
+    def _resolve(self):
+        accounts, pool_size, rate_limit, rate_burst, default_account = self._overrides
+        rate_limit = settings.ACCOUNT_RATE_LIMIT if rate_limit is None else rate_limit
+        rate_burst = rate_burst or settings.ACCOUNT_RATE_BURST
+        return (
+            accounts if accounts is not None else settings.ACCOUNTS,
+            pool_size or settings.ACCOUNT_POOL_SIZE,
+            # This process's share of the account's limit (see set_rate_share).
+            rate_limit / _rate_share,
+            max(1, rate_burst // _rate_share),
+            (default_account or settings.DEFAULT_ACCOUNT).lower(),
+        )
+
+    def _build(self, name, credentials, pool_size, rate_limit, rate_burst) -> Account:
+        client = PooledClient(
+            account=name,
+            factory=self.client_factory(name, credentials),
+            size=pool_size,
+            limiter=TokenBucket(rate_limit, rate_burst),
+            symbol_ttl=settings.SYMBOL_CACHE_TTL_S,
+        )
+        return Account(name, client)
+
+    def reconfigure(self, changed: Set[str]):
+        """
+        Apply reloaded settings. Rate limits and the symbol TTL change in
+        place; accounts whose client settings or credentials changed get
+        a new pooled client, swapped in with the account table. Orders
+        already running keep the Account they started on.
+        """
+
+        accounts, pool_size, rate_limit, rate_burst, default_account = self._resolve()
+        rebuild = bool(changed & {"USE_MOCK", "BINANCE_BASE_URL", "ACCOUNT_POOL_SIZE"})
+
+        current = self.accounts
+        updated: Dict[str, Account] = {}
+
+        for name, credentials in accounts.items():
+            account = current.get(name)
+            if account is None or rebuild or credentials != self._credentials.get(name):
+                updated[name] = self._build(name, credentials, pool_size, rate_limit, rate_burst)
+            else:
+                account.client.limiter.configure(rate_limit, rate_burst)
+                account.client.symbols.ttl = settings.SYMBOL_CACHE_TTL_S
+                updated[name] = account
+
+        self._credentials = dict(accounts)
+        self.accounts = updated
+        self.default_account = default_account
+
+        for name, account in current.items():
+            if updated.get(name) is not account:
+                # Queued orders still run on the old client.
+                account.executor.shutdown(wait=False)
+
+        rebuilt = [name for name, account in updated.items() if current.get(name) is not account]
+        removed = [name for name in current if name not in updated]
+        logger.info(
+            f"[ACCOUNTS] Reconfigured | new clients: {', '.join(rebuilt) or '-'} | "
+            f"removed: {', '.join(removed) or '-'}"
+        )
+
+    def names(self) -> List[str]:
+        return list(self.accounts)
+
+    def get(self, name: Optional[str] = None) -> Account:
+        name = (name or self.default_account).lower()
+        account = self.accounts.get(name)
+        if account is None:
+            raise ValidationError(f"Unknown account: {name}. Known accounts: {', '.join(self.accounts)}")
+        return account
+
+    def service(self, name: Optional[str] = None) -> OrderService:
+        return self.get(name).service
+
+    def submit(self, order: Order, account: Optional[str] = None) -> "Future[ExecutionReport]":
+        """
+        Queue an order on its account's executor and return a Future.
+        """
+
+        target = self.get(account)
+        # Run in a copy of the caller's context so the order's spans join its trace.
+        return target.executor.submit(contextvars.copy_context().run, target.service.submit, order)
+
+    def submit_many(self, orders: Iterable[Tuple[Optional[str], Order]]) -> List["Future[ExecutionReport]"]:
+        """
+        Fan (account, order) pairs out to their accounts; results keep input order.
+        """
+
+        return [self.submit(order, account) for account, order in orders]
+
+
+# =========================================================
+# ===================== ACCOUNT TAGS ======================
+# =========================================================
+
+# "@hedge buy 1 BTC", "buy 1 BTC on account hedge", "account=hedge ...".
+# Names start with a letter so "@45000" stays a price.
+_NAME = r"([A-Za-z][A-Za-z0-9_-]*)"
+_TAG_RE = re.compile(
+    rf"(?<!\S)@{_NAME}|\baccount\s*[:=]\s*{_NAME}|\b(?:on|using|via|from)\s+(?:the\s+)?account\s+{_NAME}",
+    re.IGNORECASE,
+)
+
+
+def extract_account(text: str) -> Tuple[Optional[str], str]:
+    """
+    Split an account tag out of a natural-language instruction.
+    Returns (account or None, instruction without the tag).
+    """
+
+    match = _TAG_RE.search(text)
+    if not match:
+        return None, text
+
+    account = next(group for group in match.groups() if group).lower()
+    remaining = (text[:match.start()] + text[match.end():]).strip()
+    return account, " ".join(remaining.split())
+
+
+_router: Optional[AccountRouter] = None
+_router_lock = threading.Lock()
+
+# Processes sending orders for the same accounts, e.g. the agent worker
+# processes, each with a router of its own. Each router's buckets get
+# 1/_rate_share of ACCOUNT_RATE_LIMIT and ACCOUNT_RATE_BURST, so the
+# exchange sees the configured limit in aggregate rather than N times it.
+_rate_share = 1
+
+
+def set_rate_share(processes: int):
+    """
+    Split each account's rate limit over `processes` processes,
+    including the routers already built in this one.
+    """
+
+    global _rate_share
+
+    _rate_share = max(1, processes)
+    router = _router
+    if router is not None:
+        router.reconfigure(set())
+
+
+def get_router() -> AccountRouter:
+    """
+    Process-wide router built from settings on first use, which is
+    also when the outbox (if enabled) is recovered.
+    """
+
+    global _router
+
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = AccountRouter()
+                # Startup: warm caches from the last snapshot (if enabled),
+                # then settle what a previous process left in flight.
+                start_snapshots()
+                outbox = get_outbox()
+                if outbox is not None:
+                    outbox.recover(_router)
+
+    return _router
+
+
+# Settings that reconfigure() reads.
+ROUTER_SETTINGS = frozenset({
+    "USE_MOCK", "BINANCE_BASE_URL", "ACCOUNTS", "DEFAULT_ACCOUNT",
+    "ACCOUNT_POOL_SIZE", "ACCOUNT_RATE_LIMIT", "ACCOUNT_RATE_BURST", "SYMBOL_CACHE_TTL_S",
+})
+
+
+def _on_settings_change(old, new, changed):
+    router = _router
+    if router is not None and changed & ROUTER_SETTINGS:
+        router.reconfigure(changed)
+
+
+subscribe(_on_settings_change)
+
+
+# =========================================================
+# =================== WARM-START SNAPSHOT =================
+# =========================================================
+# Two sections of the process router's state (bot/snapshot.py):
+#   symbols  per account: name, entry count, then per entry the symbol,
+#            quantity and price decimals and age in seconds (struct-packed)
+#   books    mock resting orders, client order ids and positions per
+#            account (JSON), each with the decimals its units are at
+
+_NAME_COUNT = struct.Struct("<BH")
+_SYMBOL = struct.Struct("<BBf")
+
+
+def _dump_symbols() -> bytes:
+    parts = []
+    for name, account in (_router.accounts.items() if _router is not None else ()):
+        entries = account.client.symbols.export()
+        parts.append(_NAME_COUNT.pack(len(name), len(entries)) + name.encode())
+        for symbol, precision, age in entries:
+            parts.append(bytes([len(symbol)]) + symbol.encode() + _SYMBOL.pack(precision.quantity, precision.price, age))
+    return b"".join(parts)
+
+
+def _load_symbols(body: bytes):
+    offset = 0
+    while offset < len(body):
+        length, count = _NAME_COUNT.unpack_from(body, offset)
+        offset += _NAME_COUNT.size
+        name = body[offset:offset + length].decode()
+        offset += length
+
+        entries = []
+        for _ in range(count):
+            length = body[offset]
+            symbol = body[offset + 1:offset + 1 + length].decode()
+            offset += 1 + length
+            quantity, price, age = _SYMBOL.unpack_from(body, offset)
+            offset += _SYMBOL.size
+            entries.append((symbol, SymbolPrecision(quantity, price), age))
+
+        account = _router.accounts.get(name)
+        if account is not None:
+            account.client.symbols.restore(entries)
+
+
+def _refresh_symbols():
+    refreshed = sum(account.client.symbols.refresh_stale() for account in list(_router.accounts.values()))
+    if refreshed:
+        logger.info(f"[ACCOUNTS] Refreshed {refreshed} stale symbol rules")
+
+
+def _dump_books() -> bytes:
+    books = {}
+    for name, account in (_router.accounts.items() if _router is not None else ()):
+        book = account.client.book
+        if book is not None:
+            with book.lock:
+                books[name] = {
+                    "orders": [dataclasses.astuple(report) for report in book.orders.values()],
+                    "placed": {cid: dataclasses.astuple(report) for cid, report in book.placed.items()},
+                    "positions": book.positions,
+                    "position_decimals": book.position_decimals,
+                }
+    return json.dumps(books, separators=(",", ":")).encode()
+
+
+def _report(fields) -> ExecutionReport:
+    # astuple() writes the report's SymbolPrecision as a JSON list.
+    *fields, decimals = fields
+    return ExecutionReport(*fields, decimals=SymbolPrecision(*decimals))
+
+
+def _load_books(body: bytes):
+    for name, data in json.loads(body).items():
+        account = _router.accounts.get(name)
+        book = account.client.book if account is not None else None
+        if book is None:
+            continue
+        with book.lock:
+            for fields in data["orders"]:
+                report = _report(fields)
+                book.orders[report.order_id] = report
+            for cid, fields in data["placed"].items():
+                book.placed[cid] = _report(fields)
+            book.positions.update(data.get("positions", {}))
+            book.position_decimals.update(data.get("position_decimals", {}))
+
+
+register_section("symbols", _dump_symbols, _load_symbols, refresh=_refresh_symbols)
+register_section("books", _dump_books, _load_books)
+
+
+def set_router(router: Optional[AccountRouter]):
+    """
+    Replace the process-wide router (None rebuilds it from settings).
+    """
+
+    global _router
+
+    with _router_lock:
+        _router = router
@@ -0,0 +1,514 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from bot.accounts import get_router
+from bot.fixedpoint import SymbolPrecision, format_units, precision_for, rescale, to_float, to_units
+from bot.models import Order
+from bot.orders import OrderService
+from bot.validators import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Seconds between iceberg clips when the caller does not specify one.
+DEFAULT_ICEBERG_INTERVAL = 5.0
+
+
+# =========================================================
+# ========================= CLOCKS ========================
+# =========================================================
+
+class RealClock:
+    """
+    Wall-clock scheduling on the running event loop.
+    Children are scheduled against absolute deadlines, so the time
+    spent submitting one child never pushes back the next one.
+    """
+
+    def time(self) -> float:
+        return time.monotonic()
+
+    async def sleep_until(self, deadline: float):
+        delay = deadline - self.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def register(self):
+        pass
+
+    def unregister(self):
+        pass
+
+
+class SimulatedClock:
+    """
+    Virtual clock for replaying schedules faster than real time.
+
+    Every running parent order registers itself. When all of them are
+    waiting on the clock, time jumps straight to the earliest deadline.
+    A parent that is busy submitting (e.g. awaiting the exchange) holds
+    time still, so ordering is identical to a real run.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self._timers = []
+        self._seq = itertools.count()
+        self._active = 0
+
+    def time(self) -> float:
+        return self.now
+
+    async def sleep_until(self, deadline: float):
+        if deadline <= self.now:
+            await asyncio.sleep(0)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._timers, (deadline, next(self._seq), waiter))
+        self._advance()
+        await waiter
+
+    def register(self):
+        self._active += 1
+
+    def unregister(self):
+        self._active -= 1
+        self._advance()
+
+    def _advance(self):
+        if self._timers and len(self._timers) >= self._active:
+            deadline, _, waiter = heapq.heappop(self._timers)
+            self.now = max(self.now, deadline)
+            waiter.set_result(None)
+
+
+# =========================================================
+# ===================== ORDER MODELS ======================
+# =========================================================
+# Quantities and prices are scaled integers at the parent's precision
+# (bot/fixedpoint.py), fixed when it is built like Order's; they are
+# formatted only in to_dict().
+
+@dataclass
+class ChildOrder:
+    child_id: str
+    offset: float
+    quantity: int
+    order_type: str
+    price: Optional[int] = None
+    status: str = "SCHEDULED"
+    order_id: Optional[int] = None
+    executed_qty: int = 0
+    fill_price: int = 0
+    sent_at: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self, precision: SymbolPrecision) -> Dict[str, Any]:
+        return {
+            "childId": self.child_id,
+            "offset": self.offset,
+            "type": self.order_type,
+            "quantity": format_units(self.quantity, precision.quantity),
+            "price": None if self.price is None else format_units(self.price, precision.price),
+            "status": self.status,
+            "orderId": self.order_id,
+            "executedQty": format_units(self.executed_qty, precision.quantity),
+            "sentAt": self.sent_at,
+            "error": self.error,
+        }
+
+
+@dataclass
+class ParentOrder:
+    algo: str
+    symbol: str
+    side: str
+    quantity: int
+    children: List[ChildOrder]
+    price: Optional[int] = None
+    account: Optional[str] = None
+    parent_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status: str = "PENDING"
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    cancel_requested: bool = False
+    decimals: Optional[SymbolPrecision] = None
+
+    def __post_init__(self):
+        if self.decimals is None:
+            self.decimals = precision_for(self.symbol)
+
+    @property
+    def precision(self) -> SymbolPrecision:
+        return self.decimals
+
+    @property
+    def sent_qty(self) -> int:
+        return sum(c.quantity for c in self.children if c.sent_at is not None and c.error is None)
+
+    @property
+    def executed_qty(self) -> int:
+        return sum(c.executed_qty for c in self.children)
+
+    @property
+    def avg_fill_price(self) -> Optional[float]:
+        priced = [c for c in self.children if c.executed_qty and c.fill_price]
+        notional = sum(c.executed_qty * c.fill_price for c in priced)
+        filled = sum(c.executed_qty for c in priced)
+        return to_float(notional, self.precision.price) / filled if filled else None
+
+    def to_dict(self, include_children: bool = True) -> Dict[str, Any]:
+        precision = self.precision
+        result = {
+            "parentId": self.parent_id,
+            "algo": self.algo,
+            "account": self.account,
+            "symbol": self.symbol,
+            "side": self.side,
+            "quantity": format_units(self.quantity, precision.quantity),
+            "price": None if self.price is None else format_units(self.price, precision.price),
+            "status": self.status,
+            "children": len(self.children),
+            "sentQty": format_units(self.sent_qty, precision.quantity),
+            "executedQty": format_units(self.executed_qty, precision.quantity),
+            "avgPrice": self.avg_fill_price,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+        }
+        if include_children:
+            result["childOrders"] = [c.to_dict(precision) for c in self.children]
+        return result
+
+
+# =========================================================
+# ======================== SLICERS ========================
+# =========================================================
+# Slicers work in scaled units, so every clip is a size the exchange
+# accepts and the clips add up to the parent exactly.
+
+def _split(quantity: int, parts: int) -> List[int]:
+    """
+    Split a quantity into `parts` equal clips. The remainder goes on the
+    last clip so the clips always add up to the parent quantity.
+    """
+
+    base = quantity // parts
+    clips = [base] * parts
+    clips[-1] += quantity - base * parts
+    return [c for c in clips if c > 0]
+
+
+def twap_children(quantity: int, duration: float, slices: int, price: Optional[int] = None) -> List[ChildOrder]:
+    """
+    Equal slices spread evenly across `duration` seconds.
+    MARKET slices unless a limit price is given.
+    """
+
+    if slices < 1 or duration < 0:
+        raise ValidationError("TWAP needs slices >= 1 and a non-negative duration.")
+
+    interval = duration / slices
+    order_type = "LIMIT" if price else "MARKET"
+
+    return [
+        ChildOrder(child_id=f"t{i}", offset=i * interval, quantity=qty, order_type=order_type, price=price)
+        for i, qty in enumerate(_split(quantity, slices))
+    ]
+
+
+def iceberg_children(quantity: int, clip_size: Optional[int], price: Optional[int],
+                     interval: float) -> List[ChildOrder]:
+    """
+    LIMIT clips of at most `clip_size`, released one every `interval`
+    seconds. Release is on the clock, not on fills: a clip that hasn't
+    filled keeps resting when the next one goes out, so the book shows a
+    single clip only while the market absorbs each within `interval`.
+    """
+
+    if not clip_size or clip_size <= 0 or price is None or price <= 0:
+        raise ValidationError("Iceberg needs a positive clip size and limit price.")
+
+    quantities = [min(clip_size, quantity - start) for start in range(0, quantity, clip_size)]
+
+    return [
+        ChildOrder(child_id=f"i{i}", offset=i * interval, quantity=qty, order_type="LIMIT", price=price)
+        for i, qty in enumerate(quantities)
+    ]
+
+
+def grid_children(quantity: int, side: str, price: Optional[int], levels: int,
+                  step: Optional[int]) -> List[ChildOrder]:
+    """
+    `levels` LIMIT orders stepping away from `price` (down for BUY,
+    up for SELL), all placed immediately.
+    """
+
+    if levels < 1 or not step or step <= 0 or price is None or price <= 0:
+        raise ValidationError("Grid needs levels >= 1, a positive step and a limit price.")
+
+    direction = -1 if side == "BUY" else 1
+    children = []
+
+    for i, qty in enumerate(_split(quantity, levels)):
+        level_price = price + direction * i * step
+        if level_price <= 0:
+            raise ValidationError("Grid step takes prices below zero.")
+        children.append(
+            ChildOrder(child_id=f"g{i}", offset=0.0, quantity=qty, order_type="LIMIT", price=level_price)
+        )
+
+    return children
+
+
+def build_parent_order(
+    algo: str,
+    symbol: str,
+    side: str,
+    quantity: int,
+    price: Optional[int] = None,
+    duration_seconds: Optional[float] = None,
+    slices: Optional[int] = None,
+    clip_size: Optional[int] = None,
+    interval: Optional[float] = None,
+    grid_levels: Optional[int] = None,
+    grid_step: Optional[int] = None,
+    account: Optional[str] = None,
+    precision: Optional[SymbolPrecision] = None,
+) -> ParentOrder:
+    """
+    Slice a parent order into a child schedule for the requested algorithm.
+    `quantity` and `clip_size` are scaled quantity units, `price` and
+    `grid_step` scaled price units, at `precision` (default: the symbol's
+    current one); see parent_order_for() to build one from an Order.
+    Children of a parent with an `account` are routed to that account.
+    """
+
+    algo = algo.upper()
+    side = side.upper()
+    symbol = symbol.upper()
+
+    if algo == "TWAP":
+        children = twap_children(quantity, duration_seconds or 0.0, slices or 1, price)
+    elif algo == "ICEBERG":
+        if interval is None:
+            interval = DEFAULT_ICEBERG_INTERVAL
+        children = iceberg_children(quantity, clip_size, price, interval)
+    elif algo == "GRID":
+        children = grid_children(quantity, side, price, grid_levels or 1, grid_step)
+    else:
+        raise ValidationError(f"Unsupported execution algorithm: {algo}")
+
+    return ParentOrder(algo=algo, symbol=symbol, side=side, quantity=quantity, price=price, children=children,
+                       account=account, decimals=precision)
+
+
+def parent_order_for(order: Order, account: Optional[str] = None, interval: Optional[float] = None) -> ParentOrder:
+    """
+    build_parent_order() for an Order with AlgoParams. The clip size and
+    grid step are converted at the symbol's precision like the quantity
+    and price: one the exchange can't represent raises ValidationError.
+    """
+
+    params = order.algo
+    precision = order.precision
+
+    try:
+        clip_size = None if params.clip_size is None else to_units(params.clip_size, precision.quantity)
+        grid_step = None if params.grid_step is None else to_units(params.grid_step, precision.price)
+    except ValueError as e:
+        raise ValidationError(f"Invalid {params.algo} parameter for {order.symbol}: {e}") from None
+
+    return build_parent_order(
+        algo=params.algo,
+        symbol=order.symbol,
+        side=order.side,
+        quantity=order.quantity,
+        price=order.price,
+        duration_seconds=params.duration_seconds,
+        slices=params.slices,
+        clip_size=clip_size,
+        interval=interval,
+        grid_levels=params.grid_levels,
+        grid_step=grid_step,
+        account=account,
+        precision=precision,
+    )
+
+
+# =========================================================
+# ========================= ENGINE ========================
+# =========================================================
+
+class AlgoEngine:
+    """
+    Runs parent orders on an asyncio scheduler and submits each child
+    through OrderService. Parent and child state lives in memory in
+    `self.parents` and is updated as children are acknowledged.
+    Children go to their parent's account through the process router
+    (rate limits, outbox, account state), unless a `service` is given
+    for parents without one (e.g. a simulation's).
+    """
+
+    def __init__(self, service: Optional[OrderService] = None, clock=None):
+        self.service = service
+        self.clock = clock or RealClock()
+        self.parents: Dict[str, ParentOrder] = {}
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def run(self, parent: ParentOrder) -> ParentOrder:
+        """
+        Execute every child of `parent` on schedule and return it once done.
+        """
+
+        self.parents[parent.parent_id] = parent
+        self.clock.register()
+
+        parent.status = "WORKING"
+        parent.started_at = start = self.clock.time()
+        logger.info(
+            f"[ALGO] {parent.algo} started | {parent.parent_id} | {parent.symbol} | {parent.side} | "
+            f"qty={format_units(parent.quantity, parent.precision.quantity)} | children={len(parent.children)}"
+        )
+
+        try:
+            for child in parent.children:
+                await self.clock.sleep_until(start + child.offset)
+
+                if parent.cancel_requested:
+                    child.status = "CANCELLED"
+                    continue
+
+                await self._submit_child(parent, child)
+
+        finally:
+            self.clock.unregister()
+
+        failed = sum(1 for c in parent.children if c.error)
+        if parent.cancel_requested:
+            parent.status = "CANCELLED"
+        elif failed == len(parent.children):
+            parent.status = "FAILED"
+        else:
+            parent.status = "DONE"
+        parent.finished_at = self.clock.time()
+
+        logger.info(
+            f"[ALGO] {parent.algo} {parent.status} | {parent.parent_id} | "
+            f"sent={format_units(parent.sent_qty, parent.precision.quantity)} | "
+            f"executed={format_units(parent.executed_qty, parent.precision.quantity)} | failed_children={failed}"
+        )
+
+        return parent
+
+    async def _submit_child(self, parent: ParentOrder, child: ChildOrder):
+        child.sent_at = self.clock.time()
+        child.status = "SENT"
+
+        loop = asyncio.get_running_loop()
+        if parent.account or self.service is None:
+            service = get_router().service(parent.account)
+        else:
+            service = self.service
+
+        order = Order(
+            symbol=parent.symbol,
+            side=parent.side,
+            order_type=child.order_type,
+            quantity=child.quantity,
+            price=child.price,
+            decimals=parent.precision,
+        )
+
+        try:
+            result = await loop.run_in_executor(None, service.submit, order)
+        except Exception as e:
+            child.status = "FAILED"
+            child.error = str(e)
+            logger.warning(f"[ALGO] Child {parent.parent_id}/{child.child_id} failed: {e}")
+            return
+
+        child.order_id = result.order_id
+        child.status = result.status or "SENT"
+        # The report is at the symbol's precision when sent; the parent's may be older.
+        precision = parent.precision
+        child.executed_qty = rescale(result.executed_qty, result.precision.quantity, precision.quantity, exact=False)
+        child.fill_price = rescale(result.price or 0, result.precision.price, precision.price, exact=False)
+
+    def cancel(self, parent_id: str) -> bool:
+        """
+        Stop releasing further children of a parent. Already-sent children are left as they are.
+        """
+
+        parent = self.parents.get(parent_id)
+        if parent is None or parent.status not in ("PENDING", "WORKING"):
+            return False
+
+        parent.cancel_requested = True
+        return True
+
+    def get(self, parent_id: str) -> Optional[ParentOrder]:
+        return self.parents.get(parent_id)
+
+    # -----------------------------------------------------
+    # Background mode (agent / UI): one loop thread per engine
+    # -----------------------------------------------------
+
+    def start_background(self):
+        if self._thread is not None:
+            return
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="algo-engine", daemon=True)
+        self._thread.start()
+
+    def submit(self, parent: ParentOrder) -> str:
+        """
+        Schedule a parent order on the background loop and return immediately.
+        """
+
+        self.start_background()
+        self.parents[parent.parent_id] = parent
+        future = asyncio.run_coroutine_threadsafe(self.run(parent), self._loop)
+        future.add_done_callback(lambda done: self._settle(parent, done))
+        return parent.parent_id
+
+    def _settle(self, parent: ParentOrder, future):
+        # run() settles the parent itself; this covers it dying on the way.
+        if future.cancelled():
+            error: BaseException = asyncio.CancelledError()
+        else:
+            error = future.exception()
+            if error is None:
+                return
+
+        logger.error(f"[ALGO] {parent.algo} {parent.parent_id} crashed: {error!r}", exc_info=error)
+        parent.status = "FAILED"
+        parent.finished_at = self.clock.time()
+
+
+_background_engine: Optional[AlgoEngine] = None
+_background_lock = threading.Lock()
+
+
+def get_background_engine() -> AlgoEngine:
+    """
+    Shared engine used by the agent so long-running schedules outlive a single graph run.
+    """
+
+    global _background_engine
+
+    with _background_lock:
+        if _background_engine is None:
+            _background_engine = AlgoEngine()
+            _background_engine.start_background()
+
+    return _background_engine
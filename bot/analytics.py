@@ -0,0 +1,362 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from bot.fixedpoint import SymbolPrecision, precision_for, rescale, to_float, to_units
+from bot.metrics import LATENCY_BUCKETS_MS, Histogram
+from bot.models import ExecutionReport
+
+# =========================================================
+# ================= INCREMENTAL AGGREGATES ================
+# =========================================================
+# Every execution updates a handful of running totals and time buckets
+# in O(1), so the dashboard reads pre-aggregated numbers instead of
+# re-scanning order history. Volume and notional are kept as scaled
+# integers like the orders themselves; floats only appear in snapshots.
+
+MINUTE_RETENTION = 24 * 60
+DAY_RETENTION = 30
+
+_FILLED = ("FILLED",)
+_REJECTED = "REJECTED"
+_FAILED = "FAILED"
+
+
+class SymbolStats:
+    """
+    Running totals for one symbol.
+    """
+
+    __slots__ = (
+        "symbol", "precision", "orders", "accepted", "filled", "rejected", "failed",
+        "orig_qty", "executed_qty", "buy_qty", "sell_qty", "notional", "unpriced", "latency",
+    )
+
+    def __init__(self, symbol: str, precision: SymbolPrecision):
+        self.symbol = symbol
+        # Fixed at the first record; later ones are rescaled to it.
+        self.precision = precision
+        self.orders = 0
+        self.accepted = 0
+        self.filled = 0
+        self.rejected = 0
+        self.failed = 0
+        # Quantity units at precision.quantity.
+        self.orig_qty = 0
+        self.executed_qty = 0
+        self.buy_qty = 0
+        self.sell_qty = 0
+        # Executed qty × price, in units of quantity + price decimals.
+        self.notional = 0
+        # Executions without a reported price (e.g. mock market fills):
+        # counted in volume, not in notional.
+        self.unpriced = 0
+        self.latency = Histogram()
+
+    def to_row(self) -> Dict[str, Any]:
+        precision = self.precision
+
+        return {
+            "symbol": self.symbol,
+            "orders": self.orders,
+            "filled": self.filled,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "fill_rate": self.filled / self.accepted if self.accepted else None,
+            "qty_fill_rate": self.executed_qty / self.orig_qty if self.orig_qty else None,
+            "volume": to_float(self.executed_qty, precision.quantity),
+            "buy_volume": to_float(self.buy_qty, precision.quantity),
+            "sell_volume": to_float(self.sell_qty, precision.quantity),
+            "notional": to_float(self.notional, precision.quantity + precision.price),
+            "unpriced": self.unpriced,
+            "p50_ms": self.latency.percentile(50),
+            "p95_ms": self.latency.percentile(95),
+        }
+
+
+class OrderAggregates:
+    """
+    Per-symbol totals plus per-minute and per-day buckets of executions.
+
+    record() is called once per submitted order (see OrderService.submit);
+    bucket maps are bounded by MINUTE_RETENTION / DAY_RETENTION, so memory
+    stays flat however many orders have been seen.
+    """
+
+    def __init__(self, minute_retention: int = MINUTE_RETENTION, day_retention: int = DAY_RETENTION):
+        self._lock = threading.Lock()
+        self.minute_retention = minute_retention
+        self.day_retention = day_retention
+        self.symbols: Dict[str, SymbolStats] = {}
+        self.latency = Histogram()
+        # minute (epoch // 60) → symbol → [orders, executed qty units, notional units]
+        self.minutes: Dict[int, Dict[str, List[int]]] = {}
+        # "YYYY-MM-DD" (local time) → symbol → [orders, executed qty units, notional units]
+        self.days: Dict[str, Dict[str, List[int]]] = {}
+        self._day_cache: Tuple[Optional[int], str] = (None, "")
+
+    # -----------------------------------------------------
+    # Updates
+    # -----------------------------------------------------
+
+    def record(
+        self,
+        symbol: str,
+        side: str,
+        status: str,
+        orig_qty: int = 0,
+        executed_qty: int = 0,
+        price: int = 0,
+        latency_ms: Optional[float] = None,
+        at: Optional[float] = None,
+        precision: Optional[SymbolPrecision] = None,
+    ):
+        """
+        Fold one order outcome into the aggregates. `status` is the
+        exchange status, or REJECTED / FAILED for orders that never
+        reached it. Units are at `precision` (default: the symbol's
+        current one).
+        """
+
+        at = time.time() if at is None else at
+        precision = precision_for(symbol) if precision is None else precision
+        minute = int(at // 60)
+        day = self._day_of(minute)
+
+        with self._lock:
+            stats = self.symbols.get(symbol)
+            if stats is None:
+                stats = self.symbols[symbol] = SymbolStats(symbol, precision)
+            elif precision is not stats.precision and precision != stats.precision:
+                # SYMBOL_PRECISION changed since this symbol's first record.
+                held = stats.precision
+                orig_qty = rescale(orig_qty, precision.quantity, held.quantity, exact=False)
+                executed_qty = rescale(executed_qty, precision.quantity, held.quantity, exact=False)
+                price = rescale(price, precision.price, held.price, exact=False)
+            notional = executed_qty * price
+
+            stats.orders += 1
+            if status == _REJECTED:
+                stats.rejected += 1
+            elif status == _FAILED:
+                stats.failed += 1
+            else:
+                stats.accepted += 1
+                stats.orig_qty += orig_qty
+                stats.executed_qty += executed_qty
+                if status in _FILLED:
+                    stats.filled += 1
+                if side == "BUY":
+                    stats.buy_qty += executed_qty
+                else:
+                    stats.sell_qty += executed_qty
+                if executed_qty and not price:
+                    stats.unpriced += 1
+                stats.notional += notional
+
+            self._bump(self.minutes, minute, symbol, executed_qty, notional, self.minute_retention)
+            self._bump(self.days, day, symbol, executed_qty, notional, self.day_retention)
+
+        if latency_ms is not None:
+            stats.latency.observe(latency_ms)
+            self.latency.observe(latency_ms)
+
+    def _day_of(self, minute: int) -> str:
+        # strftime is the most expensive step of record(); compute it once per minute.
+        cached = self._day_cache
+        if cached[0] != minute:
+            cached = self._day_cache = (minute, time.strftime("%Y-%m-%d", time.localtime(minute * 60)))
+        return cached[1]
+
+    @staticmethod
+    def _bump(buckets: Dict, key, symbol: str, qty: int, notional: int, retention: int):
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = {}
+            # Once per new minute/day; backfills may arrive out of order,
+            # so evict by key rather than by insertion.
+            while len(buckets) > retention:
+                del buckets[min(buckets)]
+
+        totals = bucket.get(symbol)
+        if totals is None:
+            bucket[symbol] = [1, qty, notional]
+        else:
+            totals[0] += 1
+            totals[1] += qty
+            totals[2] += notional
+
+    def record_report(self, report: ExecutionReport, latency_ms: Optional[float] = None, at: Optional[float] = None):
+        self.record(
+            report.symbol, report.side, report.status,
+            orig_qty=report.orig_qty, executed_qty=report.executed_qty, price=report.price,
+            latency_ms=latency_ms, at=at, precision=report.precision,
+        )
+
+    def reset(self):
+        with self._lock:
+            self.symbols.clear()
+            self.minutes.clear()
+            self.days.clear()
+            self.latency = Histogram()
+
+    # -----------------------------------------------------
+    # Reads
+    # -----------------------------------------------------
+
+    def symbol_rows(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            stats = list(self.symbols.values())
+        return [s.to_row() for s in sorted(stats, key=lambda s: s.symbol)]
+
+    def totals(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = list(self.symbols.values())
+
+        orders = sum(s.orders for s in stats)
+        accepted = sum(s.accepted for s in stats)
+        filled = sum(s.filled for s in stats)
+
+        return {
+            "orders": orders,
+            "filled": filled,
+            "rejected": sum(s.rejected for s in stats),
+            "failed": sum(s.failed for s in stats),
+            "fill_rate": filled / accepted if accepted else None,
+            "symbols": len(stats),
+            "p50_ms": self.latency.percentile(50),
+            "p95_ms": self.latency.percentile(95),
+        }
+
+    def _series(self, buckets: Dict, field: str, keys: List[Any]) -> Dict[str, List[float]]:
+        index = {"orders": 0, "volume": 1, "notional": 2}[field]
+        symbols = sorted({symbol for key in keys for symbol in buckets[key]})
+        series = {}
+
+        for symbol in symbols:
+            stats = self.symbols.get(symbol)
+            precision = precision_for(symbol) if stats is None else stats.precision
+            decimals = {0: 0, 1: precision.quantity, 2: precision.quantity + precision.price}[index]
+            series[symbol] = [
+                to_float(buckets[key][symbol][index], decimals) if symbol in buckets[key] else 0.0
+                for key in keys
+            ]
+
+        return series
+
+    def minute_series(self, field: str = "notional", last: int = 60) -> Tuple[List[int], Dict[str, List[float]]]:
+        """
+        (minute start epochs, {symbol: values}) for the most recent `last`
+        minutes that saw orders. `field` is orders, volume or notional.
+        """
+
+        with self._lock:
+            keys = sorted(self.minutes)[-last:]
+            return [key * 60 for key in keys], self._series(self.minutes, field, keys)
+
+    def daily_series(self, field: str = "volume") -> Tuple[List[str], Dict[str, List[float]]]:
+        with self._lock:
+            keys = sorted(self.days)
+            return keys, self._series(self.days, field, keys)
+
+    def latency_buckets(self, symbol: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        (bucket label, count) pairs of the latency histogram, overall or
+        for one symbol, trimmed to the populated range.
+        """
+
+        with self._lock:
+            histogram = self.symbols[symbol].latency if symbol in self.symbols else self.latency
+            counts = list(histogram.counts)
+
+        labels = [f"≤{bound:g} ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]:g} ms"]
+        populated = [i for i, count in enumerate(counts) if count]
+        if not populated:
+            return []
+
+        return list(zip(labels, counts))[populated[0]:populated[-1] + 1]
+
+
+# =========================================================
+# ==================== RESULT FILE TAIL ===================
+# =========================================================
+
+class ResultsTail:
+    """
+    Folds a bulk results JSONL file (bot/bulk.py) into aggregates. Only
+    lines appended since the previous poll are read. A file that shrank
+    (rotated or rewritten with --no-resume) is read again from the start;
+    what was already folded in stays counted.
+    """
+
+    def __init__(self, path: str, aggregates: OrderAggregates):
+        self.path = path
+        self.aggregates = aggregates
+        self.offset = 0
+        self._lock = threading.Lock()
+
+    def poll(self) -> int:
+        """
+        Ingest new complete lines. Returns the number of records added.
+        """
+
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return 0
+
+            if size < self.offset:
+                self.offset = 0
+            if size == self.offset:
+                return 0
+
+            added = 0
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    self.offset += len(line)
+                    added += self._ingest(line)
+
+            return added
+
+    def _ingest(self, line: bytes) -> int:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return 0
+
+        at = record.get("ts")
+        result = record.get("result")
+        if record.get("status") == "OK" and result:
+            symbol = result["symbol"]
+            precision = precision_for(symbol)
+            try:
+                self.aggregates.record(
+                    symbol, result["side"], result["status"],
+                    orig_qty=to_units(result["origQty"], precision.quantity),
+                    executed_qty=to_units(result["executedQty"], precision.quantity),
+                    price=to_units(result["price"] or "0", precision.price),
+                    at=at, precision=precision,
+                )
+            except (KeyError, ValueError):
+                return 0
+            return 1
+
+        # REJECTED rows carry the raw input; ERROR rows the parsed order.
+        source = record.get("order") or record.get("input") or {}
+        symbol = str(source.get("symbol") or "").strip().upper()
+        if not symbol:
+            return 0
+
+        status = _REJECTED if record.get("status") == _REJECTED else _FAILED
+        self.aggregates.record(symbol, str(source.get("side") or "").strip().upper(), status, at=at)
+        return 1
+
+
+# Singleton instance: live executions in this process.
+order_aggregates = OrderAggregates()
@@ -0,0 +1,255 @@
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from bot.fixedpoint import precision_for
+
+# =========================================================
+# ====================== ERROR CODES ======================
+# =========================================================
+# Codes are reported in the same precedence as validate_order():
+# symbol → side → order type → quantity → price, then the decimal
+# places Order.create() allows for the symbol: quantity → price.
+
+OK = 0
+SYMBOL_EMPTY = 1
+SYMBOL_INVALID = 2
+SIDE_INVALID = 3
+ORDER_TYPE_INVALID = 4
+QUANTITY_INVALID = 5
+PRICE_REQUIRED = 6
+PRICE_INVALID = 7
+QUANTITY_DECIMALS = 8
+PRICE_DECIMALS = 9
+
+ERROR_MESSAGES = {
+    OK: None,
+    SYMBOL_EMPTY: "Symbol cannot be empty.",
+    SYMBOL_INVALID: "Symbol must be uppercase and alphanumeric (e.g., BTCUSDT).",
+    SIDE_INVALID: "Side must be either BUY or SELL.",
+    ORDER_TYPE_INVALID: "Order type must be MARKET or LIMIT.",
+    QUANTITY_INVALID: "Quantity must be greater than 0.",
+    PRICE_REQUIRED: "Price is required for LIMIT orders.",
+    PRICE_INVALID: "Price must be greater than 0.",
+    QUANTITY_DECIMALS: "Quantity has more decimal places than the symbol allows.",
+    PRICE_DECIMALS: "Price has more decimal places than the symbol allows.",
+}
+
+_SYMBOL_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+_SIDES = frozenset(["BUY", "SELL"])
+_ORDER_TYPES = frozenset(["MARKET", "LIMIT"])
+
+
+# =========================================================
+# =================== PER-VALUE CHECKS ====================
+# =========================================================
+# These run once per *distinct* value and are cached across batches,
+# so a million-row batch over a few dozen symbols only touches
+# Python string code a few dozen times.
+
+class _CodeTable(dict):
+    """
+    Value → result lookup that computes each missing entry once.
+    Lookups go through dict.__getitem__, so mapping a column over it
+    runs at C speed once the distinct values have been seen.
+    """
+
+    def __init__(self, fn, maxsize: int = 4096):
+        super().__init__()
+        self.fn = fn
+        self.maxsize = maxsize
+
+    def __missing__(self, value):
+        result = self.fn(value)
+        if len(self) < self.maxsize:
+            self[value] = result
+        return result
+
+
+def _symbol_code(symbol: str) -> int:
+    if not symbol:
+        return SYMBOL_EMPTY
+
+    upper = symbol.upper()
+
+    # validate_symbol() uses re.match(r"^[A-Z0-9]+$"), whose "$" also
+    # matches just before a single trailing newline.
+    if upper.endswith("\n"):
+        upper = upper[:-1]
+
+    if upper and _SYMBOL_CHARS.issuperset(upper):
+        return OK
+
+    return SYMBOL_INVALID
+
+
+def _side_code(side: str) -> int:
+    return OK if side.upper() in _SIDES else SIDE_INVALID
+
+
+def _order_type_code(order_type: str) -> int:
+    return OK if order_type.upper() in _ORDER_TYPES else ORDER_TYPE_INVALID
+
+
+def _is_limit(order_type: str) -> bool:
+    return order_type.upper() == "LIMIT"
+
+
+_SYMBOL_CODES = _CodeTable(_symbol_code)
+_SIDE_CODES = _CodeTable(_side_code)
+_ORDER_TYPE_CODES = _CodeTable(_order_type_code)
+_LIMIT_TYPES = _CodeTable(_is_limit)
+
+
+def _map_codes(values: np.ndarray, table: _CodeTable, dtype) -> np.ndarray:
+    """
+    Map a string column through a code table, broadcasting one result per row.
+    """
+
+    return np.fromiter(map(table.__getitem__, values), dtype=dtype, count=len(values))
+
+
+def _precision_scales(symbols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    10**decimals of each row's symbol, for quantity and price. Looked up
+    per call (not cached across batches) so a precision reload applies.
+    """
+
+    precisions = _CodeTable(lambda symbol: precision_for(symbol.strip().upper()))
+    quantity = _CodeTable(lambda symbol: 10.0 ** precisions[symbol].quantity)
+    price = _CodeTable(lambda symbol: 10.0 ** precisions[symbol].price)
+    return _map_codes(symbols, quantity, np.float64), _map_codes(symbols, price, np.float64)
+
+
+def _too_fine(values: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """
+    Finite values with more decimal places than their scale allows. A
+    float fits `d` decimals iff rounding it to them gives it back: then
+    its shortest repr, which to_units() parses, has no more than `d`.
+    """
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        fits = (np.round(values * scales) / scales == values) | (values == np.floor(values))
+    return np.isfinite(values) & ~fits
+
+
+def _as_strings(values) -> np.ndarray:
+    """
+    Object array of str. None becomes "" so it is reported as invalid
+    instead of raising.
+    """
+
+    arr = np.asarray(values, dtype=object)
+    missing = arr == None  # noqa: E711 - elementwise comparison
+    if missing.any():
+        arr = arr.copy()
+        arr[missing] = ""
+    return arr
+
+
+def _as_numbers(values) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return (float_values, missing_mask). NaN input is kept as NaN and is
+    *not* treated as missing, matching validate_order().
+    """
+
+    arr = np.asarray(values)
+
+    if arr.dtype.kind in "fiu":
+        return arr.astype(np.float64, copy=False), np.zeros(arr.shape, dtype=bool)
+
+    arr = arr.astype(object)
+    missing = arr == None  # noqa: E711 - elementwise comparison
+    numbers = np.where(missing, np.nan, arr).astype(np.float64)
+    return numbers, missing
+
+
+# =========================================================
+# ==================== BATCH VALIDATION ===================
+# =========================================================
+
+def validate_orders_batch(
+    symbol: Sequence[str],
+    side: Sequence[str],
+    order_type: Sequence[str],
+    quantity: Sequence[float],
+    price: Optional[Sequence[Optional[float]]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Columnar counterpart of validate_order().
+
+    Each argument is a column (list or NumPy array) of equal length.
+    Returns (valid_mask, error_codes): a boolean array that is True for
+    rows validate_order() would accept with no more decimals than
+    Order.create() allows for the symbol, and an int8 array holding the
+    first failing check per row (see ERROR_MESSAGES).
+    """
+
+    symbols = _as_strings(symbol)
+    n = len(symbols)
+
+    sides = _as_strings(side)
+    order_types = _as_strings(order_type)
+    quantities, quantity_missing = _as_numbers(quantity)
+
+    if price is None:
+        prices, price_missing = np.full(n, np.nan), np.ones(n, dtype=bool)
+    else:
+        prices, price_missing = _as_numbers(price)
+
+    for column in (sides, order_types, quantities, prices):
+        if len(column) != n:
+            raise ValueError("All order columns must have the same length.")
+
+    codes = np.zeros(n, dtype=np.int8)
+
+    if n == 0:
+        return codes.astype(bool), codes
+
+    # Assign in reverse precedence so earlier checks overwrite later ones.
+    quantity_scales, price_scales = _precision_scales(symbols)
+    codes[_too_fine(prices, price_scales)] = PRICE_DECIMALS
+    codes[_too_fine(quantities, quantity_scales)] = QUANTITY_DECIMALS
+
+    is_limit = _map_codes(order_types, _LIMIT_TYPES, bool)
+    codes[is_limit & (prices <= 0)] = PRICE_INVALID
+    codes[is_limit & price_missing] = PRICE_REQUIRED
+
+    codes[quantity_missing | (quantities <= 0)] = QUANTITY_INVALID
+
+    type_codes = _map_codes(order_types, _ORDER_TYPE_CODES, np.int8)
+    codes = np.where(type_codes != OK, type_codes, codes)
+
+    side_codes = _map_codes(sides, _SIDE_CODES, np.int8)
+    codes = np.where(side_codes != OK, side_codes, codes)
+
+    symbol_codes = _map_codes(symbols, _SYMBOL_CODES, np.int8)
+    codes = np.where(symbol_codes != OK, symbol_codes, codes)
+
+    return codes == OK, codes
+
+
+def validate_order_records(records: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Validate a NumPy structured/record array with fields
+    symbol, side, order_type (or type), quantity and optional price.
+    """
+
+    names = records.dtype.names or ()
+    type_field = "order_type" if "order_type" in names else "type"
+
+    return validate_orders_batch(
+        symbol=records["symbol"],
+        side=records["side"],
+        order_type=records[type_field],
+        quantity=records["quantity"],
+        price=records["price"] if "price" in names else None,
+    )
+
+
+def error_messages(codes: np.ndarray) -> list:
+    """
+    Translate error codes into the ValidationError messages validate_order() raises.
+    """
+
+    return [ERROR_MESSAGES[int(code)] for code in codes]
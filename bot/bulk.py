@@ -0,0 +1,271 @@
+import csv
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+from bot.accounts import get_router
+from bot.models import Order
+from bot.orders import OrderService
+from bot.validators import validate_order_model, ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+# =========================================================
+# ===================== INPUT READERS =====================
+# =========================================================
+
+def _normalize_row(row: Dict[str, Any]) -> Order:
+    """
+    Map a raw CSV/JSONL row onto an Order.
+    Accepts either `type` or `order_type` for the order type column.
+    Numbers keep the exact text from the file (no float round-trip).
+    """
+
+    order_type = row.get("order_type") or row.get("type") or ""
+    quantity = row.get("quantity")
+    price = row.get("price")
+
+    return Order.create(
+        symbol=str(row.get("symbol") or ""),
+        side=str(row.get("side") or ""),
+        order_type=str(order_type),
+        quantity=quantity if quantity not in (None, "") else None,
+        price=price if price not in (None, "") else None,
+    )
+
+
+class BadRow:
+    """
+    A JSONL line that is not a JSON object. read_orders() yields it in
+    place of the row so the runner records it as REJECTED and carries on.
+    """
+
+    __slots__ = ("error", "text")
+
+    def __init__(self, error: str, text: str):
+        self.error = error
+        self.text = text
+
+
+def _decode_lines(handle) -> Iterator[Any]:
+    for line in handle:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield BadRow(f"Invalid JSON: {e}", line.rstrip("\n"))
+            continue
+        if not isinstance(row, dict):
+            yield BadRow("Row is not a JSON object.", line.rstrip("\n"))
+            continue
+        yield row
+
+
+def _detect_format(path: str, handle) -> str:
+    """
+    Pick csv/jsonl from the file extension, or sniff stdin.
+    """
+
+    lowered = path.lower()
+    if lowered.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    if lowered.endswith(".csv"):
+        return "csv"
+
+    # stdin / unknown extension: JSONL rows always start with "{"
+    first = handle.buffer.peek(1)[:1] if hasattr(handle, "buffer") else b""
+    return "jsonl" if first == b"{" else "csv"
+
+
+def read_orders(path: str, fmt: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream (row_id, raw_row) pairs from a CSV or JSONL file.
+    Use "-" to read from stdin. Rows are never loaded all at once.
+
+    The row id is the `id` column when present (even 0 or ""),
+    otherwise the 1-based row number. It is the key used to resume a run. JSONL lines
+    that don't decode to an object come through as BadRow.
+    """
+
+    handle = sys.stdin if path == "-" else open(path, "r", newline="")
+
+    try:
+        fmt = fmt or _detect_format(path, handle)
+
+        if fmt == "jsonl":
+            rows = _decode_lines(handle)
+        else:
+            rows = csv.DictReader(handle)
+
+        for number, row in enumerate(rows, start=1):
+            row_id = number if isinstance(row, BadRow) or row.get("id") is None else row["id"]
+            yield str(row_id), row
+
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def load_completed(output_path: str, retry_errors: bool = False) -> Set[str]:
+    """
+    Return the row ids already recorded in a previous run's output file.
+    With `retry_errors`, rows whose only outcome is ERROR are left out so
+    they run again.
+    """
+
+    completed = set()
+
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if retry_errors and record.get("status") == "ERROR":
+                    continue
+                completed.add(str(record["row_id"]))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                # A torn last line from an interrupted run; that row is retried.
+                continue
+
+    return completed
+
+
+def _trim_torn_line(output_path: str):
+    """
+    Cut an output file back to its last complete line, so appending
+    after an interrupted run doesn't glue a new record onto a torn one.
+    """
+
+    if not os.path.exists(output_path):
+        return
+
+    with open(output_path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - 65536)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+
+        if position != end:
+            logger.warning(f"[BULK] Dropping a torn last line from {output_path}")
+            f.truncate(position)
+
+
+# =========================================================
+# ====================== BULK RUNNER ======================
+# =========================================================
+
+class BulkOrderRunner:
+    """
+    Streams orders through validation and submits them on a thread pool.
+
+    At most `max_in_flight` orders are submitted to the exchange at any
+    time. Reading the input blocks while the pool is full, so memory stays
+    flat regardless of file size. Every result is appended to the output
+    file as soon as it completes, which makes the run resumable.
+
+    Rows are routed by their `account` column (falling back to `account`,
+    then the default account) unless an explicit `service` is given.
+    """
+
+    def __init__(self, output_path: str, max_in_flight: int = 8, service: Optional[OrderService] = None,
+                 account: Optional[str] = None):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1.")
+
+        self.output_path = output_path
+        self.max_in_flight = max_in_flight
+        self.service = service
+        self.account = account
+
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._write_lock = threading.Lock()
+        self.stats = {"submitted": 0, "executed": 0, "rejected": 0, "failed": 0, "skipped": 0}
+
+    def run(self, rows: Iterator[Tuple[str, Any]], resume: bool = True, retry_errors: bool = False) -> Dict[str, int]:
+        """
+        Submit every row not already in the output file (all rows when not
+        `resume`). ERROR rows of a previous run are skipped like the others
+        unless `retry_errors`: their outcome is unknown (e.g. a timeout), so
+        they may have reached the exchange.
+        """
+
+        if resume:
+            _trim_torn_line(self.output_path)
+        completed = load_completed(self.output_path, retry_errors) if resume else set()
+        if completed:
+            logger.info(f"[BULK] Resuming: {len(completed)} rows already processed.")
+
+        mode = "a" if resume else "w"
+
+        with open(self.output_path, mode) as out, \
+                ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="bulk") as pool:
+
+            for row_id, raw in rows:
+                if row_id in completed:
+                    self._count("skipped")
+                    continue
+
+                if isinstance(raw, BadRow):
+                    self._reject(out, row_id, raw.error, raw.text)
+                    continue
+
+                try:
+                    order = _normalize_row(raw)
+                    validate_order_model(order)
+                    service = self.service or get_router().service(raw.get("account") or self.account)
+                except (ValidationError, ValueError, TypeError) as e:
+                    self._reject(out, row_id, str(e), raw)
+                    continue
+
+                # Blocks until a slot frees up: this is the in-flight cap.
+                self._slots.acquire()
+                self._count("submitted")
+                pool.submit(self._submit, out, row_id, service, order)
+
+        logger.info(f"[BULK] Completed | {self.stats}")
+
+        return self.stats
+
+    def _submit(self, out, row_id: str, service: OrderService, order: Order):
+        try:
+            report = service.submit(order)
+            record = {"row_id": row_id, "status": "OK", "order": order.to_dict(), "result": report.to_dict()}
+            self._count("executed")
+        except Exception as e:
+            record = {"row_id": row_id, "status": "ERROR", "order": order.to_dict(), "error": str(e)}
+            self._count("failed")
+        finally:
+            self._slots.release()
+
+        self._write(out, record)
+
+    def _reject(self, out, row_id: str, error: str, raw: Any):
+        self._count("rejected")
+        self._write(out, {"row_id": row_id, "status": "REJECTED", "error": error, "input": raw})
+
+    def _count(self, key: str):
+        with self._write_lock:
+            self.stats[key] += 1
+
+    def _write(self, out, record: Dict[str, Any]):
+        record["ts"] = round(time.time(), 3)
+        line = json.dumps(record, default=str)
+
+        with self._write_lock:
+            out.write(line + "\n")
+            out.flush()
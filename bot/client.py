@@ -1,4 +1,13 @@
+import hashlib
+import hmac
+import json
 import logging
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+
+from bot.fixedpoint import format_units, precision_for
+from bot.models import ExecutionReport
 
 logger = logging.getLogger(__name__)
 
@@ -7,8 +16,12 @@ class BinanceFuturesClient:
     """
     Real Binance Futures Client (Testnet).
     Not used when USE_MOCK=True.
+    Quantities and prices are scaled integers (see bot/fixedpoint.py).
     """
 
+    # DELETE /fapi/v1/batchOrders accepts at most 10 order ids.
+    BATCH_CANCEL_LIMIT = 10
+
     def __init__(self, api_key: str, api_secret: str, base_url: str):
         self.api_key = api_key
         self.api_secret = api_secret
@@ -16,7 +29,82 @@ class BinanceFuturesClient:
 
         logger.info("BinanceFuturesClient initialized (real mode).")
 
-    def place_market_order(self, symbol: str, side: str, quantity: float):
+    def order_params(
+        self,
+        symbol: str,
+        side: str,
+        order_type: str,
+        quantity: int,
+        price: Optional[int] = None,
+        client_order_id: Optional[str] = None,
+        reduce_only: bool = False,
+    ) -> Dict[str, str]:
+        """
+        POST /fapi/v1/order parameters. Numbers are formatted straight from
+        the scaled integers, so the signed payload carries exactly the
+        decimals the symbol allows.
+        """
+
+        precision = precision_for(symbol)
+
+        params = {
+            "symbol": symbol,
+            "side": side,
+            "type": order_type,
+            "quantity": format_units(quantity, precision.quantity),
+        }
+
+        if order_type == "LIMIT":
+            params["price"] = format_units(price, precision.price)
+            params["timeInForce"] = "GTC"
+
+        if reduce_only:
+            params["reduceOnly"] = "true"
+
+        # Lets the order be looked up after a crash (see bot/outbox.py).
+        if client_order_id:
+            params["newClientOrderId"] = client_order_id
+
+        return params
+
+    def cancel_params(self, symbol: str, order_ids: List[int]) -> Dict[str, str]:
+        """
+        DELETE /fapi/v1/order for one id, DELETE /fapi/v1/batchOrders
+        (orderIdList, at most BATCH_CANCEL_LIMIT ids) for several.
+        """
+
+        if len(order_ids) == 1:
+            return {"symbol": symbol, "orderId": str(order_ids[0])}
+
+        return {"symbol": symbol, "orderIdList": json.dumps(list(order_ids), separators=(",", ":"))}
+
+    def modify_params(self, symbol: str, order_id: int, side: str, quantity: int, price: int) -> Dict[str, str]:
+        """
+        PUT /fapi/v1/order parameters (LIMIT orders only; side must match).
+        """
+
+        precision = precision_for(symbol)
+
+        return {
+            "symbol": symbol,
+            "orderId": str(order_id),
+            "side": side,
+            "quantity": format_units(quantity, precision.quantity),
+            "price": format_units(price, precision.price),
+        }
+
+    def sign(self, params: Dict[str, str]) -> str:
+        """
+        Query string with timestamp and HMAC-SHA256 signature appended.
+        """
+
+        query = urlencode({**params, "timestamp": int(time.time() * 1000)})
+        signature = hmac.new(self.api_secret.encode(), query.encode(), hashlib.sha256).hexdigest()
+        return f"{query}&signature={signature}"
+
+    def place_market_order(
+        self, symbol: str, side: str, quantity: int, client_order_id: Optional[str] = None, reduce_only: bool = False
+    ) -> ExecutionReport:
         """
         Placeholder for real Binance market order.
         """
@@ -24,10 +112,69 @@ class BinanceFuturesClient:
             "Real Binance execution not enabled. Set USE_MOCK=False and implement real client."
         )
 
-    def place_limit_order(self, symbol: str, side: str, quantity: float, price: float):
+    def place_limit_order(
+        self, symbol: str, side: str, quantity: int, price: int, client_order_id: Optional[str] = None,
+        reduce_only: bool = False,
+    ) -> ExecutionReport:
         """
         Placeholder for real Binance limit order.
         """
         raise NotImplementedError(
             "Real Binance execution not enabled. Set USE_MOCK=False and implement real client."
-        )
\ No newline at end of file
+        )
+
+    def get_order(self, symbol: str, client_order_id: str) -> Optional[ExecutionReport]:
+        """
+        Placeholder for GET /fapi/v1/order?origClientOrderId=... (None on -2013, order does not exist).
+        """
+        raise NotImplementedError(
+            "Real Binance execution not enabled. Set USE_MOCK=False and implement real client."
+        )
+
+    def get_account(self) -> Dict[str, Any]:
+        """
+        Placeholder for GET /fapi/v2/account (balances and positions).
+        """
+        raise NotImplementedError(
+            "Real Binance execution not enabled. Set USE_MOCK=False and implement real client."
+        )
+
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[ExecutionReport]:
+        """
+        Placeholder for GET /fapi/v1/openOrders.
+        """
+        raise NotImplementedError(
+            "Real Binance execution not enabled. Set USE_MOCK=False and implement real client."
+        )
+
+    def cancel_order(self, symbol: str, order_id: int) -> ExecutionReport:
+        """
+        Placeholder for DELETE /fapi/v1/order.
+        """
+        raise NotImplementedError(
+            "Real Binance execution not enabled. Set USE_MOCK=False and implement real client."
+        )
+
+    def cancel_orders(self, symbol: str, order_ids: List[int]) -> List[Optional[ExecutionReport]]:
+        """
+        Placeholder for DELETE /fapi/v1/batchOrders.
+        """
+        raise NotImplementedError(
+            "Real Binance execution not enabled. Set USE_MOCK=False and implement real client."
+        )
+
+    def cancel_all_orders(self, symbol: str) -> List[ExecutionReport]:
+        """
+        Placeholder for DELETE /fapi/v1/allOpenOrders.
+        """
+        raise NotImplementedError(
+            "Real Binance execution not enabled. Set USE_MOCK=False and implement real client."
+        )
+
+    def modify_order(self, symbol: str, order_id: int, side: str, quantity: int, price: int) -> ExecutionReport:
+        """
+        Placeholder for PUT /fapi/v1/order.
+        """
+        raise NotImplementedError(
+            "Real Binance execution not enabled. Set USE_MOCK=False and implement real client."
+        )
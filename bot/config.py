@@ -1,21 +1,64 @@
+import contextvars
+import copy
+import logging
 import os
-from dotenv import load_dotenv
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Set, Union
+from weakref import WeakValueDictionary
+
+from dotenv import dotenv_values, find_dotenv
+
+logger = logging.getLogger(__name__)
 
 
 class Settings:
     """
     Central configuration class.
     Loads environment variables and defines global app settings.
+    One instance is one immutable, versioned snapshot (see below).
     """
 
-    def __init__(self):
-        load_dotenv()
+    def __init__(self, version: int = 1):
+        self.version = version
 
         # ===============================
         # === Gemini / LLM Settings ===
         # ===============================
         self.GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
+        # gemini → Google Gemini via LangChain
+        # local  → deterministic offline provider (replay + rule-based parser)
+        self.LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+        self.LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.5-flash")
+
+        # Local provider: recorded responses file and simulated latency
+        self.LLM_REPLAY_FILE = os.getenv("LLM_REPLAY_FILE")
+        self.LLM_LATENCY_MS = float(os.getenv("LLM_LATENCY_MS", "0"))
+
+        # Parse request coalescing: identical in-flight instructions always
+        # share one call; distinct ones arriving within the window are batched.
+        # 0 → no batching window.
+        self.LLM_BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "0"))
+        self.LLM_MAX_BATCH = int(os.getenv("LLM_MAX_BATCH", "8"))
+        # Successful parses kept per process (LRU) so repeated instructions
+        # skip the LLM; 0 → no cache.
+        self.LLM_PARSE_CACHE_SIZE = int(os.getenv("LLM_PARSE_CACHE_SIZE", "1024"))
+
+        # Per-node latency budgets; past them the node uses the rule-based
+        # parser / template summary instead of waiting on the provider.
+        self.LLM_PARSE_TIMEOUT_MS = float(os.getenv("LLM_PARSE_TIMEOUT_MS", "10000"))
+        self.LLM_SUMMARY_TIMEOUT_MS = float(os.getenv("LLM_SUMMARY_TIMEOUT_MS", "5000"))
+
+        # Send a second, hedged request once a call outlives this percentile
+        # of recent latencies. 0 → no hedging.
+        self.LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+
+        # Circuit breaker: open after N consecutive failures/timeouts,
+        # probe again after the reset interval.
+        self.LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+        self.LLM_BREAKER_RESET_S = float(os.getenv("LLM_BREAKER_RESET_S", "30"))
+
         # ===============================
         # === Execution Mode Toggle ===
         # ===============================
@@ -23,6 +66,16 @@ class Settings:
         # False → Use real Binance client
         self.USE_MOCK = os.getenv("USE_MOCK", "True") == "True"
 
+        # Per-symbol quantity/price decimals, e.g. "BTCUSDT:3:1,ETHUSDT:3:2"
+        # (extends the built-in table in bot/fixedpoint.py)
+        self.SYMBOL_PRECISION = os.getenv("SYMBOL_PRECISION", "")
+
+        # Pre-trade risk limits (bot/risk.py), checked next to validation.
+        # Per-symbol max quantity, e.g. "BTCUSDT:1,ETHUSDT:20"; empty → none.
+        self.RISK_MAX_QTY = os.getenv("RISK_MAX_QTY", "").upper()
+        # Max quantity × price of priced orders; 0 → no limit.
+        self.RISK_MAX_NOTIONAL = float(os.getenv("RISK_MAX_NOTIONAL", "0"))
+
         # ===============================
         # === Binance (Future Ready) ===
         # ===============================
@@ -30,11 +83,119 @@ class Settings:
         self.BINANCE_SECRET_KEY = os.getenv("BINANCE_SECRET_KEY")
         self.BINANCE_BASE_URL = "https://testnet.binancefuture.com"
 
+        # ===============================
+        # === Accounts ===
+        # ===============================
+        # BINANCE_ACCOUNTS=main,hedge → credentials in BINANCE_MAIN_API_KEY /
+        # BINANCE_MAIN_SECRET_KEY, etc. The single-key pair above is always
+        # available as the "default" account.
+        self.DEFAULT_ACCOUNT = os.getenv("DEFAULT_ACCOUNT", "default").lower()
+        self.ACCOUNTS = {
+            "default": {"api_key": self.BINANCE_API_KEY, "secret_key": self.BINANCE_SECRET_KEY},
+        }
+        for name in filter(None, (a.strip().lower() for a in os.getenv("BINANCE_ACCOUNTS", "").split(","))):
+            self.ACCOUNTS[name] = {
+                "api_key": os.getenv(f"BINANCE_{name.upper()}_API_KEY"),
+                "secret_key": os.getenv(f"BINANCE_{name.upper()}_SECRET_KEY"),
+            }
+
+        # Per account: pooled clients (concurrent requests), order rate
+        # limit in orders/second with a burst allowance (Binance futures:
+        # 1200 orders/min), symbol cache TTL.
+        self.ACCOUNT_POOL_SIZE = int(os.getenv("ACCOUNT_POOL_SIZE", "4"))
+        self.ACCOUNT_RATE_LIMIT = float(os.getenv("ACCOUNT_RATE_LIMIT", "20"))
+        self.ACCOUNT_RATE_BURST = int(os.getenv("ACCOUNT_RATE_BURST", "100"))
+        self.SYMBOL_CACHE_TTL_S = float(os.getenv("SYMBOL_CACHE_TTL_S", "3600"))
+        # Cached positions and balances (bot/positions.py) older than this
+        # are reloaded from the account endpoint before they are used.
+        self.ACCOUNT_STATE_MAX_AGE_S = float(os.getenv("ACCOUNT_STATE_MAX_AGE_S", "60"))
+
+        # ===============================
+        # === Agent Worker Pool ===
+        # ===============================
+        # >0 → the UI runs agent jobs on this many worker processes
+        # (agent/workers.py); 0 → in-line on the script thread.
+        self.AGENT_WORKERS = int(os.getenv("AGENT_WORKERS", "0"))
+        # Seconds the UI waits for a worker job before reporting an error.
+        self.AGENT_JOB_TIMEOUT_S = float(os.getenv("AGENT_JOB_TIMEOUT_S", "120"))
+
+        # ===============================
+        # === HTTP API ===
+        # ===============================
+        # Headless JSON API (api/server.py, `cli.py serve`).
+        self.API_HOST = os.getenv("API_HOST", "127.0.0.1")
+        self.API_PORT = int(os.getenv("API_PORT", "8080"))
+        # Threads running agent requests.
+        self.API_AGENT_WORKERS = int(os.getenv("API_AGENT_WORKERS", "4"))
+        # Orders / agent runs admitted (queued or running) before new
+        # requests are turned away with 503.
+        self.API_ORDER_QUEUE = int(os.getenv("API_ORDER_QUEUE", "256"))
+        self.API_AGENT_QUEUE = int(os.getenv("API_AGENT_QUEUE", "32"))
+        self.API_MAX_BATCH = int(os.getenv("API_MAX_BATCH", "100"))
+        self.API_MAX_BODY_BYTES = int(os.getenv("API_MAX_BODY_BYTES", str(1024 * 1024)))
+        # Idle seconds before a keep-alive connection is closed.
+        self.API_KEEPALIVE_S = float(os.getenv("API_KEEPALIVE_S", "15"))
+
+        # ===============================
+        # === Order Outbox ===
+        # ===============================
+        # Write-ahead log of order intents and acks (bot/outbox.py).
+        # Empty disables it.
+        self.OUTBOX_DIR = os.getenv("OUTBOX_DIR", "")
+        # >0 makes the writer wait this long before each commit to group more records.
+        self.OUTBOX_GROUP_WINDOW_MS = float(os.getenv("OUTBOX_GROUP_WINDOW_MS", "0"))
+        # A segment larger than this is compacted to its open intents.
+        self.OUTBOX_MAX_BYTES = int(os.getenv("OUTBOX_MAX_BYTES", str(64 * 1024 * 1024)))
+
+        # ===============================
+        # === Warm-Start Snapshot ===
+        # ===============================
+        # Symbol rules, cached parses and mock open orders are saved here
+        # (bot/snapshot.py) and restored on startup. Empty disables it.
+        self.SNAPSHOT_FILE = os.getenv("SNAPSHOT_FILE", "")
+        self.SNAPSHOT_INTERVAL_S = float(os.getenv("SNAPSHOT_INTERVAL_S", "30"))
+
+        # ===============================
+        # === Dashboard ===
+        # ===============================
+        # Bulk results files (JSONL) whose new lines are folded into the
+        # dashboard aggregates on each page load.
+        self.DASHBOARD_RESULTS_FILES = [
+            path.strip() for path in os.getenv("DASHBOARD_RESULTS_FILES", "bulk_results.jsonl").split(",")
+            if path.strip()
+        ]
+
+        # ===============================
+        # === Tracing ===
+        # ===============================
+        # Finished spans are appended here as OTLP/JSON (bot/tracing.py).
+        # Empty: spans still tag log lines with trace ids but are not exported.
+        self.TRACE_FILE = os.getenv("TRACE_FILE", "")
+        self.TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "trading-bot")
+
+        # ===============================
+        # === Profiling ===
+        # ===============================
+        # Sampling profiler for agent runs and order submissions
+        # (bot/profiling.py): "" (off), "request" (one flamegraph per
+        # request) or "window" (one per PROFILE_WINDOW_S). `--profile` on
+        # the CLI sets it too.
+        self.PROFILE_MODE = os.getenv("PROFILE_MODE", "").strip().lower()
+        self.PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+        self.PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+        self.PROFILE_WINDOW_S = float(os.getenv("PROFILE_WINDOW_S", "60"))
+
         # ===============================
         # === Logging ===
         # ===============================
         self.LOG_FILE = "logs/trading.log"
-        self.LOG_LEVEL = "INFO"
+        self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+        # ===============================
+        # === Hot Reload ===
+        # ===============================
+        # Seconds between checks of CONFIG_FILE for changes; 0 → no watching.
+        self.CONFIG_RELOAD_INTERVAL_S = float(os.getenv("CONFIG_RELOAD_INTERVAL_S", "2"))
 
         self._validate()
 
@@ -42,9 +203,253 @@ class Settings:
         """
         Validate required configuration.
         """
-        if not self.GOOGLE_API_KEY:
+        if self.LLM_PROVIDER not in ("gemini", "local"):
+            raise EnvironmentError("LLM_PROVIDER must be 'gemini' or 'local'.")
+
+        if self.LLM_PROVIDER == "gemini" and not self.GOOGLE_API_KEY:
             raise EnvironmentError("GOOGLE_API_KEY is required in .env file.")
 
+        if self.DEFAULT_ACCOUNT not in self.ACCOUNTS:
+            raise EnvironmentError(f"DEFAULT_ACCOUNT '{self.DEFAULT_ACCOUNT}' is not in BINANCE_ACCOUNTS.")
+
+        if self.PROFILE_MODE not in ("", "request", "window"):
+            raise EnvironmentError("PROFILE_MODE must be empty, 'request' or 'window'.")
+
+        if self.LOG_LEVEL not in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+            raise EnvironmentError(f"Unknown LOG_LEVEL: {self.LOG_LEVEL}")
+
+        for entry in filter(None, (part.strip() for part in self.RISK_MAX_QTY.split(","))):
+            _, _, limit = entry.partition(":")
+            try:
+                float(limit)
+            except ValueError:
+                raise EnvironmentError(f"RISK_MAX_QTY entries must be SYMBOL:QUANTITY, got '{entry}'.") from None
+
+        for entry in filter(None, (part.strip() for part in self.SYMBOL_PRECISION.split(","))):
+            try:
+                _, quantity, price = entry.split(":")
+                int(quantity), int(price)
+            except ValueError:
+                raise EnvironmentError(f"SYMBOL_PRECISION entries must be SYMBOL:QTY:PRICE, got '{entry}'.") from None
+
+    def changes(self, other: "Settings") -> Set[str]:
+        """
+        Names of the settings whose values differ from `other`.
+        """
+
+        mine, theirs = vars(self), vars(other)
+        return {name for name in mine.keys() | theirs.keys() if name != "version" and mine.get(name) != theirs.get(name)}
+
+
+# =========================================================
+# ======================= HOT RELOAD ======================
+# =========================================================
+# The configuration file (CONFIG_FILE, default: the .env found as before)
+# is re-read when it changes, without a restart. Each load builds a new
+# Settings snapshot with the next version number, validated before it
+# is swapped in with one reference assignment; a broken file leaves the
+# running snapshot in place. Subscribers (log level, account clients and
+# rate limiters, the LLM provider) then reconfigure what changed.
+#
+# `settings` forwards to the snapshot that applies to the caller: the
+# one pinned for the current request (pin_settings(), used by run_agent
+# and OrderService.submit) or else the latest. An order in flight during
+# a reload finishes with the settings it started with.
+#
+# Variables set in the process environment win over the file, as with
+# load_dotenv(); a variable removed from the file is unset again.
+# OUTBOX_DIR, TRACE_FILE, PROFILE_*, SNAPSHOT_*, AGENT_WORKERS, API_HOST,
+# API_PORT and API_AGENT_WORKERS are read when their components start
+# and still need a restart.
+
+CONFIG_FILE = os.getenv("CONFIG_FILE") or find_dotenv()
+
+_process_keys = frozenset(os.environ)
+_file_keys: Set[str] = set()
+
+Subscriber = Callable[[Settings, Settings, Set[str]], None]
+
+
+def _load_env_file(path: str):
+    global _file_keys
+
+    values = dotenv_values(path) if path and os.path.exists(path) else {}
+    values = {key: value for key, value in values.items() if value is not None and key not in _process_keys}
+
+    for key in _file_keys - values.keys():
+        os.environ.pop(key, None)
+    os.environ.update(values)
+    _file_keys = set(values)
+
+
+_load_env_file(CONFIG_FILE)
+
+_latest = Settings()
+_snapshots: "WeakValueDictionary[int, Settings]" = WeakValueDictionary({_latest.version: _latest})
+_pinned: contextvars.ContextVar[Optional[Settings]] = contextvars.ContextVar("pinned_settings", default=None)
+_subscribers: List[Subscriber] = []
+_reload_lock = threading.Lock()
+
+
+def current_settings() -> Settings:
+    """
+    The snapshot pinned for this request, else the latest one.
+    """
+
+    return _pinned.get() or _latest
+
+
+@contextmanager
+def pin_settings(snapshot: Union[None, int, Settings] = None) -> Iterator[Settings]:
+    """
+    Make `snapshot` (a Settings, or a version number) what `settings`
+    returns inside the block, in this thread and in contexts copied
+    from it. None pins the current one, so nested pins keep the outer
+    snapshot. A version that is no longer held pins the latest.
+    """
+
+    if snapshot is None:
+        snapshot = current_settings()
+    elif isinstance(snapshot, int):
+        snapshot = _snapshots.get(snapshot) or _latest
+
+    token = _pinned.set(snapshot)
+    try:
+        yield snapshot
+    finally:
+        _pinned.reset(token)
+
+
+def subscribe(callback: Subscriber):
+    """
+    Call `callback(old, new, changed_names)` after every reload that
+    changed something, on the reloading thread.
+    """
+
+    _subscribers.append(callback)
+
+
+def reload_settings() -> Optional[Settings]:
+    """
+    Re-read CONFIG_FILE and swap in a new snapshot if anything changed.
+    Returns it, or None when nothing changed or the new values are invalid.
+    """
+
+    with _reload_lock:
+        _load_env_file(CONFIG_FILE)
+
+        old = _latest
+        try:
+            new = Settings(version=old.version + 1)
+        except (EnvironmentError, ValueError) as e:
+            logger.error(f"[CONFIG] Reload rejected, keeping version {old.version}: {e}")
+            return None
+
+        changed = new.changes(old)
+        if not changed:
+            return None
+
+        _publish(old, new, changed)
+        return new
+
+
+def _publish(old: Settings, new: Settings, changed: Set[str]):
+    # Caller holds _reload_lock.
+    global _latest
+
+    _snapshots[new.version] = new
+    _latest = new
+    # Names only: values may be credentials.
+    logger.info(f"[CONFIG] Version {new.version}: {', '.join(sorted(changed))}")
+
+    # Subscribers see the new snapshot even if the caller has one pinned.
+    with pin_settings(new):
+        for callback in list(_subscribers):
+            try:
+                callback(old, new, changed)
+            except Exception:
+                logger.error(f"[CONFIG] Subscriber {callback.__qualname__} failed.", exc_info=True)
+
+
+class ConfigWatcher:
+    """
+    Polls CONFIG_FILE's mtime and size every `interval` seconds and
+    reloads when either changed.
+    """
+
+    def __init__(self, path: str, interval: float):
+        self.path = path
+        self.interval = interval
+        self._stamp = self._stat()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            stamp = self._stat()
+            if stamp != self._stamp:
+                self._stamp = stamp
+                reload_settings()
+
+    def close(self):
+        self._stopped.set()
+        self._thread.join()
+
+
+_watcher: Optional[ConfigWatcher] = None
+
+
+def watch_settings() -> Optional[ConfigWatcher]:
+    """
+    Start the process-wide watcher (once); None when there is no
+    CONFIG_FILE or CONFIG_RELOAD_INTERVAL_S is 0.
+    """
+
+    global _watcher
+
+    with _reload_lock:
+        if _watcher is None and CONFIG_FILE and _latest.CONFIG_RELOAD_INTERVAL_S > 0:
+            _watcher = ConfigWatcher(CONFIG_FILE, _latest.CONFIG_RELOAD_INTERVAL_S)
+
+    return _watcher
+
+
+class SettingsProxy:
+    """
+    `settings`: attribute access goes to current_settings(). Assignment
+    (runtime overrides such as `cli.py --profile`) publishes a copy of
+    the latest snapshot with the new value and the next version, like a
+    reload; snapshots already pinned never change under their readers.
+    The copy is deep, so no two snapshots share a mutable value such as
+    ACCOUNTS.
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str):
+        return getattr(current_settings(), name)
+
+    def __setattr__(self, name: str, value):
+        with _reload_lock:
+            old = _latest
+            new = copy.deepcopy(old)
+            new.version = old.version + 1
+            setattr(new, name, copy.deepcopy(value))
+            changed = new.changes(old)
+            if changed:
+                _publish(old, new, changed)
+
+    def __repr__(self) -> str:
+        return f"<settings version={current_settings().version}>"
+
 
 # Singleton instance
-settings = Settings()
\ No newline at end of file
+settings = SettingsProxy()
\ No newline at end of file
@@ -0,0 +1,251 @@
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from typing import Any, Dict, Optional
+
+from bot.config import settings, subscribe
+
+# =========================================================
+# ================= FIXED-POINT QUANTITIES ================
+# =========================================================
+# Quantities and prices are held as integers scaled by the symbol's
+# precision: with 3 quantity decimals, 0.015 BTC is 15 units. Integer
+# arithmetic is exact, cheap to compare and hash (stable dedup keys),
+# and formatting back to the wire string never goes through float.
+
+
+@dataclass(frozen=True, slots=True)
+class SymbolPrecision:
+    """
+    Number of decimals the exchange accepts for a symbol's quantity and price.
+    """
+
+    quantity: int
+    price: int
+
+
+# Binance USDⓈ-M futures precisions for the symbols used in this project.
+# Unknown symbols fall back to DEFAULT_PRECISION; override or extend with
+# SYMBOL_PRECISION=SYMBOL:QTY:PRICE,... in .env. A reloaded value applies
+# to values parsed after the reload; orders, reports and books keep the
+# precision their units were scaled at and rescale() across a change.
+SYMBOL_PRECISION: Dict[str, SymbolPrecision] = {
+    "BTCUSDT": SymbolPrecision(3, 1),
+    "ETHUSDT": SymbolPrecision(3, 2),
+    "BNBUSDT": SymbolPrecision(2, 2),
+    "SOLUSDT": SymbolPrecision(0, 2),
+    "XRPUSDT": SymbolPrecision(1, 4),
+}
+
+DEFAULT_PRECISION = SymbolPrecision(8, 8)
+
+
+# symbol → its precision before the current SYMBOL_PRECISION override
+# (None: not in the table), so a reload can undo entries it drops.
+_overridden: Dict[str, Optional[SymbolPrecision]] = {}
+
+
+def _load_overrides(spec: str):
+    for symbol, previous in _overridden.items():
+        if previous is None:
+            SYMBOL_PRECISION.pop(symbol, None)
+        else:
+            SYMBOL_PRECISION[symbol] = previous
+    _overridden.clear()
+
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        symbol, quantity, price = entry.split(":")
+        symbol = symbol.strip().upper()
+        _overridden.setdefault(symbol, SYMBOL_PRECISION.get(symbol))
+        SYMBOL_PRECISION[symbol] = SymbolPrecision(int(quantity), int(price))
+
+
+if settings.SYMBOL_PRECISION:
+    _load_overrides(settings.SYMBOL_PRECISION)
+
+
+def _on_settings_change(old, new, changed):
+    if "SYMBOL_PRECISION" in changed:
+        _load_overrides(new.SYMBOL_PRECISION)
+
+
+subscribe(_on_settings_change)
+
+
+def precision_for(symbol: str) -> SymbolPrecision:
+    return SYMBOL_PRECISION.get(symbol, DEFAULT_PRECISION)
+
+
+def register_precision(symbol: str, quantity: int, price: int):
+    """
+    Set a symbol's precision, e.g. from the exchangeInfo endpoint.
+    """
+
+    SYMBOL_PRECISION[symbol.upper()] = SymbolPrecision(quantity, price)
+
+
+# =========================================================
+# ===================== PARSE / FORMAT ====================
+# =========================================================
+
+_POW10 = [10 ** i for i in range(19)]
+
+
+def _pow10(decimals: int) -> int:
+    return _POW10[decimals] if decimals < len(_POW10) else 10 ** decimals
+
+
+_ZEROS = ["0" * i for i in range(19)]
+
+
+def _parse_text(text: str, decimals: int, exact: bool) -> int:
+    """
+    Fast path for plain decimal strings ("12", "-0.5", ".25"): pad the
+    fraction to `decimals` digits and let int() do the work. Exponent
+    forms and anything unusual go through Decimal.
+    """
+
+    whole, _, frac = text.partition(".")
+    extra = len(frac) - decimals
+
+    if extra > 0:
+        if not frac.isdigit():
+            return _parse_decimal(text, decimals, exact)
+        if frac[decimals:].strip("0"):
+            if exact:
+                raise ValueError(f"{text} has more than {decimals} decimal places.")
+            return _parse_decimal(text, decimals, exact)
+        frac = frac[:decimals]
+        extra = 0
+
+    digits = whole + frac
+
+    # int() would also accept "", "_" separators, inner signs and non-ASCII digits.
+    if not digits.lstrip("+-") or "_" in digits or not digits.isascii() or decimals > 18:
+        return _parse_decimal(text, decimals, exact)
+
+    try:
+        return int(digits + _ZEROS[-extra] if extra else digits)
+    except ValueError:
+        return _parse_decimal(text, decimals, exact)
+
+
+def _parse_decimal(value: Any, decimals: int, exact: bool) -> int:
+    # Decimal() would also take non-ASCII digits ("٣", "１"); orders are ASCII only.
+    if isinstance(value, str) and not value.isascii():
+        raise ValueError(f"Invalid number: {value!r}")
+
+    try:
+        number = value if isinstance(value, Decimal) else Decimal(value)
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError(f"Invalid number: {value!r}")
+
+    if not number.is_finite():
+        raise ValueError(f"Invalid number: {value!r}")
+
+    scaled = number.scaleb(decimals)
+    units = scaled.to_integral_value(rounding=ROUND_HALF_EVEN)
+
+    if exact and units != scaled:
+        raise ValueError(f"{number} has more than {decimals} decimal places.")
+
+    return int(units)
+
+
+def to_units(value: Any, decimals: int) -> int:
+    """
+    Scaled integer for `value` at `decimals` places.
+
+    Exact for every type: extra non-zero decimals raise ValueError rather
+    than being rounded, so what the caller gave is what the exchange
+    gets (or nothing). Floats are taken at their shortest repr, so 0.01
+    is "0.01" but 0.1 + 0.2 ("0.30000000000000004") is rejected. Use
+    round_units() for measured values (fill prices) that may carry more
+    decimals than the symbol's precision.
+    """
+
+    kind = type(value)
+
+    if kind is int:
+        return value * _pow10(decimals)
+
+    if kind is str:
+        # Fast path: unsigned plain decimal with no excess digits.
+        whole, _, frac = value.strip().partition(".")
+        digits = whole + frac
+        if len(frac) <= decimals and digits.isascii() and digits.isdecimal() and decimals < 19:
+            return int(digits) * _POW10[decimals - len(frac)]
+        return _parse_text(value.strip(), decimals, exact=True)
+
+    if kind is float:
+        if value != value or value in (float("inf"), float("-inf")):
+            raise ValueError(f"Invalid number: {value!r}")
+        return _parse_text(repr(value), decimals, exact=True)
+
+    if kind is Decimal:
+        return _parse_decimal(value, decimals, exact=True)
+
+    raise ValueError(f"Invalid number: {value!r}")
+
+
+def round_units(value: Any, decimals: int) -> int:
+    """
+    Scaled integer for `value` rounded half-even to `decimals` places.
+    Only for values observed rather than requested, e.g. replayed trade
+    prices; order fields go through to_units().
+    """
+
+    if type(value) is float:
+        if value != value or value in (float("inf"), float("-inf")):
+            raise ValueError(f"Invalid number: {value!r}")
+        return _parse_text(repr(value), decimals, exact=False)
+
+    return _parse_decimal(value if isinstance(value, Decimal) else str(value), decimals, exact=False)
+
+
+def format_units(units: int, decimals: int) -> str:
+    """
+    Canonical plain-notation string for a scaled integer: no exponent,
+    no trailing zeros ("0.01", "45000").
+    """
+
+    if units < 0:
+        return "-" + format_units(-units, decimals)
+
+    whole, frac = divmod(units, _pow10(decimals))
+    if not frac:
+        return str(whole)
+
+    return f"{whole}.{str(frac).rjust(decimals, '0').rstrip('0')}"
+
+
+def to_float(units: int, decimals: int) -> float:
+    """
+    Float value of a scaled integer, for analytics that run on floats.
+    """
+
+    return units / _pow10(decimals)
+
+
+def to_decimal(units: int, decimals: int) -> Decimal:
+    return Decimal(units).scaleb(-decimals)
+
+
+def rescale(units: int, from_decimals: int, to_decimals: int, exact: bool = True) -> int:
+    """
+    Re-express a scaled integer at another precision. With exact=True a
+    value that needs more than `to_decimals` places raises ValueError;
+    otherwise it is rounded half-even.
+    """
+
+    if to_decimals >= from_decimals:
+        return units * _pow10(to_decimals - from_decimals)
+
+    step = _pow10(from_decimals - to_decimals)
+    whole, rest = divmod(units, step)
+    if not rest:
+        return whole
+    if exact:
+        raise ValueError(f"{format_units(units, from_decimals)} has more than {to_decimals} decimal places")
+    if rest * 2 > step or (rest * 2 == step and whole % 2):
+        whole += 1
+    return whole
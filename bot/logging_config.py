@@ -1,7 +1,23 @@
 import logging
 import os
 from logging.handlers import RotatingFileHandler
-from bot.config import settings
+from bot.config import settings, subscribe
+from bot.tracing import current_span
+
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(trace)s%(message)s"
+
+
+class TraceFormatter(logging.Formatter):
+    """
+    Adds "trace=<trace id> | " to lines logged inside a span (bot/tracing.py),
+    so a request's log lines can be found from its trace and vice versa.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not hasattr(record, "trace"):
+            current = current_span()
+            record.trace = f"trace={current.trace_id} | " if current is not None else ""
+        return super().format(record)
 
 
 def setup_logging():
@@ -24,10 +40,10 @@ def setup_logging():
     if logger.handlers:
         return logger
 
+    subscribe(_apply_log_level)
+
     # Log format
-    formatter = logging.Formatter(
-        "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
-    )
+    formatter = TraceFormatter(LOG_FORMAT)
 
     # =========================
     # File Handler (Rotating)
@@ -50,4 +66,49 @@ def setup_logging():
     logger.addHandler(file_handler)
     logger.addHandler(console_handler)
 
-    return logger
\ No newline at end of file
+    return logger
+
+
+def _apply_log_level(old, new, changed):
+    """
+    Settings subscriber: apply a reloaded LOG_LEVEL to the root logger
+    and its handlers.
+    """
+
+    if "LOG_LEVEL" not in changed:
+        return
+
+    root = logging.getLogger()
+    root.setLevel(new.LOG_LEVEL)
+    for handler in root.handlers:
+        handler.setLevel(new.LOG_LEVEL)
+
+
+def read_log_tail(path: str = None, lines: int = 80, block_size: int = 8192) -> str:
+    """
+    Return the last `lines` lines of the log file.
+    Reads backwards from the end in blocks instead of loading the whole
+    file, so the cost stays flat as the log grows towards its rotation size.
+    """
+
+    path = path or settings.LOG_FILE
+
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        chunks = []
+        newlines = 0
+
+        # One extra newline: the file normally ends with "\n".
+        while position > 0 and newlines <= lines:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+
+    data = b"".join(reversed(chunks))
+    tail = data.splitlines(keepends=True)[-lines:]
+
+    return b"".join(tail).decode("utf-8", errors="replace")
@@ -0,0 +1,142 @@
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+# Default latency buckets in milliseconds (upper bounds).
+LATENCY_BUCKETS_MS = (
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+    1000, 2500, 5000, 10000, 30000, 60000,
+)
+
+
+class Counter:
+    """
+    Monotonic counter.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    """
+    Last-value metric (e.g. circuit breaker state).
+    """
+
+    def __init__(self):
+        self.value: Any = None
+
+    def set(self, value: Any):
+        self.value = value
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Observations are O(log buckets) and the
+    memory footprint does not grow with the number of samples.
+    """
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS_MS):
+        self._lock = threading.Lock()
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.bounds, value)
+
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += value
+            self.min = value if self.min is None or value < self.min else self.min
+            self.max = value if self.max is None or value > self.max else self.max
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket containing the q-th percentile (0-100).
+        """
+
+        with self._lock:
+            if not self.count:
+                return None
+
+            rank = q / 100 * self.count
+            seen = 0
+            for index, bucket_count in enumerate(self.counts):
+                seen += bucket_count
+                if seen >= rank and bucket_count:
+                    return min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide registry of named metrics.
+    Metrics are created on first use, so callers never have to declare them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Counter] = {}
+        self._gauges: Dict[str, Gauge] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def counter(self, name: str) -> Counter:
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = Counter()
+            return self._counters[name]
+
+    def gauge(self, name: str) -> Gauge:
+        with self._lock:
+            if name not in self._gauges:
+                self._gauges[name] = Gauge()
+            return self._gauges[name]
+
+    def histogram(self, name: str, bounds: Sequence[float] = LATENCY_BUCKETS_MS) -> Histogram:
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(bounds)
+            return self._histograms[name]
+
+    def snapshot(self, prefix: str = "") -> Dict[str, Any]:
+        with self._lock:
+            counters = {k: c.value for k, c in self._counters.items() if k.startswith(prefix)}
+            gauges = {k: g.value for k, g in self._gauges.items() if k.startswith(prefix)}
+            histograms = [(k, h) for k, h in self._histograms.items() if k.startswith(prefix)]
+
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": {k: h.snapshot() for k, h in histograms},
+        }
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted([*self._counters, *self._gauges, *self._histograms])
+
+
+# Singleton instance
+metrics = MetricsRegistry()
@@ -1,42 +1,265 @@
+import dataclasses
 import logging
 import random
+import threading
 import time
+from typing import Any, Dict, List, Optional
+
+from bot.fixedpoint import format_units, precision_for, rescale
+from bot.models import ExecutionReport
+from bot.validators import ValidationError
 
 logger = logging.getLogger(__name__)
 
 
+class MockOrderBook:
+    """
+    Resting orders, positions and balances of one simulated account.
+    Shared by every mock client of that account (see bot/accounts.py),
+    the way all connections to the exchange see the same open orders.
+    """
+
+    # Beyond this many resting orders the oldest are dropped (as if they
+    # expired), so long benchmark runs don't grow the book without bound.
+    MAX_ORDERS = 10000
+
+    # Simulated wallet: the mock books no PnL, so balances stay put.
+    STARTING_BALANCE = "10000"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.orders: Dict[int, ExecutionReport] = {}
+        # Client order id → the order as placed, for order lookups.
+        self.placed: Dict[str, ExecutionReport] = {}
+        # Net position per symbol in scaled quantity units (negative = short),
+        # at the decimals in position_decimals (the symbol's precision when
+        # first filled), so a SYMBOL_PRECISION reload doesn't rescale it.
+        self.positions: Dict[str, int] = {}
+        self.position_decimals: Dict[str, int] = {}
+        self.balances: Dict[str, str] = {"USDT": self.STARTING_BALANCE}
+
+    def add(self, report: ExecutionReport, client_order_id: Optional[str] = None):
+        with self.lock:
+            if report.status == "NEW":
+                self.orders[report.order_id] = report
+                if len(self.orders) > self.MAX_ORDERS:
+                    del self.orders[next(iter(self.orders))]
+            if client_order_id:
+                self.placed[client_order_id] = report
+                if len(self.placed) > self.MAX_ORDERS:
+                    del self.placed[next(iter(self.placed))]
+            if report.executed_qty:
+                decimals = self.position_decimals.setdefault(report.symbol, report.precision.quantity)
+                executed = rescale(report.executed_qty, report.precision.quantity, decimals, exact=False)
+                signed = executed if report.side == "BUY" else -executed
+                self.positions[report.symbol] = self.positions.get(report.symbol, 0) + signed
+
+    def position_text(self, symbol: str) -> str:
+        # Caller holds the lock.
+        decimals = self.position_decimals.get(symbol, precision_for(symbol).quantity)
+        return format_units(self.positions.get(symbol, 0), decimals)
+
+    def reducible(self, symbol: str, side: str, quantity: int) -> int:
+        """
+        Quantity a reduce-only order may fill: capped at the position it
+        reduces. Raises ValidationError when there is none on that side.
+        """
+
+        decimals = precision_for(symbol).quantity
+        with self.lock:
+            held = self.positions.get(symbol, 0)
+            held = rescale(held, self.position_decimals.get(symbol, decimals), decimals, exact=False)
+
+        if (side == "SELL" and held <= 0) or (side == "BUY" and held >= 0):
+            raise ValidationError(f"ReduceOnly order rejected: no {symbol} position for a {side} to reduce.")
+        return min(quantity, abs(held))
+
+
 class MockBinanceFuturesClient:
     """
     Simulates Binance Futures execution.
     Used when USE_MOCK=True.
+    Quantities and prices are scaled integers (see bot/fixedpoint.py).
+
+    LIMIT orders rest in the book until cancelled. Reduce-only MARKET
+    orders fill at most the open position. Every call costs one
+    simulated round-trip, including the batch endpoints, so batching
+    shows up in both `round_trips` and wall time.
     """
 
-    def place_market_order(self, symbol: str, side: str, quantity: float):
-        logger.info(f"[MOCK] MARKET order | {symbol} | {side} | qty={quantity}")
-        time.sleep(1)
-
-        return {
-            "symbol": symbol,
-            "side": side,
-            "type": "MARKET",
-            "status": "FILLED",
-            "orderId": random.randint(1000000, 9999999),
-            "price": "0",
-            "origQty": str(quantity),
-            "executedQty": str(quantity),
-        }
-
-    def place_limit_order(self, symbol: str, side: str, quantity: float, price: float):
-        logger.info(f"[MOCK] LIMIT order | {symbol} | {side} | qty={quantity} | price={price}")
-        time.sleep(1)
-
-        return {
-            "symbol": symbol,
-            "side": side,
-            "type": "LIMIT",
-            "status": "NEW",
-            "orderId": random.randint(1000000, 9999999),
-            "price": str(price),
-            "origQty": str(quantity),
-            "executedQty": "0",
-        }
\ No newline at end of file
+    # DELETE /fapi/v1/batchOrders accepts at most 10 order ids.
+    BATCH_CANCEL_LIMIT = 10
+
+    def __init__(self, latency: float = 1.0, book: Optional[MockOrderBook] = None):
+        # Simulated exchange round-trip in seconds.
+        self.latency = latency
+        self.book = book or MockOrderBook()
+        self.round_trips = 0
+
+    def _round_trip(self):
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def place_market_order(
+        self, symbol: str, side: str, quantity: int, client_order_id: Optional[str] = None, reduce_only: bool = False
+    ) -> ExecutionReport:
+        precision = precision_for(symbol)
+        logger.info(f"[MOCK] MARKET order | {symbol} | {side} | qty={format_units(quantity, precision.quantity)}")
+        self._round_trip()
+
+        if reduce_only:
+            quantity = self.book.reducible(symbol, side, quantity)
+
+        report = ExecutionReport(
+            order_id=random.randint(1000000, 9999999),
+            symbol=symbol,
+            side=side,
+            order_type="MARKET",
+            status="FILLED",
+            orig_qty=quantity,
+            executed_qty=quantity,
+        )
+
+        self.book.add(report, client_order_id)
+
+        return report
+
+    def place_limit_order(
+        self, symbol: str, side: str, quantity: int, price: int, client_order_id: Optional[str] = None,
+        reduce_only: bool = False,
+    ) -> ExecutionReport:
+        precision = precision_for(symbol)
+        logger.info(
+            f"[MOCK] LIMIT order | {symbol} | {side} | qty={format_units(quantity, precision.quantity)} | "
+            f"price={format_units(price, precision.price)}"
+        )
+        self._round_trip()
+
+        report = ExecutionReport(
+            order_id=random.randint(1000000, 9999999),
+            symbol=symbol,
+            side=side,
+            order_type="LIMIT",
+            status="NEW",
+            price=price,
+            orig_qty=quantity,
+        )
+
+        self.book.add(report, client_order_id)
+
+        return report
+
+    def get_account(self) -> Dict[str, Any]:
+        """
+        Balances and positions in the GET /fapi/v2/account shape.
+        """
+
+        self._round_trip()
+
+        with self.book.lock:
+            return {
+                "assets": [
+                    {"asset": asset, "walletBalance": amount, "availableBalance": amount}
+                    for asset, amount in self.book.balances.items()
+                ],
+                "positions": [
+                    {"symbol": symbol, "positionAmt": self.book.position_text(symbol)}
+                    for symbol in self.book.positions
+                ],
+            }
+
+    # -----------------------------------------------------
+    # Open-order management
+    # -----------------------------------------------------
+
+    def get_open_orders(self, symbol: Optional[str] = None) -> List[ExecutionReport]:
+        self._round_trip()
+
+        with self.book.lock:
+            return [o for o in self.book.orders.values() if symbol is None or o.symbol == symbol]
+
+    def get_order(self, symbol: str, client_order_id: str) -> Optional[ExecutionReport]:
+        """
+        Order lookup by client order id; None if the exchange never saw it.
+        """
+
+        self._round_trip()
+
+        with self.book.lock:
+            report = self.book.placed.get(client_order_id)
+            if report is None or report.symbol != symbol:
+                return None
+            if report.status == "NEW":
+                # Still resting (possibly amended), or cancelled since.
+                return self.book.orders.get(report.order_id) or dataclasses.replace(report, status="CANCELED")
+            return report
+
+    def _cancel(self, symbol: str, order_id: int) -> Optional[ExecutionReport]:
+        # Caller holds the book lock.
+        report = self.book.orders.get(order_id)
+        if report is None or report.symbol != symbol:
+            return None
+
+        del self.book.orders[order_id]
+        return dataclasses.replace(report, status="CANCELED")
+
+    def cancel_order(self, symbol: str, order_id: int) -> ExecutionReport:
+        logger.info(f"[MOCK] CANCEL order | {symbol} | {order_id}")
+        self._round_trip()
+
+        with self.book.lock:
+            report = self._cancel(symbol, order_id)
+
+        if report is None:
+            raise ValidationError(f"Unknown order {order_id} on {symbol}.")
+        return report
+
+    def cancel_orders(self, symbol: str, order_ids: List[int]) -> List[Optional[ExecutionReport]]:
+        """
+        Batch cancel: one entry per id, None where the order is unknown.
+        """
+
+        if len(order_ids) > self.BATCH_CANCEL_LIMIT:
+            raise ValidationError(f"At most {self.BATCH_CANCEL_LIMIT} orders per batch cancel.")
+
+        logger.info(f"[MOCK] BATCH CANCEL | {symbol} | {len(order_ids)} orders")
+        self._round_trip()
+
+        with self.book.lock:
+            return [self._cancel(symbol, order_id) for order_id in order_ids]
+
+    def cancel_all_orders(self, symbol: str) -> List[ExecutionReport]:
+        logger.info(f"[MOCK] CANCEL ALL | {symbol}")
+        self._round_trip()
+
+        with self.book.lock:
+            ids = [order_id for order_id, o in self.book.orders.items() if o.symbol == symbol]
+            return [self._cancel(symbol, order_id) for order_id in ids]
+
+    def modify_order(self, symbol: str, order_id: int, side: str, quantity: int, price: int) -> ExecutionReport:
+        precision = precision_for(symbol)
+        logger.info(
+            f"[MOCK] MODIFY order | {symbol} | {order_id} | qty={format_units(quantity, precision.quantity)} | "
+            f"price={format_units(price, precision.price)}"
+        )
+        self._round_trip()
+
+        with self.book.lock:
+            report = self.book.orders.get(order_id)
+            if report is None or report.symbol != symbol:
+                raise ValidationError(f"Unknown order {order_id} on {symbol}.")
+            if side != report.side:
+                raise ValidationError(f"Order {order_id} is a {report.side} order; side cannot be changed.")
+            try:
+                report = report.at_precision(precision)
+            except ValueError as e:
+                raise ValidationError(f"Order {order_id} does not fit the {symbol} precision: {e}") from None
+            if quantity < report.executed_qty:
+                executed = format_units(report.executed_qty, precision.quantity)
+                raise ValidationError(f"Quantity cannot be below the {executed} already executed.")
+
+            report = dataclasses.replace(report, orig_qty=quantity, price=price)
+            self.book.orders[order_id] = report
+
+        return report
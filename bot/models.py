@@ -0,0 +1,350 @@
+import sys
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from bot.fixedpoint import SymbolPrecision, format_units, precision_for, rescale, to_units
+
+# =========================================================
+# ===================== ORDER MODELS ======================
+# =========================================================
+# Orders and exchange results travel between the agent, validators,
+# OrderService and clients as these immutable, slotted objects instead
+# of dicts. Quantities and prices are integers scaled by the symbol's
+# precision (bot/fixedpoint.py), so the value a user typed is exactly
+# the value sent to the exchange; strings and dicts are only built at
+# the edges (wire, JSON, UI). Each object keeps the precision its units
+# were scaled at (`decimals`), so a SYMBOL_PRECISION reload never
+# reinterprets one already built.
+
+
+def _token(value: Optional[str]) -> str:
+    # Symbols, sides and types come from a tiny vocabulary; interning keeps
+    # one copy per distinct value however many orders are held.
+    return sys.intern((value or "").strip().upper())
+
+
+def _fmt(units: Optional[int], decimals: int) -> Optional[str]:
+    return None if units is None else format_units(units, decimals)
+
+
+def _rescale(units: Optional[int], from_decimals: int, to_decimals: int) -> Optional[int]:
+    return None if units is None else rescale(units, from_decimals, to_decimals)
+
+
+def _pin_precision(model):
+    # Default `decimals` to the symbol's precision at construction.
+    if model.decimals is None:
+        object.__setattr__(model, "decimals", precision_for(model.symbol))
+
+
+@dataclass(frozen=True, slots=True)
+class AlgoParams:
+    """
+    Execution-algorithm parameters of a parent order.
+    """
+
+    algo: str
+    duration_seconds: Optional[float] = None
+    slices: Optional[int] = None
+    clip_size: Optional[float] = None
+    grid_levels: Optional[int] = None
+    grid_step: Optional[float] = None
+
+
+@dataclass(frozen=True, slots=True)
+class Order:
+    """
+    An order request as it moves from parsing to the client.
+    `quantity` and `price` are scaled integers at the symbol's precision.
+    A `reduce_only` order may only shrink the position, never open or
+    flip one (position closes).
+    """
+
+    symbol: str
+    side: str
+    order_type: str
+    quantity: Optional[int]
+    price: Optional[int] = None
+    algo: Optional[AlgoParams] = None
+    reduce_only: bool = False
+    decimals: Optional[SymbolPrecision] = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        _pin_precision(self)
+
+    @classmethod
+    def create(
+        cls,
+        symbol: str,
+        side: str,
+        order_type: str,
+        quantity: Any,
+        price: Any = None,
+        algo: Optional[str] = None,
+        **algo_fields,
+    ) -> "Order":
+        """
+        Normalize raw fields (case, numbers → scaled integers) into an Order.
+        Extra keyword arguments are the AlgoParams fields. Raises ValueError
+        for non-numeric values or more decimals than the symbol allows.
+        """
+
+        params = None
+        if algo:
+            params = AlgoParams(algo=algo.upper(), **{k: v for k, v in algo_fields.items() if v is not None})
+
+        symbol = _token(symbol)
+        precision = precision_for(symbol)
+
+        try:
+            quantity = None if quantity is None else to_units(quantity, precision.quantity)
+        except ValueError as e:
+            raise ValueError(f"Invalid quantity for {symbol}: {e}") from None
+
+        try:
+            price = None if price is None else to_units(price, precision.price)
+        except ValueError as e:
+            raise ValueError(f"Invalid price for {symbol}: {e}") from None
+
+        return cls(
+            symbol=symbol,
+            side=_token(side),
+            order_type=_token(order_type),
+            quantity=quantity,
+            price=price,
+            algo=params,
+            decimals=precision,
+        )
+
+    @property
+    def precision(self) -> SymbolPrecision:
+        return self.decimals
+
+    def at_precision(self, precision: SymbolPrecision) -> "Order":
+        """
+        This order with its units re-expressed at `precision`. Raises
+        ValueError if the quantity or price needs more decimals than that.
+        """
+
+        if precision == self.decimals:
+            return self
+        return replace(
+            self,
+            quantity=_rescale(self.quantity, self.decimals.quantity, precision.quantity),
+            price=_rescale(self.price, self.decimals.price, precision.price),
+            decimals=precision,
+        )
+
+    @property
+    def quantity_text(self) -> Optional[str]:
+        return _fmt(self.quantity, self.precision.quantity)
+
+    @property
+    def price_text(self) -> Optional[str]:
+        return _fmt(self.price, self.precision.price)
+
+    def __str__(self) -> str:
+        text = f"{self.symbol} {self.side} {self.order_type} qty={self.quantity_text} price={self.price_text}"
+        if self.reduce_only:
+            text += " reduce-only"
+        return f"{text} algo={self.algo.algo}" if self.algo is not None else text
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "symbol": self.symbol,
+            "side": self.side,
+            "order_type": self.order_type,
+            "quantity": self.quantity_text,
+            "price": self.price_text,
+        }
+
+        if self.reduce_only:
+            data["reduce_only"] = True
+
+        if self.algo is not None:
+            data["algo"] = self.algo.algo
+            for name in ("duration_seconds", "slices", "clip_size", "grid_levels", "grid_step"):
+                data[name] = getattr(self.algo, name)
+
+        return data
+
+
+@dataclass(frozen=True, slots=True)
+class ExecutionReport:
+    """
+    The exchange's answer to one order, in the same scaled integers as Order.
+    """
+
+    order_id: Any
+    symbol: str
+    side: str
+    order_type: str
+    status: str
+    price: int = 0
+    orig_qty: int = 0
+    executed_qty: int = 0
+    decimals: Optional[SymbolPrecision] = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        _pin_precision(self)
+
+    @property
+    def precision(self) -> SymbolPrecision:
+        return self.decimals
+
+    def at_precision(self, precision: SymbolPrecision) -> "ExecutionReport":
+        """
+        This report with its units re-expressed at `precision`, like
+        Order.at_precision.
+        """
+
+        if precision == self.decimals:
+            return self
+        return replace(
+            self,
+            price=rescale(self.price, self.decimals.price, precision.price),
+            orig_qty=rescale(self.orig_qty, self.decimals.quantity, precision.quantity),
+            executed_qty=rescale(self.executed_qty, self.decimals.quantity, precision.quantity),
+            decimals=precision,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Binance-style field names with string numbers, as shown in the UI/CLI.
+        """
+
+        precision = self.precision
+
+        return {
+            "orderId": self.order_id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "type": self.order_type,
+            "status": self.status,
+            "price": _fmt(self.price, precision.price),
+            "origQty": _fmt(self.orig_qty, precision.quantity),
+            "executedQty": _fmt(self.executed_qty, precision.quantity),
+        }
+
+
+# =========================================================
+# ================= OPEN-ORDER MANAGEMENT =================
+# =========================================================
+
+CANCEL = "CANCEL"
+CANCEL_ALL = "CANCEL_ALL"
+MODIFY = "MODIFY"
+CLOSE = "CLOSE"
+
+
+@dataclass(frozen=True, slots=True)
+class OrderAction:
+    """
+    A request to manage resting orders rather than place one: cancel
+    some orders by id, cancel all (optionally one side) on a symbol,
+    amend a resting LIMIT order's quantity and price, or close (part
+    of) the position on a symbol.
+    """
+
+    action: str
+    symbol: str
+    order_ids: Tuple[int, ...] = ()
+    side: Optional[str] = None
+    quantity: Optional[int] = None
+    price: Optional[int] = None
+    decimals: Optional[SymbolPrecision] = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        _pin_precision(self)
+
+    @classmethod
+    def create(
+        cls,
+        action: str,
+        symbol: str,
+        order_ids: Iterable[Any] = (),
+        side: Optional[str] = None,
+        quantity: Any = None,
+        price: Any = None,
+    ) -> "OrderAction":
+        """
+        Normalize raw fields like Order.create. Raises ValueError for
+        non-numeric ids, quantities or prices.
+        """
+
+        symbol = _token(symbol)
+        precision = precision_for(symbol)
+
+        try:
+            ids = tuple(int(order_id) for order_id in order_ids)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid order id in {list(order_ids)!r}") from None
+
+        try:
+            quantity = None if quantity is None else to_units(quantity, precision.quantity)
+        except ValueError as e:
+            raise ValueError(f"Invalid quantity for {symbol}: {e}") from None
+
+        try:
+            price = None if price is None else to_units(price, precision.price)
+        except ValueError as e:
+            raise ValueError(f"Invalid price for {symbol}: {e}") from None
+
+        return cls(
+            action=_token(action),
+            symbol=symbol,
+            order_ids=ids,
+            side=_token(side) if side else None,
+            quantity=quantity,
+            price=price,
+            decimals=precision,
+        )
+
+    @property
+    def precision(self) -> SymbolPrecision:
+        return self.decimals
+
+    def at_precision(self, precision: SymbolPrecision) -> "OrderAction":
+        """
+        This action with its units re-expressed at `precision`, like
+        Order.at_precision.
+        """
+
+        if precision == self.decimals:
+            return self
+        return replace(
+            self,
+            quantity=_rescale(self.quantity, self.decimals.quantity, precision.quantity),
+            price=_rescale(self.price, self.decimals.price, precision.price),
+            decimals=precision,
+        )
+
+    def __str__(self) -> str:
+        text = f"{self.action} {self.symbol}"
+        if self.order_ids:
+            text += f" ids={','.join(map(str, self.order_ids))}"
+        if self.side:
+            text += f" side={self.side}"
+        if self.action == CLOSE and self.quantity is not None:
+            text += f" qty={_fmt(self.quantity, self.precision.quantity)}"
+        if self.action == MODIFY:
+            text += f" qty={_fmt(self.quantity, self.precision.quantity)} price={_fmt(self.price, self.precision.price)}"
+        return text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "action": self.action,
+            "symbol": self.symbol,
+            "order_ids": list(self.order_ids),
+            "side": self.side,
+            "quantity": _fmt(self.quantity, self.precision.quantity),
+            "price": _fmt(self.price, self.precision.price),
+        }
+
+
+def as_dict(value: Any) -> Any:
+    """
+    to_dict() for models, identity for anything else (e.g. algo parent dicts).
+    """
+
+    return value.to_dict() if isinstance(value, (Order, ExecutionReport, OrderAction)) else value
@@ -1,22 +1,63 @@
 import logging
-from typing import Optional, Dict, Any
+import time
+from typing import Any, List, Optional, Sequence
 
-from bot.config import settings
-from bot.validators import validate_order, ValidationError
+from bot.analytics import OrderAggregates, order_aggregates
+from bot.config import pin_settings, settings
+from bot.fixedpoint import format_units, precision_for
+from bot.outbox import OrderOutbox
+from bot.profiling import profile_request
+from bot.tracing import span
+from bot.models import Order, ExecutionReport, OrderAction, CANCEL, CANCEL_ALL, CLOSE, MODIFY
+from bot.positions import AccountState
+from bot.risk import check_order
+from bot.validators import validate_order_model, validate_side, validate_symbol, ValidationError
 from bot.client import BinanceFuturesClient
 from bot.mock_client import MockBinanceFuturesClient
 
 logger = logging.getLogger(__name__)
 
 
+def _current_precision(model):
+    """
+    An Order/OrderAction re-expressed at its symbol's current precision.
+    Raises ValidationError if a SYMBOL_PRECISION reload since it was
+    parsed leaves too few decimals for its quantity or price.
+    """
+
+    try:
+        return model.at_precision(precision_for(model.symbol))
+    except ValueError as e:
+        raise ValidationError(f"Invalid {model.symbol} order after a precision change: {e}") from None
+
+
 class OrderService:
     """
     Business logic layer for order execution.
-    Handles validation and client selection.
+    Handles validation, pre-trade risk limits and client selection, so
+    every entry point (agent, API, CLI, bulk, algos) is checked the same
+    way. Every outcome is folded
+    into `aggregates` (the process-wide dashboard totals by default).
+    With an `outbox`, each order's intent is durable before it is sent
+    (with the outbox's client order id) and its outcome is logged after.
+    Positions and balances are cached in `account_state`
+    (bot/positions.py), which the reports of this service keep current.
     """
 
-    def __init__(self):
-        if settings.USE_MOCK:
+    def __init__(
+        self,
+        client=None,
+        aggregates: Optional[OrderAggregates] = None,
+        outbox: Optional[OrderOutbox] = None,
+        account: Optional[str] = None,
+    ):
+        self.aggregates = aggregates if aggregates is not None else order_aggregates
+        self.outbox = outbox
+        self.account = account
+
+        if client is not None:
+            self.client = client
+        elif settings.USE_MOCK:
             logger.info("Using Mock Binance Client.")
             self.client = MockBinanceFuturesClient()
         else:
@@ -27,76 +68,300 @@ class OrderService:
                 base_url=settings.BINANCE_BASE_URL,
             )
 
+        self.account_state = AccountState(getattr(self.client, "get_account", None), name=account or "default")
+
     def execute_order(
         self,
         symbol: str,
         side: str,
         order_type: str,
-        quantity: float,
-        price: Optional[float] = None,
-    ) -> Dict[str, Any]:
+        quantity: Any,
+        price: Any = None,
+    ) -> ExecutionReport:
         """
-        Execute an order after validation.
+        Build an Order from raw fields and execute it.
         """
 
-        try:
-            # Normalize inputs
-            symbol = symbol.upper()
-            side = side.upper()
-            order_type = order_type.upper()
+        return self.submit(Order.create(symbol, side, order_type, quantity, price))
 
+    def submit(self, order: Order) -> ExecutionReport:
+        """
+        Execute an order after validation, on the settings snapshot
+        current when it started.
+        """
+
+        with pin_settings(), span(
+            "orders.submit",
+            **{
+                "order.symbol": order.symbol, "order.side": order.side, "order.type": order.order_type,
+                "order.quantity": order.quantity_text, "order.price": order.price_text, "account": self.account,
+            },
+        ) as current, profile_request("order"):
+            report = self._submit(order)
+            current.set_attribute("order.id", report.order_id)
+            current.set_attribute("order.status", report.status)
+            return report
+
+    def _submit(self, order: Order) -> ExecutionReport:
+        cid = None
+
+        try:
             logger.info(
-                f"Executing order | {symbol} | {side} | {order_type} | qty={quantity} | price={price}"
+                f"Executing order | {order.symbol} | {order.side} | {order.order_type} | "
+                f"qty={order.quantity_text} | price={order.price_text}"
             )
 
-            # Validate
-            validate_order(symbol, side, order_type, quantity, price)
+            # Units scaled before a SYMBOL_PRECISION reload go out at the
+            # symbol's current precision, or not at all.
+            order = _current_precision(order)
+
+            # Validate, then pre-trade risk limits (bot/risk.py)
+            validate_order_model(order)
+            check_order(order)
+
+            if order.order_type not in ("MARKET", "LIMIT"):
+                raise ValidationError(f"Unsupported order type: {order.order_type}")
+
+            started = time.perf_counter()
+
+            # Write-ahead: nothing is sent until the intent is on disk.
+            extra = {}
+            if self.outbox is not None:
+                with span("outbox.intent"):
+                    cid = self.outbox.intent(order, self.account)
+                extra["client_order_id"] = cid
+            if order.reduce_only:
+                extra["reduce_only"] = True
 
             # Execute based on order type
-            if order_type == "MARKET":
-                response = self.client.place_market_order(
-                    symbol=symbol,
-                    side=side,
-                    quantity=quantity,
-                )
+            with self.account_state.sending(order.symbol):
+                if order.order_type == "MARKET":
+                    report = self.client.place_market_order(
+                        symbol=order.symbol,
+                        side=order.side,
+                        quantity=order.quantity,
+                        **extra,
+                    )
 
-            elif order_type == "LIMIT":
-                response = self.client.place_limit_order(
-                    symbol=symbol,
-                    side=side,
-                    quantity=quantity,
-                    price=price,
-                )
+                else:
+                    report = self.client.place_limit_order(
+                        symbol=order.symbol,
+                        side=order.side,
+                        quantity=order.quantity,
+                        price=order.price,
+                        **extra,
+                    )
 
-            else:
-                raise ValidationError(f"Unsupported order type: {order_type}")
+                self.account_state.apply_fill(report, placed=True)
 
-            logger.info(f"Order executed successfully | Order ID: {response.get('orderId')}")
+            if cid:
+                self.outbox.ack(cid, report)
 
-            return self._format_response(response)
+            self.aggregates.record_report(report, latency_ms=(time.perf_counter() - started) * 1000)
+
+            logger.info(f"Order executed successfully | Order ID: {report.order_id}")
+
+            return report
 
         except ValidationError as ve:
             logger.warning(f"Validation failed: {str(ve)}")
+            if cid:
+                self.outbox.fail(cid, str(ve))
+            self.aggregates.record(order.symbol, order.side, "REJECTED")
             raise
 
         except Exception as e:
+            # Outcome unknown (e.g. a timeout): the intent stays open for recovery.
             logger.error("Order execution failed.", exc_info=True)
+            self.aggregates.record(order.symbol, order.side, "FAILED")
+            raise
+
+    # =========================================================
+    # ================ OPEN-ORDER MANAGEMENT ==================
+    # =========================================================
+    # Several ids go through the batch-cancel endpoint in chunks of the
+    # client's BATCH_CANCEL_LIMIT, and cancel-all without a side filter
+    # is a single request, so flattening hundreds of resting orders
+    # takes a handful of round-trips.
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[ExecutionReport]:
+        if symbol:
+            validate_symbol(symbol)
+        return self.client.get_open_orders(symbol=symbol.upper() if symbol else None)
+
+    def cancel_order(self, symbol: str, order_id: int) -> ExecutionReport:
+        validate_symbol(symbol)
+        logger.info(f"Cancelling order | {symbol} | {order_id}")
+
+        try:
+            report = self.client.cancel_order(symbol=symbol.upper(), order_id=int(order_id))
+        except ValidationError as ve:
+            logger.warning(f"Cancel rejected: {ve}")
             raise
 
-    def _format_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        # A partly filled order reports its fills when cancelled.
+        self.account_state.apply_fill(report)
+
+        logger.info(f"Order cancelled | Order ID: {report.order_id}")
+        return report
+
+    def cancel_orders(self, symbol: str, order_ids: Sequence[int]) -> List[Optional[ExecutionReport]]:
         """
-        Clean and structure response for UI or CLI.
+        Cancel several orders via the batch endpoint. Returns one entry
+        per id, in order: the cancelled report, or None if it was unknown.
         """
 
-        return {
-            "orderId": response.get("orderId"),
-            "symbol": response.get("symbol"),
-            "side": response.get("side"),
-            "type": response.get("type"),
-            "status": response.get("status"),
-            "price": response.get("price"),
-            "origQty": response.get("origQty"),
-            "executedQty": response.get("executedQty"),
-            "raw": response,
-        }
+        validate_symbol(symbol)
+        symbol = symbol.upper()
+        ids = [int(order_id) for order_id in order_ids]
+        limit = getattr(self.client, "BATCH_CANCEL_LIMIT", 1)
+
+        if limit <= 1 or not hasattr(self.client, "cancel_orders"):
+            return [self._cancel_or_none(symbol, order_id) for order_id in ids]
+
+        results: List[Optional[ExecutionReport]] = []
+        for start in range(0, len(ids), limit):
+            results.extend(self.client.cancel_orders(symbol=symbol, order_ids=ids[start:start + limit]))
+
+        for report in results:
+            if report is not None:
+                self.account_state.apply_fill(report)
+
+        cancelled = sum(report is not None for report in results)
+        logger.info(f"Batch cancel | {symbol} | {cancelled}/{len(ids)} cancelled in {-(-len(ids) // limit)} requests")
+        return results
+
+    def _cancel_or_none(self, symbol: str, order_id: int) -> Optional[ExecutionReport]:
+        try:
+            return self.client.cancel_order(symbol=symbol, order_id=order_id)
+        except ValidationError:
+            return None
+
+    def cancel_all_orders(self, symbol: str, side: Optional[str] = None) -> List[ExecutionReport]:
+        """
+        Cancel every resting order on a symbol, or only one side's. Without
+        a side this is one request; with one, the open orders are listed
+        and the matching ids batch-cancelled.
+        """
+
+        validate_symbol(symbol)
+        symbol = symbol.upper()
+
+        if side is None:
+            reports = self.client.cancel_all_orders(symbol=symbol)
+            for report in reports:
+                self.account_state.apply_fill(report)
+            logger.info(f"Cancel all | {symbol} | {len(reports)} cancelled")
+            return reports
+
+        validate_side(side)
+        ids = [o.order_id for o in self.client.get_open_orders(symbol=symbol) if o.side == side.upper()]
+        return [report for report in self.cancel_orders(symbol, ids) if report is not None] if ids else []
+
+    def modify_order(self, symbol: str, order_id: int, side: str, quantity: Any, price: Any) -> ExecutionReport:
+        """
+        Amend a resting LIMIT order's quantity and price. Both are required,
+        as on the exchange endpoint, and validated like a new LIMIT order.
+        """
+
+        order = Order.create(symbol, side, "LIMIT", quantity, price)
+        validate_order_model(order)
+        check_order(order)
+
+        logger.info(f"Modifying order | {order.symbol} | {order_id} | qty={order.quantity_text} | price={order.price_text}")
+
+        try:
+            report = self.client.modify_order(
+                symbol=order.symbol,
+                order_id=int(order_id),
+                side=order.side,
+                quantity=order.quantity,
+                price=order.price,
+            )
+        except ValidationError as ve:
+            logger.warning(f"Modify rejected: {ve}")
+            raise
+
+        self.account_state.apply_fill(report)
+
+        logger.info(f"Order modified | Order ID: {report.order_id}")
+        return report
+
+    def apply(self, action: OrderAction) -> List[Optional[ExecutionReport]]:
+        """
+        Run an OrderAction (e.g. from the agent). Always returns a list of
+        reports; for CANCEL it has one entry per requested id.
+        """
+
+        if action.action == CANCEL:
+            if not action.order_ids:
+                raise ValidationError("Cancel requires at least one order id.")
+            if len(action.order_ids) == 1:
+                return [self.cancel_order(action.symbol, action.order_ids[0])]
+            return self.cancel_orders(action.symbol, action.order_ids)
+
+        if action.action == CANCEL_ALL:
+            return self.cancel_all_orders(action.symbol, action.side)
+
+        if action.action == MODIFY:
+            if len(action.order_ids) != 1:
+                raise ValidationError("Modify requires exactly one order id.")
+            return [self._modify_action(action)]
+
+        if action.action == CLOSE:
+            return [self.close_position(action.symbol, _current_precision(action).quantity)]
+
+        raise ValidationError(f"Unsupported order action: {action.action}")
+
+    def _modify_action(self, action: OrderAction) -> ExecutionReport:
+        order_id = action.order_ids[0]
+        precision = action.precision
+        side = action.side
+        quantity = None if action.quantity is None else format_units(action.quantity, precision.quantity)
+        price = None if action.price is None else format_units(action.price, precision.price)
+
+        # "Move order 123 to 3000": fill what wasn't given from the resting order.
+        if side is None or quantity is None or price is None:
+            resting = next((o for o in self.open_orders(action.symbol) if o.order_id == order_id), None)
+            if resting is None:
+                raise ValidationError(f"Unknown order {order_id} on {action.symbol}.")
+            side = side or resting.side
+            quantity = quantity or format_units(resting.orig_qty, resting.precision.quantity)
+            price = price or format_units(resting.price, resting.precision.price)
+
+        return self.modify_order(action.symbol, order_id, side, quantity, price)
+
+    # =========================================================
+    # ======================= POSITIONS =======================
+    # =========================================================
+
+    def close_position(self, symbol: str, quantity: Optional[int] = None) -> ExecutionReport:
+        """
+        Flatten a position (or reduce it by `quantity`, in scaled units)
+        with a reduce-only MARKET order on the opposite side. The size
+        comes from the cached account state, so no account request is made
+        unless the cache is stale; being reduce-only, an order sized from
+        a cache that is behind the exchange can shrink the position but
+        never open or flip one.
+        """
+
+        validate_symbol(symbol)
+        symbol = symbol.upper()
+
+        position = self.account_state.position(symbol)
+        if not position:
+            raise ValidationError(f"No open {symbol} position to close.")
+
+        size = abs(position)
+        if quantity is not None:
+            if quantity <= 0:
+                raise ValidationError("Quantity must be greater than 0.")
+            if quantity > size:
+                held = format_units(size, precision_for(symbol).quantity)
+                raise ValidationError(f"Cannot close more than the {held} {symbol} position.")
+            size = quantity
+
+        side = "SELL" if position > 0 else "BUY"
+        logger.info(f"Closing position | {symbol} | {side} {format_units(size, precision_for(symbol).quantity)}")
 
+        return self.submit(Order(symbol=symbol, side=side, order_type="MARKET", quantity=size, reduce_only=True))
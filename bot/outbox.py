@@ -0,0 +1,401 @@
+import atexit
+import glob
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+from bot.config import settings
+from bot.metrics import metrics
+from bot.models import ExecutionReport, Order
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks; use one process per OUTBOX_DIR.
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# ==================== WRITE-AHEAD OUTBOX =================
+# =========================================================
+# Every order intent is made durable before the order is sent, and its
+# acknowledgement is appended after. Each process writes its own
+# append-only segment (OUTBOX_DIR/outbox-<pid>-<start>.wal), locked for
+# as long as the process lives. A background writer drains all queued
+# records with one write and one fsync, so concurrent submissions share
+# a commit (group commit) instead of paying one fsync each.
+#
+# Line format: "<crc32 hex> <json>\n". A torn or corrupt line ends the
+# segment when it is read back.
+#
+# Records:
+#   {"op": "intent", "cid", "account", "order", "ts"}  before the send
+#   {"op": "ack", "cid", "orderId", "status", "ts"}     exchange accepted it
+#   {"op": "fail", "cid", "error", "ts"}                exchange rejected it
+#
+# An intent without ack/fail was (maybe) sent when the process died.
+# On startup, recovery looks those up on the exchange by client order id.
+
+INTENT = "intent"
+ACK = "ack"
+FAIL = "fail"
+
+
+class OutboxError(Exception):
+    """
+    The outbox could not make an intent durable; the order is not sent.
+    """
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    payload = json.dumps(record, separators=(",", ":")).encode()
+    return b"%08x " % zlib.crc32(payload) + payload + b"\n"
+
+
+def read_segment(path: str) -> List[Dict[str, Any]]:
+    """
+    Records of a segment, up to the first torn or corrupt line.
+    """
+
+    records = []
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n") or len(line) < 10:
+                break
+            payload = line[9:-1]
+            try:
+                if int(line[:8], 16) != zlib.crc32(payload):
+                    break
+                records.append(json.loads(payload))
+            except ValueError:
+                break
+    return records
+
+
+def pending_intents(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Intents (by client order id) with no ack or fail after them.
+    """
+
+    pending: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        if record.get("op") == INTENT:
+            pending[record["cid"]] = record
+        else:
+            pending.pop(record.get("cid"), None)
+    return pending
+
+
+def _create_locked(path: str):
+    """
+    Open `path` for appending, locked before it becomes visible under
+    its name, so recovery never mistakes it for a dead process's segment.
+    """
+
+    tmp = path + ".tmp"
+    f = open(tmp, "ab")
+    _lock(f)
+    return f, tmp
+
+
+def _lock(f) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+class OrderOutbox:
+    """
+    This process's outbox segment.
+
+    intent() blocks until the record is on disk; ack() and fail() only
+    queue theirs (a lost ack is settled by recovery). `group_window_ms`
+    makes the writer linger before each commit to gather larger groups.
+    """
+
+    def __init__(self, directory: str, group_window_ms: float = 0.0, max_bytes: int = 64 * 1024 * 1024):
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.group_window = group_window_ms / 1000
+        self.max_bytes = max_bytes
+
+        started = int(time.time() * 1000)
+        self.path = os.path.join(directory, f"outbox-{os.getpid()}-{started:x}.wal")
+        self._file, tmp = _create_locked(self.path)
+        os.replace(tmp, self.path)
+
+        # Client order ids: unique per process start, at most 36 chars for Binance.
+        self._prefix = f"wal{os.getpid():x}{started:x}"
+        self._ids = itertools.count(1)
+
+        self._cond = threading.Condition()
+        self._queue: List[bytes] = []
+        self._queued = 0
+        self._durable = 0
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        # Intents not yet acked or failed; what compaction keeps.
+        self._open: Dict[str, Dict[str, Any]] = {}
+
+        self._writer = threading.Thread(target=self._run, name="outbox-writer", daemon=True)
+        self._writer.start()
+
+    # -----------------------------------------------------
+    # Records
+    # -----------------------------------------------------
+
+    def intent(self, order: Order, account: Optional[str] = None) -> str:
+        """
+        Durably record an order about to be sent. Returns the client
+        order id to send it with. Raises OutboxError if the write failed.
+        """
+
+        cid = f"{self._prefix}-{next(self._ids)}"
+        record = {"op": INTENT, "cid": cid, "account": account, "order": order.to_dict(), "ts": time.time()}
+
+        self._wait(self._append(record))
+        return cid
+
+    def ack(self, cid: str, report: ExecutionReport):
+        self._append({"op": ACK, "cid": cid, "orderId": report.order_id, "status": report.status, "ts": time.time()})
+
+    def fail(self, cid: str, error: str):
+        self._append({"op": FAIL, "cid": cid, "error": error, "ts": time.time()})
+
+    def pending(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            return list(self._open.values())
+
+    def _wait(self, seq: int):
+        with self._cond:
+            while self._durable < seq and self._error is None:
+                self._cond.wait()
+            if self._durable < seq:
+                raise OutboxError(f"Outbox write failed: {self._error}")
+
+    def _append(self, record: Dict[str, Any]) -> int:
+        line = encode_record(record)
+
+        with self._cond:
+            if self._closed or self._error is not None:
+                # Fail closed: no new intents, so no more orders go out.
+                # Acks are dropped; recovery settles their intents.
+                if record["op"] == INTENT:
+                    raise OutboxError(f"Outbox unavailable: {self._error or 'closed'}")
+                return 0
+            if record["op"] == INTENT:
+                self._open[record["cid"]] = record
+            else:
+                self._open.pop(record["cid"], None)
+
+            self._queue.append(line)
+            self._queued += 1
+            self._cond.notify_all()
+            return self._queued
+
+    # -----------------------------------------------------
+    # Group commit
+    # -----------------------------------------------------
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+
+            if self.group_window:
+                time.sleep(self.group_window)
+
+            with self._cond:
+                batch, self._queue = self._queue, []
+                upto = self._queued
+
+            started = time.perf_counter()
+            try:
+                self._file.write(b"".join(batch))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                self._failed(f"Commit of {len(batch)} records", e)
+                return
+
+            metrics.counter("outbox.commits").inc()
+            metrics.counter("outbox.records").inc(len(batch))
+            metrics.histogram("outbox.commit_ms").observe((time.perf_counter() - started) * 1000)
+
+            with self._cond:
+                self._durable = upto
+                self._cond.notify_all()
+
+            if self._file.tell() > self.max_bytes:
+                try:
+                    self._compact()
+                except OSError as e:
+                    # The segment is intact, but it can't be kept bounded.
+                    self._failed("Compaction", e)
+                    return
+
+    def _failed(self, what: str, error: OSError):
+        # Fail closed: the writer stops, and queued and later intents raise OutboxError.
+        logger.error(f"[OUTBOX] {what} failed: {error}")
+        with self._cond:
+            self._error = error
+            self._cond.notify_all()
+
+    def _compact(self):
+        """
+        Rewrite the segment with only the open intents (writer thread only).
+        """
+
+        with self._cond:
+            keep = list(self._open.values())
+
+        new, tmp = _create_locked(self.path)
+        try:
+            new.write(b"".join(encode_record(record) for record in keep))
+            new.flush()
+            os.fsync(new.fileno())
+            os.replace(tmp, self.path)
+        except OSError:
+            new.close()
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        _fsync_dir(self.directory)
+
+        old, self._file = self._file, new
+        old.close()
+
+        metrics.counter("outbox.compactions").inc()
+        logger.info(f"[OUTBOX] Compacted {self.path} to {len(keep)} open intents")
+
+    def close(self):
+        """
+        Flush queued records and stop the writer. A segment with no open
+        intents is removed; otherwise it is left for the next recovery.
+        """
+
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+
+        self._writer.join()
+        self._file.close()
+
+        if not self._open and self._error is None:
+            os.remove(self.path)
+
+    # -----------------------------------------------------
+    # Recovery
+    # -----------------------------------------------------
+
+    def recover(self, router) -> Dict[str, int]:
+        """
+        Settle the open intents of segments left by dead processes by
+        looking each one up on the exchange by client order id. Found
+        ones were sent; missing ones never reached the exchange and are
+        logged, not resubmitted. Intents that cannot be looked up
+        (unknown account, client error) are carried into this process's
+        segment for the next start. Live processes' segments are locked
+        and skipped.
+        """
+
+        counts = {"segments": 0, "acked": 0, "missing": 0, "unresolved": 0}
+
+        for path in sorted(glob.glob(os.path.join(self.directory, "outbox-*.wal"))):
+            if os.path.abspath(path) == os.path.abspath(self.path):
+                continue
+
+            with open(path, "rb") as f:
+                # Locked by a live process, or already recovered and removed.
+                if not _lock(f) or not os.path.exists(path) or os.fstat(f.fileno()).st_ino != os.stat(path).st_ino:
+                    continue
+
+                counts["segments"] += 1
+                for cid, intent in pending_intents(read_segment(path)).items():
+                    counts[self._settle(router, cid, intent)] += 1
+
+                # Carried intents must be durable here before the old copy goes.
+                with self._cond:
+                    carried = self._queued
+                self._wait(carried)
+                os.remove(path)
+
+        if counts["segments"]:
+            logger.info(
+                f"[OUTBOX] Recovered {counts['segments']} segments | acked={counts['acked']} | "
+                f"missing={counts['missing']} | unresolved={counts['unresolved']}"
+            )
+
+        return counts
+
+    def _settle(self, router, cid: str, intent: Dict[str, Any]) -> str:
+        order = intent["order"]
+
+        try:
+            report = router.get(intent.get("account")).client.get_order(
+                symbol=order["symbol"], client_order_id=cid,
+            )
+        except Exception as e:
+            logger.warning(f"[OUTBOX] Could not look up {cid} ({order['symbol']}): {e}")
+            self._append(intent)
+            return "unresolved"
+
+        if report is None:
+            logger.warning(f"[OUTBOX] {cid} never reached the exchange; not resubmitted: {order}")
+            return "missing"
+
+        logger.info(f"[OUTBOX] {cid} was sent before the restart | Order ID: {report.order_id} | {report.status}")
+        return "acked"
+
+
+def _fsync_dir(directory: str):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+_outbox: Optional[OrderOutbox] = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> Optional[OrderOutbox]:
+    """
+    Process-wide outbox, or None when OUTBOX_DIR is not set.
+    """
+
+    global _outbox
+
+    if _outbox is None and settings.OUTBOX_DIR:
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = OrderOutbox(
+                    settings.OUTBOX_DIR,
+                    group_window_ms=settings.OUTBOX_GROUP_WINDOW_MS,
+                    max_bytes=settings.OUTBOX_MAX_BYTES,
+                )
+                atexit.register(_outbox.close)
+
+    return _outbox
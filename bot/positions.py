@@ -0,0 +1,264 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from bot.config import settings
+from bot.fixedpoint import precision_for, rescale, to_units
+from bot.metrics import metrics
+from bot.models import ExecutionReport
+from bot.validators import ValidationError
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# ================== ACCOUNT STATE CACHE ==================
+# =========================================================
+# Positions and balances of one account, kept next to its OrderService
+# so that position-aware instructions ("close my BTC position") and
+# checks read them locally instead of calling the account endpoint
+# (GET /fapi/v2/account, one of the heaviest) per order.
+#
+# - Seeded from the account endpoint on first read.
+# - Fills reported back to OrderService move positions as they happen.
+# - Account update events (the user-data stream's ACCOUNT_UPDATE) set
+#   positions and balances to the amounts they carry.
+# - A read older than ACCOUNT_STATE_MAX_AGE_S since the last load or
+#   event refreshes from REST first; refresh() forces one.
+#
+# A refresh that overlaps an order in flight can't tell whether that
+# order's fill is already in the REST answer. Only the symbols of orders
+# sent or in flight during the call are affected: they keep the local
+# position (which those fills move), while every other symbol takes the
+# loaded one. Before the first load there is no local position, so such
+# symbols are marked dirty and their next read loads again.
+
+
+class AccountState:
+    """
+    Positions (signed scaled integers, negative = short) and balances
+    (Decimal per asset) of one account. `loader` returns the account
+    endpoint's payload: {"assets": [{"asset", "walletBalance",
+    "availableBalance"}], "positions": [{"symbol", "positionAmt"}]}.
+    """
+
+    # Fill baselines kept per order id; older ones are dropped.
+    MAX_TRACKED_ORDERS = 10000
+
+    def __init__(self, loader: Optional[Callable[[], Dict[str, Any]]] = None,
+                 max_age: Optional[float] = None, name: str = "default"):
+        self.loader = loader
+        self.name = name
+        self._max_age = max_age
+
+        self._positions: Dict[str, int] = {}
+        # Symbols whose position is unknown until the next load.
+        self._dirty: Set[str] = set()
+        # Quantity decimals each position is held at (the symbol's precision
+        # when loaded); reads rescale if SYMBOL_PRECISION changed since.
+        self._decimals: Dict[str, int] = {}
+        self._balances: Dict[str, Decimal] = {}
+        self._available: Dict[str, Decimal] = {}
+        # Monotonic time of the last REST load or account event; None → never loaded.
+        self._updated: Optional[float] = None
+        # (symbol, executed quantity already applied at the position's
+        # decimals) per order placed since the last load.
+        self._executed: "OrderedDict[Any, Tuple[str, int]]" = OrderedDict()
+
+        # Per symbol: orders being sent now, and sent so far.
+        self._inflight: Dict[str, int] = {}
+        self._sends: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def max_age(self) -> float:
+        return settings.ACCOUNT_STATE_MAX_AGE_S if self._max_age is None else self._max_age
+
+    # -----------------------------------------------------
+    # Reads
+    # -----------------------------------------------------
+
+    def position(self, symbol: str) -> int:
+        """
+        Net position in scaled quantity units at the symbol's precision.
+        """
+
+        self._ensure_fresh(symbol in self._dirty)
+        with self._lock:
+            return self._current(symbol, self._positions.get(symbol, 0))
+
+    def positions(self) -> Dict[str, int]:
+        """
+        Every non-flat position.
+        """
+
+        self._ensure_fresh(bool(self._dirty))
+        with self._lock:
+            return {symbol: self._current(symbol, amount) for symbol, amount in self._positions.items() if amount}
+
+    def _current(self, symbol: str, units: int) -> int:
+        # Held units → the symbol's current precision. Caller holds the lock.
+        decimals = precision_for(symbol).quantity
+        return rescale(units, self._decimals.get(symbol, decimals), decimals, exact=False)
+
+    def balance(self, asset: str = "USDT", available: bool = False) -> Decimal:
+        self._ensure_fresh()
+        return (self._available if available else self._balances).get(asset, Decimal(0))
+
+    def age(self) -> Optional[float]:
+        """
+        Seconds since the last load or account event; None if never loaded.
+        """
+
+        updated = self._updated
+        return None if updated is None else time.monotonic() - updated
+
+    def _ensure_fresh(self, dirty: bool = False):
+        age = self.age()
+        if age is not None and age < self.max_age and not dirty:
+            metrics.counter("account_state.hits").inc()
+            return
+        self.refresh()
+
+    # -----------------------------------------------------
+    # REST load
+    # -----------------------------------------------------
+
+    def refresh(self):
+        """
+        Reload positions and balances from the account endpoint.
+        """
+
+        if self.loader is None:
+            raise ValidationError(f"Account {self.name} cannot report positions.")
+
+        with self._refresh_lock:
+            with self._lock:
+                sends = dict(self._sends)
+                raced = {symbol for symbol, count in self._inflight.items() if count}
+
+            started = time.perf_counter()
+            data = self.loader()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            decimals = {entry["symbol"]: precision_for(entry["symbol"]).quantity for entry in data.get("positions", ())}
+            positions = {
+                entry["symbol"]: to_units(entry["positionAmt"], decimals[entry["symbol"]])
+                for entry in data.get("positions", ())
+            }
+            balances = {entry["asset"]: Decimal(entry["walletBalance"]) for entry in data.get("assets", ())}
+            available = {
+                entry["asset"]: Decimal(entry.get("availableBalance", entry["walletBalance"]))
+                for entry in data.get("assets", ())
+            }
+
+            with self._lock:
+                # Symbols with an order sent during the call: it may or may not be in the answer.
+                raced.update(symbol for symbol, count in self._inflight.items() if count)
+                raced.update(symbol for symbol, count in self._sends.items() if count != sends.get(symbol))
+
+                dirty = set()
+                for symbol in raced:
+                    if self._updated is None or symbol in self._dirty:
+                        dirty.add(symbol)
+                    else:
+                        positions[symbol] = self._positions.get(symbol, 0)
+                        decimals[symbol] = self._decimals.get(symbol, precision_for(symbol).quantity)
+
+                self._positions = positions
+                self._decimals = decimals
+                self._dirty = dirty
+                self._balances = balances
+                self._available = available
+                # Baselines of raced orders still apply to the positions kept.
+                self._executed = OrderedDict(
+                    (order_id, entry) for order_id, entry in self._executed.items() if entry[0] in raced
+                )
+                self._updated = time.monotonic()
+
+        metrics.counter("account_state.refreshes").inc()
+        metrics.histogram("account_state.refresh_ms").observe(elapsed_ms)
+        if raced:
+            metrics.counter("account_state.refresh_races").inc()
+
+        logger.info(
+            f"[POSITIONS] {self.name} loaded in {elapsed_ms:.1f}ms | "
+            f"{sum(1 for amount in positions.values() if amount)} open position(s)"
+            + (f" | raced orders on {', '.join(sorted(raced))}" if raced else "")
+        )
+
+    # -----------------------------------------------------
+    # Updates
+    # -----------------------------------------------------
+
+    @contextmanager
+    def sending(self, symbol: str):
+        """
+        Wrap each order request, so a refresh running meanwhile knows
+        it may have raced a fill on `symbol`.
+        """
+
+        with self._lock:
+            self._inflight[symbol] = self._inflight.get(symbol, 0) + 1
+            self._sends[symbol] = self._sends.get(symbol, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._inflight[symbol] -= 1
+
+    def apply_fill(self, report: ExecutionReport, placed: bool = False):
+        """
+        Move the position by what `report` executed since the last report
+        of the same order. Reports of orders placed before the last load
+        are already in it and are ignored, unless `placed` (a new order).
+        """
+
+        with self._lock:
+            if self._updated is None or report.symbol in self._dirty:
+                # Not loaded (or a raced first load): the next load includes this fill.
+                return
+
+            known = self._executed.get(report.order_id)
+            if known is None and not placed:
+                return
+
+            decimals = self._decimals.setdefault(report.symbol, report.precision.quantity)
+            executed = rescale(report.executed_qty, report.precision.quantity, decimals, exact=False)
+            delta = executed - (known[1] if known else 0)
+            self._executed[report.order_id] = (report.symbol, executed)
+            self._executed.move_to_end(report.order_id)
+            if len(self._executed) > self.MAX_TRACKED_ORDERS:
+                self._executed.popitem(last=False)
+
+            if delta:
+                signed = delta if report.side == "BUY" else -delta
+                self._positions[report.symbol] = self._positions.get(report.symbol, 0) + signed
+
+    def apply_account_update(self, event: Dict[str, Any]):
+        """
+        Apply an ACCOUNT_UPDATE event ({"a": {"B": [{"a", "wb", "cw"}],
+        "P": [{"s", "pa"}]}}). Its amounts are absolute and replace the
+        local ones. Once loaded, an event also restarts the staleness clock.
+        """
+
+        update = event.get("a", event)
+
+        with self._lock:
+            for balance in update.get("B", ()):
+                self._balances[balance["a"]] = Decimal(balance["wb"])
+                if "cw" in balance:
+                    self._available[balance["a"]] = Decimal(balance["cw"])
+            for position in update.get("P", ()):
+                symbol = position["s"]
+                self._decimals[symbol] = precision_for(symbol).quantity
+                self._positions[symbol] = to_units(position["pa"], self._decimals[symbol])
+                self._dirty.discard(symbol)
+            if self._updated is not None:
+                self._updated = time.monotonic()
+
+        metrics.counter("account_state.events").inc()
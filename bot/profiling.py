@@ -0,0 +1,341 @@
+import atexit
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bot import tracing
+from bot.config import settings
+from bot.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# =================== SAMPLING PROFILER ===================
+# =========================================================
+# A background thread samples the Python stacks of threads that are
+# working on a profiled request, every PROFILE_INTERVAL_MS. Requests are
+# run_agent and OrderService.submit calls; a thread belongs to one while
+# it is inside a span of the request's trace (bot/tracing.py), which also
+# covers graph nodes that langgraph runs on its own threads. Other threads
+# are never walked, so idle cost is one dict lookup per span.
+#
+# PROFILE_MODE=request writes one profile per request; PROFILE_MODE=window
+# merges all requests into one profile per PROFILE_WINDOW_S. Each profile
+# is written as collapsed stacks (flamegraph.pl, speedscope, inferno) and
+# as a speedscope JSON file, under PROFILE_DIR.
+
+REQUEST = "request"
+WINDOW = "window"
+
+Stack = Tuple[str, ...]
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    # Keep the last two path components: enough to tell packages apart.
+    short = os.sep.join(filename.rsplit(os.sep, 2)[-2:])
+    return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+
+def _stack(frame, labels: Dict[object, str], limit: int = 256) -> Stack:
+    frames: List[str] = []
+    while frame is not None and len(frames) < limit:
+        code = frame.f_code
+        label = labels.get(code)
+        if label is None:
+            label = labels[code] = _frame_label(code)
+        frames.append(label)
+        frame = frame.f_back
+    frames.reverse()
+    return tuple(frames)
+
+
+class Profile:
+    """
+    Aggregated samples of one request or one time window.
+    """
+
+    __slots__ = ("name", "trace_id", "started", "ended", "samples")
+
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.started = time.time()
+        self.ended = 0.0
+        self.samples: Counter = Counter()
+
+    def collapsed(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.samples.most_common())
+
+    def speedscope(self, interval_ms: float) -> Dict:
+        frames: List[Dict] = []
+        index: Dict[str, int] = {}
+        samples = []
+        weights = []
+
+        for stack, count in self.samples.items():
+            ids = []
+            for label in stack:
+                if label not in index:
+                    index[label] = len(frames)
+                    name, _, location = label.partition(" (")
+                    file, _, line = location.rstrip(")").rpartition(":")
+                    frames.append({"name": name, "file": file, "line": int(line) if line.isdigit() else None})
+                ids.append(index[label])
+            samples.append(ids)
+            weights.append(count * interval_ms)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "trading-bot",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.name + (f" trace={self.trace_id}" if self.trace_id else ""),
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+class SamplingProfiler:
+    """
+    Stack sampler for profiled requests (see module comment).
+    """
+
+    def __init__(self, directory: str, mode: str = REQUEST, interval_ms: float = 10.0, window_s: float = 60.0):
+        if mode not in (REQUEST, WINDOW):
+            raise ValueError(f"Unknown profile mode: {mode}")
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.directory = directory
+        self.mode = mode
+        self.interval_ms = interval_ms
+        self.window_s = window_s
+
+        self._lock = threading.Lock()
+        # trace id → open request profile
+        self._requests: Dict[str, Profile] = {}
+        # thread ident → trace ids of the spans it is inside, innermost last
+        self._threads: Dict[int, List[str]] = {}
+        self._window = Profile("window")
+        self._finished: List[Profile] = []
+        self._labels: Dict[object, str] = {}
+        self._stopped = threading.Event()
+
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    # -----------------------------------------------------
+    # Request and thread tracking
+    # -----------------------------------------------------
+
+    def begin(self, name: str, trace_id: str) -> Optional[Profile]:
+        """
+        Start profiling a request, unless its trace is already profiled
+        (e.g. OrderService.submit inside run_agent).
+        """
+
+        with self._lock:
+            if trace_id in self._requests:
+                return None
+            profile = self._requests[trace_id] = Profile(name, trace_id)
+        # The caller's span was entered before the profiler may have existed.
+        self._push(trace_id)
+        return profile
+
+    def end(self, profile: Profile):
+        profile.ended = time.time()
+        self._pop()
+        with self._lock:
+            self._requests.pop(profile.trace_id, None)
+            if self.mode == REQUEST:
+                self._finished.append(profile)
+
+    def span_entered(self, current: tracing.Span):
+        self._push(current.trace_id)
+
+    def span_exited(self, current: tracing.Span):
+        self._pop()
+
+    def _push(self, trace_id: str):
+        with self._lock:
+            self._threads.setdefault(threading.get_ident(), []).append(trace_id)
+
+    def _pop(self):
+        ident = threading.get_ident()
+        with self._lock:
+            traces = self._threads.get(ident)
+            if traces:
+                traces.pop()
+                if not traces:
+                    del self._threads[ident]
+
+    # -----------------------------------------------------
+    # Sampling
+    # -----------------------------------------------------
+
+    def _run(self):
+        interval = self.interval_ms / 1000
+        window_end = time.monotonic() + self.window_s
+
+        while not self._stopped.wait(interval):
+            started = time.perf_counter()
+            self._sample()
+            metrics.histogram("profiler.sample_ms").observe((time.perf_counter() - started) * 1000)
+
+            if self.mode == WINDOW and time.monotonic() >= window_end:
+                window_end = time.monotonic() + self.window_s
+                self._rotate_window()
+
+            self._write_finished()
+
+        if self.mode == WINDOW:
+            self._rotate_window()
+        self._write_finished()
+
+    def _sample(self):
+        with self._lock:
+            targets = [
+                (ident, traces[-1]) for ident, traces in self._threads.items()
+                if traces[-1] in self._requests
+            ]
+            if not targets:
+                return
+
+        frames = sys._current_frames()
+
+        for ident, trace_id in targets:
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = _stack(frame, self._labels)
+            with self._lock:
+                profile = self._requests.get(trace_id)
+                if profile is not None:
+                    profile.samples[stack] += 1
+                    if self.mode == WINDOW:
+                        self._window.samples[stack] += 1
+
+    def _rotate_window(self):
+        with self._lock:
+            window, self._window = self._window, Profile("window")
+        window.ended = time.time()
+        self._finished.append(window)
+
+    # -----------------------------------------------------
+    # Output
+    # -----------------------------------------------------
+
+    def _write_finished(self):
+        with self._lock:
+            finished, self._finished = self._finished, []
+
+        for profile in finished:
+            if profile.samples:
+                self.write(profile)
+
+    def write(self, profile: Profile) -> str:
+        """
+        Write `profile` as <base>.collapsed and <base>.speedscope.json;
+        returns the base path.
+        """
+
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(profile.started))
+        suffix = f"-{profile.trace_id[:16]}" if profile.trace_id else ""
+        base = os.path.join(self.directory, f"{profile.name}-{stamp}{suffix}")
+
+        with open(base + ".collapsed", "w") as f:
+            f.write(profile.collapsed())
+        with open(base + ".speedscope.json", "w") as f:
+            json.dump(profile.speedscope(self.interval_ms), f)
+
+        metrics.counter("profiler.profiles").inc()
+        logger.info(f"[PROFILE] {profile.name}: {sum(profile.samples.values())} samples → {base}.collapsed")
+        return base
+
+    def close(self):
+        self._stopped.set()
+        self._thread.join()
+
+
+@contextmanager
+def profile_request(name: str) -> Iterator[Optional[Profile]]:
+    """
+    Profile the enclosed work as one request when profiling is enabled.
+    Must run inside a span: the request is the span's trace.
+    """
+
+    profiler = get_profiler()
+    trace_id = tracing.current_trace_id()
+
+    profile = profiler.begin(name, trace_id) if profiler is not None and trace_id else None
+    if profile is None:
+        yield None
+        return
+
+    try:
+        yield profile
+    finally:
+        profiler.end(profile)
+
+
+_profiler: Optional[SamplingProfiler] = None
+_profiler_ready = False
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> Optional[SamplingProfiler]:
+    """
+    Process-wide profiler for settings.PROFILE_MODE; None when off.
+    """
+
+    global _profiler_ready
+
+    if not _profiler_ready:
+        with _profiler_lock:
+            if not _profiler_ready:
+                if settings.PROFILE_MODE:
+                    _install(SamplingProfiler(
+                        settings.PROFILE_DIR,
+                        mode=settings.PROFILE_MODE,
+                        interval_ms=settings.PROFILE_INTERVAL_MS,
+                        window_s=settings.PROFILE_WINDOW_S,
+                    ))
+                _profiler_ready = True
+
+    return _profiler
+
+
+def set_profiler(profiler: Optional[SamplingProfiler]):
+    """
+    Replace the process-wide profiler (None turns profiling off).
+    """
+
+    global _profiler_ready
+
+    with _profiler_lock:
+        if _profiler is not None:
+            _profiler.close()
+        _install(profiler)
+        _profiler_ready = True
+
+
+def _install(profiler: Optional[SamplingProfiler]):
+    global _profiler
+
+    _profiler = profiler
+    tracing.set_span_listener(profiler)
+    if profiler is not None:
+        atexit.register(profiler.close)
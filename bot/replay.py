@@ -0,0 +1,371 @@
+import bz2
+import gzip
+import heapq
+import itertools
+import json
+import logging
+import lzma
+import math
+import mmap
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bot.analytics import OrderAggregates
+from bot.fixedpoint import precision_for, round_units, to_float, to_units
+from bot.models import ExecutionReport
+from bot.orders import OrderService
+
+logger = logging.getLogger(__name__)
+
+_OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+
+
+# =========================================================
+# ===================== MARKET DATA =======================
+# =========================================================
+
+def _open_lines(path: str) -> Iterator[bytes]:
+    """
+    Yield raw lines from a plain or compressed file.
+    Plain files are memory-mapped so the OS pages them in lazily.
+    """
+
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext in _OPENERS:
+        with _OPENERS[ext](path, "rb") as f:
+            yield from f
+        return
+
+    if os.path.getsize(path) == 0:
+        return
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield from iter(mm.readline, b"")
+
+
+def iter_market_events(path: str, kind: str = "trades") -> Iterator[Tuple[int, float, float, float]]:
+    """
+    Stream (timestamp_ms, low, high, last) tuples from recorded Binance data.
+
+    kind="trades": aggTrades/trades CSV  → id, price, qty, quote_qty, time, ...
+    kind="klines": klines CSV            → open_time, open, high, low, close, volume, close_time, ...
+
+    For a trade, low == high == last == trade price. Header rows are skipped.
+    """
+
+    if kind not in ("trades", "klines"):
+        raise ValueError("kind must be 'trades' or 'klines'.")
+
+    for line in _open_lines(path):
+        fields = line.split(b",")
+
+        if kind == "trades":
+            if len(fields) < 5:
+                continue
+            try:
+                price = float(fields[1])
+                ts = int(fields[4])
+            except ValueError:
+                continue  # header
+            yield ts, price, price, price
+
+        else:
+            if len(fields) < 7:
+                continue
+            try:
+                high = float(fields[2])
+                low = float(fields[3])
+                close = float(fields[4])
+                ts = int(fields[6])
+            except ValueError:
+                continue  # header
+            yield ts, low, high, close
+
+
+# =========================================================
+# ================ SIMULATED MATCHING CLIENT ==============
+# =========================================================
+
+class SimulatedMatchingClient:
+    """
+    Drop-in replacement for MockBinanceFuturesClient that fills against
+    replayed market data instead of sleeping and returning random ids.
+
+    - MARKET orders fill immediately at the last traded price.
+    - LIMIT orders fill at the limit price once the market trades through
+      it (or immediately at the last price if marketable on arrival).
+    Order ids are sequential so runs are fully deterministic.
+    """
+
+    def __init__(self, fee_rate: float = 0.0):
+        self.fee_rate = fee_rate
+        self.now = 0
+        self.last_price: Dict[str, float] = {}
+        self.fills: List[Dict[str, Any]] = []
+        self.positions: Dict[str, "Position"] = {}
+
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        # symbol → heap of (-price, seq, order) for bids / (price, seq, order) for asks
+        self._bids: Dict[str, list] = {}
+        self._asks: Dict[str, list] = {}
+
+    # -----------------------------------------------------
+    # Order entry (same interface as MockBinanceFuturesClient)
+    # -----------------------------------------------------
+
+    # Matching runs on floats; scaled-integer order fields are converted on
+    # entry and back in the ExecutionReport.
+
+    def place_market_order(self, symbol: str, side: str, quantity: int) -> ExecutionReport:
+        last = self.last_price.get(symbol)
+        if last is None:
+            raise RuntimeError(f"No market data yet for {symbol}; cannot fill MARKET order.")
+
+        quantity = to_float(quantity, precision_for(symbol).quantity)
+        order = self._new_order(symbol, side, "MARKET", quantity, 0.0)
+        self._fill(order, last)
+        return self._response(order)
+
+    def place_limit_order(self, symbol: str, side: str, quantity: int, price: int) -> ExecutionReport:
+        precision = precision_for(symbol)
+        price = to_float(price, precision.price)
+        order = self._new_order(symbol, side, "LIMIT", to_float(quantity, precision.quantity), price)
+        last = self.last_price.get(symbol)
+
+        marketable = last is not None and (
+            (side == "BUY" and last <= price) or (side == "SELL" and last >= price)
+        )
+
+        if marketable:
+            self._fill(order, last)
+        elif side == "BUY":
+            heapq.heappush(self._bids.setdefault(symbol, []), (-price, next(self._seq), order))
+        else:
+            heapq.heappush(self._asks.setdefault(symbol, []), (price, next(self._seq), order))
+
+        return self._response(order)
+
+    # -----------------------------------------------------
+    # Market data
+    # -----------------------------------------------------
+
+    def on_market(self, symbol: str, ts: int, low: float, high: float, last: float):
+        """
+        Apply one market event. Fast path: two heap-top comparisons.
+        """
+
+        self.now = ts
+        self.last_price[symbol] = last
+
+        bids = self._bids.get(symbol)
+        while bids and -bids[0][0] >= low:
+            _, _, order = heapq.heappop(bids)
+            self._fill(order, order["price"])
+
+        asks = self._asks.get(symbol)
+        while asks and asks[0][0] <= high:
+            _, _, order = heapq.heappop(asks)
+            self._fill(order, order["price"])
+
+    # -----------------------------------------------------
+    # Internals
+    # -----------------------------------------------------
+
+    def _new_order(self, symbol, side, order_type, quantity, price):
+        return {
+            "orderId": next(self._ids),
+            "symbol": symbol,
+            "side": side,
+            "type": order_type,
+            "status": "NEW",
+            "price": price,
+            "origQty": quantity,
+            "executedQty": 0.0,
+            "avgPrice": 0.0,
+            "time": self.now,
+        }
+
+    def _fill(self, order, price: float):
+        order["status"] = "FILLED"
+        order["executedQty"] = order["origQty"]
+        order["avgPrice"] = price
+
+        fee = order["origQty"] * price * self.fee_rate
+        position = self.positions.setdefault(order["symbol"], Position())
+        position.apply(order["side"], order["origQty"], price, fee)
+
+        self.fills.append({
+            "time": self.now,
+            "orderId": order["orderId"],
+            "symbol": order["symbol"],
+            "side": order["side"],
+            "type": order["type"],
+            "qty": order["origQty"],
+            "price": price,
+            "fee": fee,
+        })
+
+    @staticmethod
+    def _response(order) -> ExecutionReport:
+        precision = precision_for(order["symbol"])
+
+        return ExecutionReport(
+            order_id=order["orderId"],
+            symbol=order["symbol"],
+            side=order["side"],
+            order_type=order["type"],
+            status=order["status"],
+            # Trade prices in the data may carry more decimals than the symbol's tick.
+            price=round_units(order["avgPrice"] if order["type"] == "MARKET" else order["price"], precision.price),
+            orig_qty=to_units(order["origQty"], precision.quantity),
+            executed_qty=to_units(order["executedQty"], precision.quantity),
+        )
+
+
+class Position:
+    """
+    Signed position with average entry price and realized PnL.
+    """
+
+    __slots__ = ("qty", "avg_price", "realized", "fees")
+
+    def __init__(self):
+        self.qty = 0.0
+        self.avg_price = 0.0
+        self.realized = 0.0
+        self.fees = 0.0
+
+    def apply(self, side: str, qty: float, price: float, fee: float = 0.0):
+        signed = qty if side == "BUY" else -qty
+        self.fees += fee
+
+        if self.qty == 0 or (self.qty > 0) == (signed > 0):
+            # Opening or adding: blend the entry price.
+            total = self.qty + signed
+            self.avg_price = (self.avg_price * abs(self.qty) + price * qty) / abs(total)
+            self.qty = total
+            return
+
+        # Reducing, closing or flipping.
+        closed = min(abs(signed), abs(self.qty))
+        direction = 1 if self.qty > 0 else -1
+        self.realized += closed * (price - self.avg_price) * direction
+        self.qty += signed
+
+        if abs(self.qty) < 1e-12:
+            self.qty = 0.0
+            self.avg_price = 0.0
+        elif (self.qty > 0) != (direction > 0):
+            # Flipped: the remainder opens at the fill price.
+            self.avg_price = price
+
+    def unrealized(self, mark: float) -> float:
+        return self.qty * (mark - self.avg_price)
+
+
+# =========================================================
+# ===================== REPLAY ENGINE =====================
+# =========================================================
+
+def load_order_schedule(path: str) -> List[Dict[str, Any]]:
+    """
+    Read timestamped orders from JSONL. Each line is a structured order
+    as produced by the agent's parse node plus a `ts` (epoch ms) field.
+    """
+
+    with open(path, "r") as f:
+        orders = [json.loads(line) for line in f if line.strip()]
+
+    orders.sort(key=lambda o: o["ts"])
+    return orders
+
+
+class ReplayEngine:
+    """
+    Deterministically replays market data through a SimulatedMatchingClient
+    and submits scheduled orders through OrderService at their timestamps.
+    """
+
+    def __init__(self, symbol: str, fee_rate: float = 0.0):
+        self.symbol = symbol.upper()
+        self.client = SimulatedMatchingClient(fee_rate=fee_rate)
+        # Simulated fills get their own aggregates, not the live dashboard's.
+        self.service = OrderService(client=self.client, aggregates=OrderAggregates())
+        self.rejected: List[Dict[str, Any]] = []
+
+    def run(self, events: Iterator[Tuple[int, float, float, float]],
+            orders: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        orders = orders or []
+        pending = iter(orders)
+        next_order = next(pending, None)
+
+        on_market = self.client.on_market
+        symbol = self.symbol
+        count = 0
+        started = time.perf_counter()
+
+        for ts, low, high, last in events:
+            # Orders are submitted before the first event strictly after their
+            # timestamp, so an order sees every trade printed at or before it.
+            while next_order is not None and next_order["ts"] < ts:
+                self._submit(next_order)
+                next_order = next(pending, None)
+
+            on_market(symbol, ts, low, high, last)
+            count += 1
+
+        # Orders scheduled after the last event still go in at the final price.
+        while next_order is not None:
+            self._submit(next_order)
+            next_order = next(pending, None)
+
+        elapsed = time.perf_counter() - started
+
+        logger.info(
+            f"[REPLAY] {symbol} | events={count} | orders={len(orders)} | "
+            f"fills={len(self.client.fills)} | rejected={len(self.rejected)} | {elapsed:.2f}s"
+        )
+
+        return self.report(count, elapsed)
+
+    def _submit(self, order: Dict[str, Any]):
+        try:
+            self.service.execute_order(
+                symbol=order.get("symbol", self.symbol),
+                side=order["side"],
+                order_type=order["order_type"],
+                quantity=order["quantity"],
+                price=order.get("price"),
+            )
+        except Exception as e:
+            self.rejected.append({"order": order, "error": str(e)})
+
+    def report(self, events: int, elapsed: float) -> Dict[str, Any]:
+        mark = self.client.last_price.get(self.symbol, 0.0)
+        position = self.client.positions.get(self.symbol, Position())
+        fills = self.client.fills
+
+        return {
+            "symbol": self.symbol,
+            "events": events,
+            "elapsed_seconds": elapsed,
+            "events_per_second": events / elapsed if elapsed else None,
+            "fills": len(fills),
+            "rejected": len(self.rejected),
+            "volume": math.fsum(f["qty"] for f in fills),
+            "notional": math.fsum(f["qty"] * f["price"] for f in fills),
+            "fees": position.fees,
+            "position": position.qty,
+            "avg_entry": position.avg_price,
+            "mark_price": mark,
+            "realized_pnl": position.realized,
+            "unrealized_pnl": position.unrealized(mark),
+            "net_pnl": position.realized + position.unrealized(mark) - position.fees,
+        }
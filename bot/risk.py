@@ -0,0 +1,81 @@
+from typing import Dict, Optional, Tuple
+
+from bot.config import settings
+from bot.fixedpoint import to_float
+from bot.models import Order, OrderAction, MODIFY
+from bot.validators import ValidationError
+
+# =========================================================
+# =================== PRE-TRADE RISK ======================
+# =========================================================
+# Limits checked before an order is sent, next to (and independent of)
+# validation. OrderService runs them on every order and modify it sends;
+# the agent also checks up front to report them in its own state key.
+# They are read from settings on every check, so a reloaded .env applies
+# to the next order.
+#
+#   RISK_MAX_QTY       per-symbol quantity cap, "BTCUSDT:1,ETHUSDT:20"
+#   RISK_MAX_NOTIONAL  cap on quantity × price (quote currency); only
+#                      orders with a price (LIMIT, modifies) have one.
+#                      MARKET orders carry no price and there is no
+#                      reference price to value them at, so they are
+#                      bounded by RISK_MAX_QTY alone.
+#
+# Cancels and reduce-only orders (closes) only reduce exposure and
+# always pass.
+
+
+class RiskError(ValidationError):
+    """
+    An order breaches a pre-trade risk limit.
+    """
+
+
+_parsed: Tuple[str, Dict[str, float]] = ("", {})
+
+
+def _max_quantities() -> Dict[str, float]:
+    global _parsed
+
+    spec = settings.RISK_MAX_QTY
+    if spec != _parsed[0]:
+        limits = {}
+        for entry in filter(None, (part.strip() for part in spec.split(","))):
+            symbol, _, limit = entry.partition(":")
+            limits[symbol.strip()] = float(limit)
+        _parsed = (spec, limits)
+    return _parsed[1]
+
+
+def _check(symbol: str, quantity: Optional[float], price: Optional[float]):
+    limit = _max_quantities().get(symbol)
+    if limit is not None and quantity is not None and quantity > limit:
+        raise RiskError(f"Quantity {quantity:g} exceeds the {symbol} limit of {limit:g}.")
+
+    max_notional = settings.RISK_MAX_NOTIONAL
+    if max_notional > 0 and quantity is not None and price is not None and quantity * price > max_notional:
+        raise RiskError(f"Notional {quantity * price:,.2f} exceeds the limit of {max_notional:,.2f}.")
+
+
+def check_order(order: Order):
+    if order.reduce_only:
+        return
+
+    precision = order.precision
+    _check(
+        order.symbol,
+        to_float(order.quantity, precision.quantity),
+        to_float(order.price, precision.price) if order.price is not None else None,
+    )
+
+
+def check_action(action: OrderAction):
+    if action.action != MODIFY:
+        return
+
+    precision = action.precision
+    _check(
+        action.symbol,
+        to_float(action.quantity, precision.quantity) if action.quantity is not None else None,
+        to_float(action.price, precision.price) if action.price is not None else None,
+    )
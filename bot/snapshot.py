@@ -0,0 +1,319 @@
+import atexit
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from bot.config import settings
+from bot.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# ================== WARM-START SNAPSHOT ==================
+# =========================================================
+# In-memory state that is slow to rebuild (symbol rules, parse results,
+# mock open orders) is written to SNAPSHOT_FILE every
+# SNAPSHOT_INTERVAL_S and at exit, and read back on startup, so the
+# first orders after a restart don't pay every cold-path cost.
+#
+# Each process role (cli, ui, api, worker-N; see set_snapshot_role())
+# has a file of its own next to SNAPSHOT_FILE, e.g. snapshot.bin →
+# snapshot.worker-1.bin, so processes running side by side don't
+# overwrite one another's state. A restarted process gets its role's file.
+#
+# Components register a named section: dump() → bytes, load(bytes) and
+# an optional refresh() that runs in the background after a restore
+# (re-fetching entries that went stale while the process was down).
+# Sections registered after the file was read are loaded on registration.
+#
+# File layout (little-endian):
+#   header   magic "TBSNAP\0\0", format version u16, section count u16,
+#            crc32 u32 and length u64 of the rest, created (epoch s) f64
+#   section  name length u16, body length u32, name, body   (repeated)
+#
+# The file is memory-mapped and its header and checksum are checked
+# before anything is decoded; a mismatch means a cold start, not an
+# error. Writes go to a temp file that replaces the old one.
+
+MAGIC = b"TBSNAP\0\0"
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<8sHHIQd")
+_SECTION = struct.Struct("<HI")
+
+
+class Section(NamedTuple):
+    dump: Callable[[], bytes]
+    load: Callable[[bytes], None]
+    refresh: Optional[Callable[[], None]]
+
+
+_sections: Dict[str, Section] = {}
+# Bodies read from the file for sections not registered yet.
+_unclaimed: Dict[str, bytes] = {}
+_lock = threading.Lock()
+
+
+def register_section(name: str, dump: Callable[[], bytes], load: Callable[[bytes], None],
+                     refresh: Optional[Callable[[], None]] = None):
+    """
+    Include `name` in snapshots. If a restored snapshot holds it, it is
+    loaded (and refreshed in the background) right away.
+    """
+
+    section = Section(dump, load, refresh)
+    with _lock:
+        _sections[name] = section
+        body = _unclaimed.pop(name, None)
+
+    if body is not None:
+        if _load_section(name, section, body) and refresh is not None:
+            _refresh_later([(name, refresh)])
+
+
+# =========================================================
+# ===================== FILE FORMAT =======================
+# =========================================================
+
+def encode_snapshot(bodies: Dict[str, bytes], created: Optional[float] = None) -> bytes:
+    parts = []
+    for name, body in bodies.items():
+        encoded = name.encode()
+        parts.append(_SECTION.pack(len(encoded), len(body)) + encoded + body)
+    payload = b"".join(parts)
+
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(bodies), zlib.crc32(payload), len(payload),
+        time.time() if created is None else created,
+    )
+    return header + payload
+
+
+def read_snapshot(path: str) -> Optional[Dict[str, bytes]]:
+    """
+    Section bodies of a valid snapshot file, or None if it is missing,
+    from another format version, truncated or corrupt.
+    """
+
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _HEADER.size:
+            logger.warning(f"[SNAPSHOT] {path} is truncated; starting cold.")
+            return None
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            magic, version, count, crc, length, created = _HEADER.unpack_from(view, 0)
+
+            if magic != MAGIC or version != FORMAT_VERSION:
+                logger.warning(f"[SNAPSHOT] {path} has format {magic!r} v{version}; starting cold.")
+                return None
+            if _HEADER.size + length != size:
+                logger.warning(f"[SNAPSHOT] {path} is {size} bytes, header says {_HEADER.size + length}; starting cold.")
+                return None
+
+            # Checksum straight off the mapping, before decoding anything.
+            with memoryview(view) as data:
+                payload = data[_HEADER.size:]
+                valid = zlib.crc32(payload) == crc
+                payload.release()
+            if not valid:
+                logger.warning(f"[SNAPSHOT] {path} failed its checksum; starting cold.")
+                return None
+
+            bodies = {}
+            offset = _HEADER.size
+            for _ in range(count):
+                name_length, body_length = _SECTION.unpack_from(view, offset)
+                offset += _SECTION.size
+                name = view[offset:offset + name_length].decode()
+                offset += name_length
+                bodies[name] = view[offset:offset + body_length]
+                offset += body_length
+
+    metrics.gauge("snapshot.age_s").set(round(time.time() - created, 1))
+    return bodies
+
+
+def _write_file(path: str, data: bytes):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# =========================================================
+# ================== SNAPSHOT AND RESTORE =================
+# =========================================================
+
+def take_snapshot() -> Dict[str, bytes]:
+    with _lock:
+        sections = dict(_sections)
+        unclaimed = dict(_unclaimed)
+
+    # Sections nobody registered in this process (e.g. the CLI never
+    # imports the agent) are carried over instead of being dropped.
+    bodies = unclaimed
+    for name, section in sections.items():
+        try:
+            bodies[name] = section.dump()
+        except Exception:
+            logger.error(f"[SNAPSHOT] Could not dump section {name}.", exc_info=True)
+    return bodies
+
+
+def restore_snapshot(path: str) -> int:
+    """
+    Load every section of the snapshot at `path` that is registered, keep
+    the rest for later registrations, then refresh in the background.
+    Returns the number of sections loaded.
+    """
+
+    started = time.perf_counter()
+    bodies = read_snapshot(path)
+    if not bodies:
+        return 0
+
+    with _lock:
+        pending = [(name, _sections[name], body) for name, body in bodies.items() if name in _sections]
+        _unclaimed.update({name: body for name, body in bodies.items() if name not in _sections})
+
+    loaded = [(name, section.refresh) for name, section, body in pending if _load_section(name, section, body)]
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    metrics.histogram("snapshot.restore_ms").observe(elapsed_ms)
+    logger.info(f"[SNAPSHOT] Restored {', '.join(name for name, _ in loaded) or 'nothing'} from {path} in {elapsed_ms:.1f}ms")
+
+    _refresh_later([(name, refresh) for name, refresh in loaded if refresh is not None])
+    return len(loaded)
+
+
+def _load_section(name: str, section: Section, body: bytes) -> bool:
+    try:
+        section.load(body)
+        return True
+    except Exception:
+        logger.error(f"[SNAPSHOT] Could not load section {name}; it stays cold.", exc_info=True)
+        return False
+
+
+def _refresh_later(refreshes: List):
+    if not refreshes:
+        return
+
+    def run():
+        for name, refresh in refreshes:
+            try:
+                refresh()
+            except Exception:
+                logger.warning(f"[SNAPSHOT] Background refresh of {name} failed.", exc_info=True)
+
+    threading.Thread(target=run, name="snapshot-refresh", daemon=True).start()
+
+
+class SnapshotWriter:
+    """
+    Writes a snapshot every `interval` seconds (skipped when nothing
+    changed since the last one) and once more on close().
+    """
+
+    def __init__(self, path: str, interval: float):
+        self.path = path
+        self.interval = interval
+        self._last_crc: Optional[int] = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+
+    def write(self) -> bool:
+        started = time.perf_counter()
+        bodies = take_snapshot()
+        if not bodies:
+            return False
+
+        data = encode_snapshot(bodies)
+        crc = zlib.crc32(data[_HEADER.size:])
+        if crc == self._last_crc:
+            return False
+
+        try:
+            _write_file(self.path, data)
+        except OSError as e:
+            logger.warning(f"[SNAPSHOT] Could not write {self.path}: {e}")
+            return False
+
+        self._last_crc = crc
+        metrics.counter("snapshot.writes").inc()
+        metrics.histogram("snapshot.write_ms").observe((time.perf_counter() - started) * 1000)
+        return True
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+    def close(self):
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._thread.join()
+        self.write()
+
+
+_writer: Optional[SnapshotWriter] = None
+_started = False
+_role = "main"
+
+
+def set_snapshot_role(role: str):
+    """
+    Name this process's snapshot file after `role`. Takes effect if
+    called before the first start_snapshots().
+    """
+
+    global _role
+    _role = role
+
+
+def snapshot_path(path: Optional[str] = None, role: Optional[str] = None) -> str:
+    """
+    File of `role` (default: this process's) for SNAPSHOT_FILE `path`.
+    """
+
+    root, ext = os.path.splitext(path or settings.SNAPSHOT_FILE)
+    return f"{root}.{role or _role}{ext}"
+
+
+def start_snapshots() -> Optional[SnapshotWriter]:
+    """
+    Restore this process's file (snapshot_path()) and start writing it
+    (once per process); None when SNAPSHOT_FILE is not set.
+    """
+
+    global _writer, _started
+
+    with _lock:
+        if _started or not settings.SNAPSHOT_FILE:
+            return _writer
+        _started = True
+
+    path = snapshot_path()
+    restore_snapshot(path)
+
+    _writer = SnapshotWriter(path, settings.SNAPSHOT_INTERVAL_S)
+    atexit.register(_writer.close)
+    return _writer
@@ -0,0 +1,311 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from bot.config import settings
+
+logger = logging.getLogger(__name__)
+
+# =========================================================
+# ======================== TRACING ========================
+# =========================================================
+# One trace per request (CLI command, Streamlit click, agent run), with
+# a span per step: graph nodes, LLM calls, OrderService, outbox and
+# exchange calls. The current span lives in a contextvar, so anything
+# called in the same thread (or a copied context) nests under it; across
+# processes and the graph the W3C traceparent string is passed along
+# (TradingState["trace_parent"], worker jobs). Log records carry the
+# trace id (bot/logging_config.py). Finished spans are exported as
+# OTLP/JSON to settings.TRACE_FILE when it is set.
+
+INTERNAL = 1
+SERVER = 2
+CLIENT = 3
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+_ids = random.Random()
+_listener = None
+
+
+class Span:
+    """
+    One timed operation. Times are epoch nanoseconds, as in OTLP.
+    """
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "kind",
+        "start_ns", "end_ns", "attributes", "status", "status_message", "events",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = "%016x" % _ids.getrandbits(64)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.status = STATUS_UNSET
+        self.status_message = ""
+        self.events: List[Tuple[int, str, Dict[str, Any]]] = []
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes):
+        self.events.append((time.time_ns(), name, attributes))
+
+    def record_exception(self, exc: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(exc).__name__}: {exc}"
+        self.add_event("exception", **{"exception.type": type(exc).__name__, "exception.message": str(exc)})
+
+    def end(self):
+        if self.end_ns:
+            return
+        self.end_ns = time.time_ns()
+
+        exporter = get_exporter()
+        if exporter is not None:
+            exporter.export(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        data = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status, "message": self.status_message} if self.status else {},
+        }
+        if self.parent_id:
+            data["parentSpanId"] = self.parent_id
+        if self.events:
+            data["events"] = [
+                {"timeUnixNano": str(at), "name": name, "attributes": _otlp_attributes(attrs)}
+                for at, name, attrs in self.events
+            ]
+        return data
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+# =========================================================
+# ====================== CONTEXT API ======================
+# =========================================================
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    (trace id, parent span id) from a W3C traceparent, or None if malformed.
+    """
+
+    if not value:
+        return None
+    parts = value.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+@contextmanager
+def span(name: str, parent: Union[None, str, Span] = None, kind: int = INTERNAL, **attributes) -> Iterator[Span]:
+    """
+    Start a span as a child of `parent` (a Span or traceparent string),
+    else of the current span, else as the root of a new trace. It is the
+    current span inside the block; an exception marks it as an error.
+    """
+
+    if parent is None:
+        parent = _current.get()
+
+    if isinstance(parent, Span):
+        context = (parent.trace_id, parent.span_id)
+    else:
+        context = parse_traceparent(parent)
+
+    if context is None:
+        context = ("%032x" % _ids.getrandbits(128), None)
+
+    current = Span(name, context[0], context[1], kind, attributes)
+    token = _current.set(current)
+
+    listener = _listener
+    if listener is not None:
+        listener.span_entered(current)
+
+    try:
+        yield current
+    except BaseException as e:
+        current.record_exception(e)
+        raise
+    finally:
+        if listener is not None:
+            listener.span_exited(current)
+        _current.reset(token)
+        current.end()
+
+
+def set_span_listener(listener):
+    """
+    Install an object whose span_entered(span) / span_exited(span) run on
+    the span's thread around every span (the sampling profiler uses this
+    to know which threads work for which trace). None removes it.
+    """
+
+    global _listener
+    _listener = listener
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current.get()
+    return current.trace_id if current is not None else None
+
+
+def current_traceparent() -> Optional[str]:
+    current = _current.get()
+    return current.traceparent if current is not None else None
+
+
+# =========================================================
+# ======================= EXPORTER ========================
+# =========================================================
+
+class FileSpanExporter:
+    """
+    Appends finished spans to a file as OTLP/JSON ExportTraceServiceRequest
+    lines, one per batch, in the layout an OpenTelemetry collector's file
+    exporter writes. A background thread flushes every `interval` seconds
+    or once `max_batch` spans are queued; ending a span only queues it.
+    """
+
+    def __init__(self, path: str, service_name: str = "trading-bot", interval: float = 1.0, max_batch: int = 512):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.interval = interval
+        self.max_batch = max_batch
+        self.resource = {"attributes": _otlp_attributes({
+            "service.name": service_name,
+            "process.pid": os.getpid(),
+        })}
+
+        self._cond = threading.Condition()
+        self._queue: List[Span] = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, finished: Span):
+        with self._cond:
+            self._queue.append(finished)
+            if len(self._queue) >= self.max_batch:
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or len(self._queue) >= self.max_batch, self.interval)
+                batch, self._queue = self._queue, []
+                closed = self._closed
+
+            if batch:
+                self._write(batch)
+            if closed:
+                return
+
+    def _write(self, batch: List[Span]):
+        request = {
+            "resourceSpans": [{
+                "resource": self.resource,
+                "scopeSpans": [{"scope": {"name": "bot.tracing"}, "spans": [s.to_otlp() for s in batch]}],
+            }]
+        }
+        line = (json.dumps(request, separators=(",", ":")) + "\n").encode()
+
+        # One O_APPEND write per batch, so processes sharing the file
+        # (agent workers) don't interleave within a line.
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.warning(f"[TRACING] Could not export {len(batch)} spans: {e}")
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+
+_exporter: Optional[FileSpanExporter] = None
+_exporter_ready = False
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> Optional[FileSpanExporter]:
+    """
+    Process-wide exporter for settings.TRACE_FILE; None when unset.
+    """
+
+    global _exporter, _exporter_ready
+
+    if not _exporter_ready:
+        with _exporter_lock:
+            if not _exporter_ready:
+                if settings.TRACE_FILE:
+                    _exporter = FileSpanExporter(settings.TRACE_FILE, service_name=settings.TRACE_SERVICE_NAME)
+                    atexit.register(_exporter.close)
+                _exporter_ready = True
+
+    return _exporter
+
+
+def set_exporter(exporter: Optional[FileSpanExporter]):
+    """
+    Replace the process-wide exporter (None disables export).
+    """
+
+    global _exporter, _exporter_ready
+
+    with _exporter_lock:
+        _exporter = exporter
+        _exporter_ready = True
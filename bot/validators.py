@@ -1,6 +1,8 @@
 import re
 from typing import Optional
 
+from bot.models import Order
+
 
 class ValidationError(Exception):
     """Custom validation exception."""
@@ -38,6 +40,42 @@ def validate_price(order_type: str, price: Optional[float]):
             raise ValidationError("Price must be greater than 0.")
 
 
+def validate_algo(
+    algo: Optional[str],
+    price: Optional[float] = None,
+    duration_seconds: Optional[float] = None,
+    slices: Optional[int] = None,
+    clip_size: Optional[float] = None,
+    grid_levels: Optional[int] = None,
+    grid_step: Optional[float] = None,
+):
+    if algo is None:
+        return
+
+    algo = algo.upper()
+
+    if algo not in ["TWAP", "ICEBERG", "GRID"]:
+        raise ValidationError("Execution algorithm must be TWAP, ICEBERG or GRID.")
+
+    if algo == "TWAP":
+        if not duration_seconds or duration_seconds <= 0:
+            raise ValidationError("TWAP orders require a positive duration.")
+        if not slices or slices < 1:
+            raise ValidationError("TWAP orders require at least one slice.")
+
+    if algo in ["ICEBERG", "GRID"] and (price is None or price <= 0):
+        raise ValidationError(f"{algo} orders require a limit price.")
+
+    if algo == "ICEBERG" and (not clip_size or clip_size <= 0):
+        raise ValidationError("ICEBERG orders require a positive clip size.")
+
+    if algo == "GRID":
+        if not grid_levels or grid_levels < 1:
+            raise ValidationError("GRID orders require at least one level.")
+        if not grid_step or grid_step <= 0:
+            raise ValidationError("GRID orders require a positive price step.")
+
+
 def validate_order(
     symbol: str,
     side: str,
@@ -56,4 +94,25 @@ def validate_order(
     validate_quantity(quantity)
     validate_price(order_type, price)
 
+    return True
+
+
+def validate_order_model(order: Order):
+    """
+    Validate an Order, including its execution-algorithm parameters.
+    """
+
+    validate_order(order.symbol, order.side, order.order_type, order.quantity, order.price)
+
+    if order.algo is not None:
+        validate_algo(
+            algo=order.algo.algo,
+            price=order.price,
+            duration_seconds=order.algo.duration_seconds,
+            slices=order.algo.slices,
+            clip_size=order.algo.clip_size,
+            grid_levels=order.algo.grid_levels,
+            grid_step=order.algo.grid_step,
+        )
+
     return True
\ No newline at end of file
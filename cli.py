@@ -1,15 +1,358 @@
 import argparse
+import asyncio
+import json
 import logging
+import os
+import sys
 
+from bot.accounts import get_router
 from bot.logging_config import setup_logging
+from bot.models import Order, ExecutionReport
 from bot.orders import OrderService
-from bot.validators import validate_order, ValidationError
+from bot.validators import validate_order_model, ValidationError
+from bot.config import settings
+from bot.bulk import BulkOrderRunner, read_orders
+from bot.algos import AlgoEngine, SimulatedClock, parent_order_for
+from bot.mock_client import MockBinanceFuturesClient
+from bot.snapshot import set_snapshot_role
+from bot.tracing import span
+from bot.replay import ReplayEngine, iter_market_events, load_order_schedule
+
+
+def bulk_main(argv):
+    """
+    cli.py bulk <orders.csv|orders.jsonl|-> [--output results.jsonl]
+    """
+
+    logger = logging.getLogger(__name__)
+
+    parser = argparse.ArgumentParser(
+        prog="cli.py bulk",
+        description="Submit many orders from a CSV/JSONL file (use - for stdin)"
+    )
+
+    parser.add_argument("input", help="Orders file (.csv / .jsonl) or - for stdin")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Input format (default: detect)")
+    parser.add_argument("--output", default="bulk_results.jsonl", help="Results file (JSONL, appended)")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="Maximum concurrent submissions")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore and overwrite previous results")
+    parser.add_argument(
+        "--retry-errors", action="store_true",
+        help="On resume, also resubmit rows that ended in ERROR (they may have reached the exchange)"
+    )
+    parser.add_argument("--account", help="Account for rows without an `account` column (default: DEFAULT_ACCOUNT)")
+
+    args = parser.parse_args(argv)
+
+    runner = BulkOrderRunner(
+        output_path=args.output,
+        max_in_flight=args.max_in_flight,
+        account=args.account,
+    )
+
+    try:
+        stats = runner.run(
+            read_orders(args.input, args.format), resume=not args.no_resume, retry_errors=args.retry_errors,
+        )
+    except KeyboardInterrupt:
+        print(f" Interrupted. Re-run the same command to resume from {args.output}")
+        logger.warning("Bulk run interrupted.")
+        return
+
+    print("\n========== BULK SUMMARY ==========")
+    print(f"Submitted : {stats['submitted']}")
+    print(f"Executed  : {stats['executed']}")
+    print(f"Rejected  : {stats['rejected']}")
+    print(f"Failed    : {stats['failed']}")
+    print(f"Skipped   : {stats['skipped']} (already in {args.output})")
+    print("==================================\n")
+
+
+def algo_main(argv):
+    """
+    cli.py algo --algo TWAP|ICEBERG|GRID --symbol ... --side ... --quantity ...
+    """
+
+    logger = logging.getLogger(__name__)
+
+    parser = argparse.ArgumentParser(
+        prog="cli.py algo",
+        description="Slice a parent order with TWAP, iceberg or grid execution"
+    )
+
+    parser.add_argument("--algo", required=True, choices=["TWAP", "ICEBERG", "GRID"], help="Execution algorithm")
+    parser.add_argument("--symbol", required=True, help="Trading symbol (e.g., BTCUSDT)")
+    parser.add_argument("--side", required=True, choices=["BUY", "SELL"], help="Order side")
+    # Kept as text so the exact decimal typed is what gets sliced.
+    parser.add_argument("--quantity", required=True, help="Parent order quantity")
+    parser.add_argument("--price", help="Limit price (required for ICEBERG/GRID)")
+    parser.add_argument("--duration", type=float, default=300.0, help="TWAP window in seconds")
+    parser.add_argument("--slices", type=int, default=10, help="TWAP slice count")
+    parser.add_argument("--clip-size", type=float, help="ICEBERG visible clip size")
+    parser.add_argument("--interval", type=float, default=5.0, help="ICEBERG seconds between clips")
+    parser.add_argument("--levels", type=int, default=5, help="GRID level count")
+    parser.add_argument("--step", type=float, help="GRID price step between levels")
+    parser.add_argument("--account", help="Account to route child orders to (default: DEFAULT_ACCOUNT)")
+    parser.add_argument(
+        "--simulate", action="store_true",
+        help="Replay the schedule on a simulated clock against a zero-latency mock"
+    )
+
+    args = parser.parse_args(argv)
+
+    try:
+        order = Order.create(
+            args.symbol,
+            args.side,
+            "LIMIT" if args.price is not None else "MARKET",
+            args.quantity,
+            args.price,
+            algo=args.algo,
+            duration_seconds=args.duration,
+            slices=args.slices,
+            clip_size=args.clip_size,
+            grid_levels=args.levels,
+            grid_step=args.step,
+        )
+        parent = parent_order_for(
+            order,
+            # A simulated run stays on its zero-latency mock.
+            account=None if args.simulate else args.account,
+            interval=args.interval,
+        )
+        if args.account:
+            get_router().get(args.account)
+    except (ValidationError, ValueError) as ve:
+        print(f" Validation Error: {ve}")
+        logger.warning(f"Validation error: {ve}")
+        return
+
+    if args.simulate:
+        engine = AlgoEngine(
+            service=OrderService(client=MockBinanceFuturesClient(latency=0)),
+            clock=SimulatedClock(),
+        )
+    else:
+        engine = AlgoEngine()
+
+    print(f"\n Running {parent.algo} {parent.parent_id} with {len(parent.children)} child orders...")
+
+    try:
+        asyncio.run(engine.run(parent))
+    except KeyboardInterrupt:
+        print(" Interrupted. Children not yet released were not sent.")
+        logger.warning(f"Algo run interrupted: {parent.parent_id}")
+
+    summary = parent.to_dict(include_children=False)
+
+    print("\n========== ALGO SUMMARY ==========")
+    print(f"Parent ID    : {summary['parentId']}")
+    print(f"Status       : {summary['status']}")
+    print(f"Children     : {summary['children']}")
+    print(f"Sent Qty     : {summary['sentQty']}")
+    print(f"Executed Qty : {summary['executedQty']}")
+    print(f"Avg Price    : {summary['avgPrice']}")
+    print("==================================\n")
+
+
+def replay_main(argv):
+    """
+    cli.py replay --data trades.csv.gz --symbol BTCUSDT [--orders orders.jsonl]
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="cli.py replay",
+        description="Replay recorded market data and scheduled orders through a simulated exchange"
+    )
+
+    parser.add_argument("--data", required=True, help="Trades/klines CSV (.csv, .gz, .bz2, .xz)")
+    parser.add_argument("--kind", choices=["trades", "klines"], default="trades", help="Market data layout")
+    parser.add_argument("--symbol", required=True, help="Symbol the data file belongs to")
+    parser.add_argument("--orders", help="JSONL of structured orders with a `ts` (epoch ms) field")
+    parser.add_argument("--fee-rate", type=float, default=0.0, help="Fee per fill as a fraction of notional")
+    parser.add_argument("--fills", help="Write every fill to this JSONL file")
+
+    args = parser.parse_args(argv)
+
+    engine = ReplayEngine(symbol=args.symbol, fee_rate=args.fee_rate)
+    orders = load_order_schedule(args.orders) if args.orders else []
+
+    report = engine.run(iter_market_events(args.data, args.kind), orders)
+
+    if args.fills:
+        with open(args.fills, "w") as f:
+            for fill in engine.client.fills:
+                f.write(json.dumps(fill) + "\n")
+
+    print("\n========== REPLAY REPORT ==========")
+    for key, value in report.items():
+        print(f"{key:<18}: {value}")
+    print("===================================\n")
+
+
+def cancel_main(argv):
+    """
+    cli.py cancel --symbol BTCUSDT (--order-id ID [--order-id ID ...] | --all [--side BUY|SELL])
+    """
+
+    logger = logging.getLogger(__name__)
+
+    parser = argparse.ArgumentParser(
+        prog="cli.py cancel",
+        description="Cancel resting orders by id (batched), or all orders on a symbol"
+    )
+
+    parser.add_argument("--symbol", required=True, help="Trading symbol (e.g., BTCUSDT)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--order-id", type=int, action="append", help="Order id to cancel (repeatable)")
+    target.add_argument("--all", action="store_true", help="Cancel every open order on the symbol")
+    parser.add_argument("--side", choices=["BUY", "SELL"], help="With --all: only cancel this side")
+    parser.add_argument("--account", help="Account the orders belong to (default: DEFAULT_ACCOUNT)")
+
+    args = parser.parse_args(argv)
+    symbol = args.symbol.upper()
+
+    try:
+        service = get_router().service(args.account)
+
+        if args.all:
+            reports = service.cancel_all_orders(symbol, args.side)
+            not_found = []
+        else:
+            results = service.cancel_orders(symbol, args.order_id)
+            reports = [report for report in results if report is not None]
+            not_found = [order_id for order_id, report in zip(args.order_id, results) if report is None]
+
+        print("\n========== CANCEL SUMMARY ==========")
+        print(f"Symbol     : {symbol}")
+        print(f"Cancelled  : {len(reports)}")
+        for report in map(ExecutionReport.to_dict, reports):
+            print(f"  {report['orderId']} {report['side']} {report['origQty']} @ {report['price']}")
+        if not_found:
+            print(f"Not found  : {', '.join(map(str, not_found))}")
+        print("====================================\n")
+
+        logger.info(f"CLI cancel done | {symbol} | {len(reports)} cancelled")
+
+    except (ValidationError, ValueError) as ve:
+        print(f" Validation Error: {ve}")
+        logger.warning(f"Validation error: {ve}")
+
+    except Exception as e:
+        print(f" Execution Error: {e}")
+        logger.error("Cancel failed.", exc_info=True)
+
+
+def modify_main(argv):
+    """
+    cli.py modify --symbol BTCUSDT --order-id ID --side BUY --quantity 0.02 --price 44000
+    """
+
+    logger = logging.getLogger(__name__)
+
+    parser = argparse.ArgumentParser(
+        prog="cli.py modify",
+        description="Amend the quantity and price of a resting LIMIT order"
+    )
+
+    parser.add_argument("--symbol", required=True, help="Trading symbol (e.g., BTCUSDT)")
+    parser.add_argument("--order-id", required=True, type=int, help="Order id to amend")
+    parser.add_argument("--side", required=True, choices=["BUY", "SELL"], help="Side of the resting order")
+    parser.add_argument("--quantity", required=True, help="New quantity")
+    parser.add_argument("--price", required=True, help="New price")
+    parser.add_argument("--account", help="Account the order belongs to (default: DEFAULT_ACCOUNT)")
+
+    args = parser.parse_args(argv)
+
+    try:
+        service = get_router().service(args.account)
+        result = service.modify_order(args.symbol.upper(), args.order_id, args.side, args.quantity, args.price).to_dict()
+
+        print(" Order Modified Successfully")
+        print("\n========== ORDER RESPONSE ==========")
+        print(f"Order ID     : {result['orderId']}")
+        print(f"Status       : {result['status']}")
+        print(f"Quantity     : {result['origQty']}")
+        print(f"Price        : {result['price']}")
+        print("=====================================\n")
+
+        logger.info("CLI order modified successfully.")
+
+    except (ValidationError, ValueError) as ve:
+        print(f" Validation Error: {ve}")
+        logger.warning(f"Validation error: {ve}")
+
+    except Exception as e:
+        print(f" Execution Error: {e}")
+        logger.error("Modify failed.", exc_info=True)
+
+
+def serve_main(argv):
+    """
+    cli.py serve [--host 127.0.0.1] [--port 8080]
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="cli.py serve",
+        description="Run the headless HTTP/JSON API for orders and the agent"
+    )
+
+    parser.add_argument("--host", help="Address to bind (default: API_HOST)")
+    parser.add_argument("--port", type=int, help="Port to listen on (default: API_PORT; 0 → any free port)")
+
+    args = parser.parse_args(argv)
+
+    # Imported here: the API pulls in the agent graph, which the other
+    # commands don't need.
+    from api.server import serve
+
+    serve(args.host, args.port)
+
+
+COMMANDS = {
+    "bulk": bulk_main,
+    "algo": algo_main,
+    "replay": replay_main,
+    "cancel": cancel_main,
+    "modify": modify_main,
+    "serve": serve_main,
+}
+
+
+def _profile_flag(argv):
+    """
+    Strip a global `--profile` / `--profile=window` flag from `argv` and
+    turn the sampling profiler on (bot/profiling.py) for this process and
+    the worker processes it starts.
+    """
+
+    rest = []
+    for arg in argv:
+        if arg == "--profile" or arg.startswith("--profile="):
+            mode = arg.partition("=")[2] or "request"
+            settings.PROFILE_MODE = os.environ["PROFILE_MODE"] = mode
+        else:
+            rest.append(arg)
+    return rest
 
 
 def main():
     setup_logging()
+    set_snapshot_role("cli")
     logger = logging.getLogger(__name__)
 
+    sys.argv[1:] = _profile_flag(sys.argv[1:])
+
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        # A trace per request, not one for the server's lifetime.
+        return COMMANDS["serve"](sys.argv[2:])
+
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        # One trace per command; bulk and algo orders run on pool threads
+        # and get a trace of their own each.
+        with span(f"cli.{sys.argv[1]}"):
+            return COMMANDS[sys.argv[1]](sys.argv[2:])
+
     parser = argparse.ArgumentParser(
         description="Binance Futures Trading CLI"
     )
@@ -17,8 +360,10 @@ def main():
     parser.add_argument("--symbol", required=True, help="Trading symbol (e.g., BTCUSDT)")
     parser.add_argument("--side", required=True, choices=["BUY", "SELL"], help="Order side")
     parser.add_argument("--type", required=True, choices=["MARKET", "LIMIT"], help="Order type")
-    parser.add_argument("--quantity", required=True, type=float, help="Order quantity")
-    parser.add_argument("--price", type=float, help="Price (required for LIMIT)")
+    # Kept as text so the exact decimal typed is what gets sent.
+    parser.add_argument("--quantity", required=True, help="Order quantity")
+    parser.add_argument("--price", help="Price (required for LIMIT)")
+    parser.add_argument("--account", help="Account to route the order to (default: DEFAULT_ACCOUNT)")
 
     args = parser.parse_args()
 
@@ -34,38 +379,31 @@ def main():
     print(f"Order Type : {order_type}")
     print(f"Quantity   : {quantity}")
     print(f"Price      : {price}")
+    print(f"Account    : {args.account or get_router().default_account}")
     print("===================================\n")
 
     try:
-        validate_order(
-            symbol=symbol,
-            side=side,
-            order_type=order_type,
-            quantity=quantity,
-            price=price,
-        )
+        with span("cli.order") as current:
+            order = Order.create(symbol, side, order_type, quantity, price)
 
-        service = OrderService()
+            validate_order_model(order)
 
-        result = service.execute_order(
-            symbol=symbol,
-            side=side,
-            order_type=order_type,
-            quantity=quantity,
-            price=price,
-        )
+            service = get_router().service(args.account)
+
+            result = service.submit(order).to_dict()
 
         print(" Order Executed Successfully")
         print("\n========== ORDER RESPONSE ==========")
-        print(f"Order ID     : {result.get('orderId')}")
-        print(f"Status       : {result.get('status')}")
-        print(f"Executed Qty : {result.get('executedQty')}")
-        print(f"Avg Price    : {result.get('price')}")
+        print(f"Order ID     : {result['orderId']}")
+        print(f"Status       : {result['status']}")
+        print(f"Executed Qty : {result['executedQty']}")
+        print(f"Avg Price    : {result['price']}")
+        print(f"Trace ID     : {current.trace_id}")
         print("=====================================\n")
 
         logger.info("CLI order executed successfully.")
 
-    except ValidationError as ve:
+    except (ValidationError, ValueError) as ve:
         print(f" Validation Error: {ve}")
         logger.warning(f"Validation error: {ve}")
 
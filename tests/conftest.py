@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Offline provider: bot.config refuses to load without GOOGLE_API_KEY otherwise.
+os.environ.setdefault("LLM_PROVIDER", "local")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
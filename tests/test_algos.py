@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+from bot.accounts import AccountRouter, get_router, set_router
+from bot.algos import AlgoEngine, RealClock, SimulatedClock, build_parent_order
+from bot.mock_client import MockBinanceFuturesClient, MockOrderBook
+from bot.orders import OrderService
+
+
+class BrokenClock(RealClock):
+    async def sleep_until(self, deadline):
+        raise RuntimeError("clock failed")
+
+
+def test_background_parent_that_crashes_is_marked_failed():
+    engine = AlgoEngine(OrderService(client=MockBinanceFuturesClient(latency=0)), clock=BrokenClock())
+    parent = build_parent_order(
+        algo="TWAP", symbol="BTCUSDT", side="BUY",
+        quantity=10, duration_seconds=1, slices=2,
+    )
+
+    engine.submit(parent)
+
+    deadline = time.monotonic() + 5
+    while parent.status != "FAILED" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert parent.status == "FAILED"
+    assert parent.finished_at is not None
+
+
+def _zero_latency_clients(name, config):
+    book = MockOrderBook()
+    return lambda: MockBinanceFuturesClient(latency=0, book=book)
+
+
+def test_children_go_through_the_account_router():
+    set_router(AccountRouter(client_factory=_zero_latency_clients, rate_limit=0))
+    try:
+        parent = build_parent_order(
+            algo="TWAP", symbol="BTCUSDT", side="BUY",
+            quantity=10, duration_seconds=1, slices=2,
+        )
+
+        asyncio.run(AlgoEngine(clock=SimulatedClock()).run(parent))
+
+        assert parent.status == "DONE"
+        # The default account's book and position state saw both children.
+        account = get_router().get(None)
+        assert account.client.book.positions["BTCUSDT"] == 10
+        assert account.service.account_state.position("BTCUSDT") == 10
+    finally:
+        set_router(None)
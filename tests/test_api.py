@@ -0,0 +1,21 @@
+import pytest
+
+from api.server import HTTPError, Request, parse_order
+
+
+def _request(body: bytes) -> Request:
+    return Request("POST", "/orders", "HTTP/1.1", {}, body, True)
+
+
+def test_json_numbers_are_exact():
+    payload = _request(b'{"symbol": "BTCUSDT", "side": "BUY", "type": "LIMIT", "quantity": 0.015, "price": 45000.5}').payload()
+    _, order = parse_order(payload)
+    assert (order.quantity, order.price) == (15, 450005)
+
+
+@pytest.mark.parametrize("quantity", [b"0.0015", b'"0.0015"', b"1e-4", b"true"])
+def test_inexact_or_invalid_quantities_are_rejected(quantity):
+    payload = _request(b'{"symbol": "BTCUSDT", "side": "BUY", "type": "MARKET", "quantity": %s}' % quantity).payload()
+    with pytest.raises(HTTPError) as e:
+        parse_order(payload)
+    assert e.value.status == 400
@@ -0,0 +1,92 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from bot.batch_validators import (
+    ERROR_MESSAGES, PRICE_DECIMALS, QUANTITY_DECIMALS, error_messages, validate_orders_batch,
+)
+from bot.fixedpoint import precision_for, to_units
+from bot.validators import ValidationError, validate_order
+
+# Edge cases of each column, mixed at random below.
+_SYMBOLS = [
+    "BTCUSDT", "ethusdt", "BnbUsdt", "", "BTC USDT", "BTC-USDT", "BTCUSDT\n", "BTCUSDT\n\n", "\nBTCUSDT",
+    "ß", "straße", "BTCÜSDT", "١٢٣", "1000PEPEUSDT", "BTCUSDT ", None,
+]
+_SIDES = ["BUY", "SELL", "buy", "Sell", "", "HOLD", "BUY ", None]
+_TYPES = ["MARKET", "LIMIT", "limit", "Market", "", "STOP", "LIMIT\n", None]
+_NUMBERS = [
+    0.01, 1.0, 45000.5, 0.0, -0.0, -1.0, 1e-12, math.nan, math.inf, -math.inf, None,
+    # Fit some symbols' decimals but not others'.
+    0.015, 0.0155, 0.1 + 0.2, 45000.55, 3000.125, 1e-8, 123456789.12345678,
+]
+
+
+def _scalar(symbol, side, order_type, quantity, price):
+    try:
+        validate_order(symbol, side, order_type, quantity, price)
+    except ValidationError as e:
+        return str(e)
+    except (AttributeError, TypeError):
+        # None in a string column: the batch path reports it as invalid
+        # rather than raising.
+        return "raises"
+
+    # Order.create()'s decimal-places check (finite values only; NaN and
+    # infinities are left to the checks above, as in validate_order()).
+    precision = precision_for(symbol.strip().upper())
+    for value, decimals, code in ((quantity, precision.quantity, QUANTITY_DECIMALS),
+                                  (price, precision.price, PRICE_DECIMALS)):
+        if value is not None and math.isfinite(value):
+            try:
+                to_units(value, decimals)
+            except ValueError:
+                return ERROR_MESSAGES[code]
+    return None
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_matches_scalar_validators(seed):
+    rng = random.Random(seed)
+    n = 5000
+
+    columns = (
+        [rng.choice(_SYMBOLS) for _ in range(n)],
+        [rng.choice(_SIDES) for _ in range(n)],
+        [rng.choice(_TYPES) for _ in range(n)],
+        [rng.choice(_NUMBERS) for _ in range(n)],
+        [rng.choice(_NUMBERS) for _ in range(n)],
+    )
+
+    valid, codes = validate_orders_batch(*columns)
+    messages = error_messages(codes)
+
+    mismatches = []
+    for row, message, ok in zip(zip(*columns), messages, valid):
+        expected = _scalar(*row)
+        if expected == "raises":
+            assert not ok, row
+            continue
+        if (expected, expected is None) != (message, bool(ok)):
+            mismatches.append((row, expected, message))
+
+    assert not mismatches, mismatches[:5]
+
+
+def test_numpy_columns_match_list_columns():
+    rng = np.random.default_rng(0)
+    n = 10000
+
+    symbols = rng.choice(np.array(["BTCUSDT", "ethusdt", "", "BTC-USDT"], dtype=object), n)
+    sides = rng.choice(np.array(["BUY", "sell", "HOLD"], dtype=object), n)
+    types = rng.choice(np.array(["MARKET", "LIMIT", "STOP"], dtype=object), n)
+    quantities = rng.choice([0.01, 0.0, -1.0, np.nan], n)
+    prices = rng.choice([45000.5, 0.0, -1.0, np.nan], n)
+
+    from_arrays = validate_orders_batch(symbols, sides, types, quantities, prices)
+    from_lists = validate_orders_batch(*(column.tolist() for column in (symbols, sides, types, quantities, prices)))
+
+    assert (from_arrays[0] == from_lists[0]).all()
+    assert (from_arrays[1] == from_lists[1]).all()
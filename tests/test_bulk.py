@@ -0,0 +1,84 @@
+import json
+
+from bot.bulk import BulkOrderRunner, load_completed, read_orders
+from bot.mock_client import MockBinanceFuturesClient
+from bot.orders import OrderService
+
+_GOOD = '{"id": "a", "symbol": "BTCUSDT", "side": "BUY", "type": "MARKET", "quantity": "0.01"}\n'
+
+
+def _run(tmp_path, lines, resume=True, retry_errors=False):
+    source = tmp_path / "orders.jsonl"
+    source.write_text("".join(lines))
+    output = tmp_path / "results.jsonl"
+
+    service = OrderService(client=MockBinanceFuturesClient(latency=0), account="test")
+    stats = BulkOrderRunner(str(output), max_in_flight=2, service=service).run(
+        read_orders(str(source)), resume=resume, retry_errors=retry_errors,
+    )
+    return stats, output
+
+
+def _records(output):
+    return {record["row_id"]: record for record in map(json.loads, output.read_text().splitlines())}
+
+
+def test_bad_jsonl_lines_are_rejected_not_fatal(tmp_path):
+    stats, output = _run(tmp_path, [
+        _GOOD,
+        '{"symbol": "BTCUSDT", "side": \n',
+        '[1, 2, 3]\n',
+        '"text"\n',
+        _GOOD.replace('"a"', '"e"'),
+    ])
+
+    assert stats["executed"] == 2
+    assert stats["rejected"] == 3
+
+    records = _records(output)
+    assert records["a"]["status"] == records["e"]["status"] == "OK"
+    assert records["2"]["status"] == "REJECTED" and "Invalid JSON" in records["2"]["error"]
+    assert records["3"]["status"] == records["4"]["status"] == "REJECTED"
+
+
+def test_resume_drops_torn_line_and_retries_its_row(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"row_id": "a", "status": "OK"}\n{"row_id": "b", "sta')
+
+    stats, output = _run(tmp_path, [_GOOD, _GOOD.replace('"a"', '"b"')])
+
+    assert stats == {"submitted": 1, "executed": 1, "rejected": 0, "failed": 0, "skipped": 1}
+    lines = output.read_text().splitlines()
+    assert len(lines) == 2 and all(json.loads(line) for line in lines)
+    assert load_completed(str(output)) == {"a", "b"}
+
+
+def test_load_completed_skips_non_record_lines(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"row_id": "a"}\n12\n[]\n{"other": 1}\nnot json\n')
+
+    assert load_completed(str(output)) == {"a"}
+
+
+def test_retry_errors_resubmits_only_error_rows(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text(
+        '{"row_id": "a", "status": "OK"}\n'
+        '{"row_id": "b", "status": "ERROR", "error": "timeout"}\n'
+        '{"row_id": "c", "status": "REJECTED"}\n'
+    )
+    rows = [_GOOD.replace('"a"', f'"{row_id}"') for row_id in "abc"]
+
+    stats, _ = _run(tmp_path, rows)
+    assert stats["submitted"] == 0 and stats["skipped"] == 3
+
+    stats, output = _run(tmp_path, rows, retry_errors=True)
+    assert stats["executed"] == 1 and stats["skipped"] == 2
+    assert load_completed(str(output), retry_errors=True) == {"a", "b", "c"}
+
+
+def test_falsy_ids_are_kept(tmp_path):
+    source = tmp_path / "orders.jsonl"
+    source.write_text(_GOOD.replace('"a"', "0") + _GOOD.replace('"a"', '""') + _GOOD.replace('"id": "a", ', ""))
+
+    assert [row_id for row_id, _ in read_orders(str(source))] == ["0", "", "3"]
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from agent.coalescer import ParseCoalescer
+from agent.llm import LocalProvider, set_llm
+from agent.prompts import BATCH_MARKER, PARSE_MARKER
+from agent.resilience import LLMUnavailable
+
+
+class RecordingProvider(LocalProvider):
+    def __init__(self, garble_batches=False):
+        super().__init__(latency_ms=20)
+        self.prompts = []
+        self.garble_batches = garble_batches
+
+    def _generate(self, prompt):
+        self.prompts.append(prompt)
+        if self.garble_batches and BATCH_MARKER in prompt:
+            return "not json", None, None
+        return super()._generate(prompt)
+
+
+@pytest.fixture
+def provider(request):
+    provider = RecordingProvider(**getattr(request, "param", {}))
+    set_llm(provider)
+    yield provider
+    set_llm(None)
+
+
+def _parse_concurrently(coalescer, calls):
+    results, errors = {}, {}
+
+    def run(instruction, account):
+        try:
+            results[(account, instruction)] = coalescer.parse(instruction, account)
+        except Exception as e:
+            errors[(account, instruction)] = e
+
+    threads = [threading.Thread(target=run, args=call) for call in calls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+_CALLS = [
+    ("Buy 0.01 BTC at market", "alice"),
+    ("Sell 0.5 ETH at 3000", "alice"),
+    ("Buy 1 BNB at market", "bob"),
+    ("Sell 0.002 BTC at 45000", "bob"),
+]
+
+
+def test_batches_never_mix_accounts(provider):
+    coalescer = ParseCoalescer(window_ms=100, max_batch=8, cache_size=100)
+
+    results, errors = _parse_concurrently(coalescer, _CALLS)
+
+    assert not errors and len(results) == 4
+    assert len(provider.prompts) == 2  # still batched: one call per account
+    for prompt in provider.prompts:
+        # Only the instructions, not the prompt's own examples.
+        prompt = prompt.rsplit(BATCH_MARKER if BATCH_MARKER in prompt else PARSE_MARKER, 1)[1]
+        has_alice = "0.01 BTC" in prompt or "0.5 ETH" in prompt
+        has_bob = "1 BNB" in prompt or "0.002 BTC" in prompt
+        assert not (has_alice and has_bob)
+
+
+def test_results_are_not_shared_across_accounts(provider):
+    coalescer = ParseCoalescer(cache_size=100)
+
+    coalescer.parse("Buy 0.01 BTC at market", "alice")
+    coalescer.parse("Buy 0.01 BTC at market", "bob")
+    coalescer.parse("Buy 0.01 BTC at market", "alice")
+
+    assert len(provider.prompts) == 2
+
+
+@pytest.mark.parametrize("provider", [{"garble_batches": True}], indirect=True)
+def test_failed_batch_falls_back_without_per_instruction_calls(provider):
+    coalescer = ParseCoalescer(window_ms=100, max_batch=2)
+
+    results, errors = _parse_concurrently(coalescer, _CALLS[:2])
+
+    assert not results
+    assert len(errors) == 2 and all(isinstance(e, LLMUnavailable) for e in errors.values())
+    assert len(provider.prompts) == 1
@@ -0,0 +1,39 @@
+from bot.config import current_settings, pin_settings, settings, subscribe
+
+
+def test_assignment_publishes_a_new_snapshot(monkeypatch):
+    seen = []
+    subscribe(lambda old, new, changed: seen.append((old.version, new.version, changed)))
+
+    with pin_settings() as pinned:
+        before = pinned.RISK_MAX_NOTIONAL
+        monkeypatch.setattr(settings, "RISK_MAX_NOTIONAL", before + 1)
+
+        # A reader holding a snapshot never sees it change.
+        assert pinned.RISK_MAX_NOTIONAL == before
+        assert settings.RISK_MAX_NOTIONAL == before
+
+    latest = current_settings()
+    assert latest is not pinned
+    assert latest.version == pinned.version + 1
+    assert latest.RISK_MAX_NOTIONAL == before + 1
+    assert seen[-1] == (pinned.version, latest.version, {"RISK_MAX_NOTIONAL"})
+
+
+def test_assigning_the_same_value_is_a_no_op():
+    version = current_settings().version
+    settings.LOG_LEVEL = settings.LOG_LEVEL
+    assert current_settings().version == version
+
+
+def test_snapshots_do_not_share_mutable_values(monkeypatch):
+    with pin_settings() as pinned:
+        accounts = dict(pinned.ACCOUNTS)
+        monkeypatch.setattr(settings, "RISK_MAX_NOTIONAL", pinned.RISK_MAX_NOTIONAL + 1)
+
+    latest = current_settings()
+    latest.ACCOUNTS["extra"] = {"api_key": None, "secret_key": None}
+    try:
+        assert pinned.ACCOUNTS == accounts
+    finally:
+        del latest.ACCOUNTS["extra"]
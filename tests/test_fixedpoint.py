@@ -0,0 +1,131 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from bot.algos import build_parent_order, parent_order_for
+from bot.fixedpoint import format_units, round_units, to_units
+from bot.models import Order
+
+
+@pytest.mark.parametrize("text, decimals, units", [
+    ("0.01", 3, 10),
+    ("0.015", 3, 15),
+    ("45000", 1, 450000),
+    ("45000.5", 1, 450005),
+    ("0.010", 3, 10),
+    ("1e-2", 3, 10),
+    ("-0.5", 2, -50),
+    ("123456789.12345678", 8, 12345678912345678),
+])
+def test_float_str_decimal_parity(text, decimals, units):
+    assert to_units(text, decimals) == units
+    assert to_units(Decimal(text), decimals) == units
+    assert to_units(float(text), decimals) == units
+
+
+@pytest.mark.parametrize("value", ["0.0015", Decimal("0.0015"), 0.0015, 0.1 + 0.2, "1e-4", 1.0005])
+def test_excess_decimals_raise(value):
+    with pytest.raises(ValueError):
+        to_units(value, 3)
+
+
+@pytest.mark.parametrize("value", ["abc", "", "nan", "٣", "0.٣", "１", float("nan"), float("inf"), None, [1]])
+def test_invalid_numbers_raise(value):
+    with pytest.raises(ValueError):
+        to_units(value, 3)
+
+
+def test_ints_scale():
+    assert to_units(2, 3) == 2000
+    assert to_units(0, 8) == 0
+
+
+def test_format_round_trip():
+    rng = random.Random(7)
+    for _ in range(20000):
+        decimals = rng.randint(0, 10)
+        units = rng.randint(-10 ** 12, 10 ** 12)
+        text = format_units(units, decimals)
+        assert "e" not in text.lower()
+        assert to_units(text, decimals) == units
+        assert to_units(Decimal(text), decimals) == units
+        if abs(units) < 2 ** 52:
+            assert to_units(float(text), decimals) == units
+
+
+def test_round_units_rounds_half_even():
+    assert round_units(42000.15, 1) == 420002
+    assert round_units(42000.25, 1) == 420002
+    assert round_units("0.0015", 3) == 2
+
+
+def test_order_create_rejects_float_excess():
+    with pytest.raises(ValueError):
+        Order.create("BTCUSDT", "BUY", "MARKET", 0.0015)
+    assert Order.create("BTCUSDT", "BUY", "MARKET", 0.015).quantity == 15
+
+
+@pytest.mark.parametrize("algo, fields", [
+    ("TWAP", {"duration_seconds": 60, "slices": 7}),
+    ("ICEBERG", {"clip_size": 0.003}),
+    ("GRID", {"grid_levels": 6, "grid_step": 12.5}),
+])
+def test_algo_children_stay_exact(algo, fields):
+    price = None if algo == "TWAP" else "45000.5"
+    order = Order.create("BTCUSDT", "BUY", "LIMIT" if price else "MARKET", "0.1", price, algo=algo, **fields)
+    parent = parent_order_for(order)
+
+    assert parent.quantity == 100
+    assert all(type(child.quantity) is int and child.quantity > 0 for child in parent.children)
+    assert sum(child.quantity for child in parent.children) == parent.quantity
+    assert parent.to_dict()["quantity"] == "0.1"
+
+
+def test_algo_params_beyond_precision_are_rejected():
+    from bot.validators import ValidationError
+
+    order = Order.create("BTCUSDT", "BUY", "LIMIT", "0.1", "45000", algo="ICEBERG", clip_size=0.0015)
+    with pytest.raises(ValidationError):
+        parent_order_for(order)
+
+
+def test_grid_prices_step_in_units():
+    parent = build_parent_order("GRID", "ETHUSDT", "SELL", 1000, price=280000, grid_levels=3, grid_step=1050)
+    assert [child.price for child in parent.children] == [280000, 281050, 282100]
+
+
+def test_symbol_precision_follows_settings(monkeypatch):
+    from bot.config import settings
+    from bot.fixedpoint import DEFAULT_PRECISION, SymbolPrecision, precision_for
+
+    monkeypatch.setattr(settings, "SYMBOL_PRECISION", "BTCUSDT:4:2,NEWUSDT:1:3")
+    assert precision_for("BTCUSDT") == SymbolPrecision(4, 2)
+    assert precision_for("NEWUSDT") == SymbolPrecision(1, 3)
+
+    monkeypatch.setattr(settings, "SYMBOL_PRECISION", "")
+    assert precision_for("BTCUSDT") == SymbolPrecision(3, 1)
+    assert precision_for("NEWUSDT") == DEFAULT_PRECISION
+
+
+def test_orders_keep_their_precision_across_a_reload(monkeypatch):
+    from bot.config import settings
+    from bot.mock_client import MockBinanceFuturesClient
+    from bot.orders import OrderService
+    from bot.validators import ValidationError
+
+    service = OrderService(client=MockBinanceFuturesClient(latency=0), aggregates=None, account="test")
+    fits = Order.create("BTCUSDT", "BUY", "MARKET", "0.015")
+    too_fine = Order.create("BTCUSDT", "BUY", "LIMIT", "0.01", "45000.5")
+    filled = service.submit(Order.create("BTCUSDT", "BUY", "MARKET", "0.02"))
+
+    monkeypatch.setattr(settings, "SYMBOL_PRECISION", "BTCUSDT:4:0")
+
+    assert fits.quantity_text == "0.015"
+    assert filled.to_dict()["executedQty"] == "0.02"
+
+    report = service.submit(fits)
+    assert report.to_dict()["executedQty"] == "0.015"
+    assert service.account_state.position("BTCUSDT") == 350  # 0.035 at 4 decimals
+    with pytest.raises(ValidationError):
+        service.submit(too_fine)
@@ -0,0 +1,63 @@
+import pytest
+
+from bot.client import BinanceFuturesClient
+from bot.fixedpoint import to_units
+from bot.mock_client import MockBinanceFuturesClient
+from bot.orders import OrderService
+from bot.validators import ValidationError
+
+
+def _units(text):
+    return to_units(text, 3)  # BTCUSDT quantity decimals
+
+
+def _service():
+    client = MockBinanceFuturesClient(latency=0)
+    service = OrderService(client=client, aggregates=None, account="test")
+    return client, service
+
+
+def test_close_position_is_reduce_only():
+    client, service = _service()
+    service.execute_order("BTCUSDT", "BUY", "MARKET", "0.010")
+
+    report = service.close_position("BTCUSDT")
+
+    assert report.side == "SELL"
+    assert report.executed_qty == _units("0.010")
+    assert client.book.positions["BTCUSDT"] == 0
+
+
+def test_close_from_stale_cache_never_flips_the_position():
+    client, service = _service()
+    service.execute_order("BTCUSDT", "BUY", "MARKET", "0.010")
+    service.account_state.position("BTCUSDT")  # cache the 0.010 long
+
+    # Reduced elsewhere (another session, liquidation) since the cache was filled.
+    client.book.positions["BTCUSDT"] = _units("0.004")
+
+    report = service.close_position("BTCUSDT")
+
+    assert report.executed_qty == _units("0.004")
+    assert client.book.positions["BTCUSDT"] == 0
+
+
+def test_close_after_position_gone_is_rejected():
+    client, service = _service()
+    service.execute_order("BTCUSDT", "BUY", "MARKET", "0.010")
+    service.account_state.position("BTCUSDT")
+
+    client.book.positions["BTCUSDT"] = 0
+
+    with pytest.raises(ValidationError):
+        service.close_position("BTCUSDT")
+    assert client.book.positions["BTCUSDT"] == 0
+
+
+def test_reduce_only_is_signed_into_the_order_params():
+    client = BinanceFuturesClient("key", "secret", "https://testnet.binancefuture.com")
+
+    params = client.order_params("BTCUSDT", "SELL", "MARKET", _units("0.010"), reduce_only=True)
+
+    assert params["reduceOnly"] == "true"
+    assert "reduceOnly" not in client.order_params("BTCUSDT", "SELL", "MARKET", _units("0.010"))
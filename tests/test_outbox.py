@@ -0,0 +1,83 @@
+import errno
+import os
+import time
+
+import pytest
+
+import bot.outbox as outbox_module
+from bot.models import ExecutionReport, Order
+from bot.outbox import INTENT, OrderOutbox, OutboxError, pending_intents, read_segment
+
+_ORDER = Order.create("BTCUSDT", "BUY", "MARKET", "0.01")
+
+
+def _report(order_id=1):
+    return ExecutionReport(order_id=order_id, symbol="BTCUSDT", side="BUY", order_type="MARKET", status="FILLED")
+
+
+def test_failed_compaction_fails_later_intents_instead_of_hanging(tmp_path, monkeypatch):
+    outbox = OrderOutbox(str(tmp_path), max_bytes=10)
+
+    def no_space(path):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(outbox_module, "_create_locked", no_space)
+
+    outbox.intent(_ORDER)  # durable before the compaction that fails
+    with pytest.raises(OutboxError):
+        outbox.intent(_ORDER)
+    outbox.close()
+
+
+def test_compaction_keeps_only_open_intents(tmp_path):
+    outbox = OrderOutbox(str(tmp_path), max_bytes=10)
+
+    done = outbox.intent(_ORDER)
+    outbox.ack(done, _report())
+    failed = outbox.intent(_ORDER)
+    outbox.fail(failed, "rejected")
+    first = outbox.intent(_ORDER)
+    second = outbox.intent(_ORDER)
+
+    records = read_segment(outbox.path)
+    assert all(record["op"] == INTENT for record in records)
+    assert {record["cid"] for record in records} == {first, second}
+    outbox.close()
+
+
+class _Client:
+    def __init__(self, sent):
+        self.sent = sent
+
+    def get_order(self, symbol, client_order_id):
+        if client_order_id == "unreachable":
+            raise ConnectionError("timeout")
+        return _report() if client_order_id in self.sent else None
+
+
+class _Router:
+    def __init__(self, sent):
+        self.client = _Client(sent)
+
+    def get(self, account):
+        return self
+
+
+def test_recovery_settles_a_dead_process_segment(tmp_path):
+    dead = OrderOutbox(str(tmp_path))
+    sent = dead.intent(_ORDER, account="alice")
+    dead.intent(_ORDER, account="alice")  # never reached the exchange
+    acked = dead.intent(_ORDER)
+    dead.ack(acked, _report())
+    dead._append({"op": INTENT, "cid": "unreachable", "account": None, "order": _ORDER.to_dict(), "ts": 0})
+    dead.close()  # open intents: the segment stays, as after a crash
+    time.sleep(0.01)  # segment names are per pid and millisecond
+
+    outbox = OrderOutbox(str(tmp_path))
+    counts = outbox.recover(_Router({sent}))
+
+    assert counts == {"segments": 1, "acked": 1, "missing": 1, "unresolved": 1}
+    assert not os.path.exists(dead.path)
+    # The intent that couldn't be looked up is carried for the next start.
+    assert set(pending_intents(read_segment(outbox.path))) == {"unreachable"}
+    outbox.close()
@@ -0,0 +1,93 @@
+import threading
+
+from bot.models import ExecutionReport
+from bot.positions import AccountState
+
+
+class Exchange:
+    """
+    Account endpoint whose answer can be held while orders are sent.
+    """
+
+    def __init__(self, positions):
+        self.positions = dict(positions)
+        self.during_load = None
+
+    def load(self):
+        answer = {
+            "assets": [{"asset": "USDT", "walletBalance": "1000"}],
+            "positions": [{"symbol": symbol, "positionAmt": amount} for symbol, amount in self.positions.items()],
+        }
+        if self.during_load is not None:
+            self.during_load()
+        return answer
+
+
+def _fill(order_id, symbol, qty):
+    return ExecutionReport(order_id=order_id, symbol=symbol, side="BUY", order_type="MARKET",
+                           status="FILLED", orig_qty=qty, executed_qty=qty)
+
+
+def test_refresh_racing_a_send_keeps_only_that_symbol_local():
+    exchange = Exchange({"BTCUSDT": "0.010", "ETHUSDT": "1.000"})
+    state = AccountState(exchange.load, max_age=60)
+    assert state.position("BTCUSDT") == 10
+
+    exchange.positions = {"BTCUSDT": "0.010", "ETHUSDT": "2.000"}  # changed elsewhere
+
+    def send_btc():
+        # Filled on the exchange after the answer was taken.
+        with state.sending("BTCUSDT"):
+            state.apply_fill(_fill(1, "BTCUSDT", 5), placed=True)
+
+    exchange.during_load = send_btc
+    state.refresh()
+
+    assert state.age() is not None  # still fresh: no reload on the next read
+    assert state.position("BTCUSDT") == 15  # local: the raced fill counted once
+    assert state.position("ETHUSDT") == 2000  # loaded
+
+
+def test_refreshes_stay_fresh_under_continuous_sends():
+    exchange = Exchange({"BTCUSDT": "0"})
+    state = AccountState(exchange.load, max_age=60)
+    state.refresh()
+
+    stop = threading.Event()
+    fills = []
+
+    def trade():
+        order_id = 0
+        while not stop.is_set():
+            order_id += 1
+            with state.sending("BTCUSDT"):
+                exchange.positions["BTCUSDT"] = str(order_id / 1000)
+                state.apply_fill(_fill(order_id, "BTCUSDT", 1), placed=True)
+            fills.append(order_id)
+
+    trader = threading.Thread(target=trade)
+    trader.start()
+    try:
+        for _ in range(20):
+            state.refresh()
+            assert state.age() is not None
+    finally:
+        stop.set()
+        trader.join()
+
+    assert state.position("BTCUSDT") == len(fills)
+
+
+def test_race_before_the_first_load_reloads_that_symbol():
+    exchange = Exchange({"BTCUSDT": "0.010"})
+    state = AccountState(exchange.load, max_age=60)
+
+    def send_btc():
+        with state.sending("BTCUSDT"):
+            exchange.positions["BTCUSDT"] = "0.015"
+
+    exchange.during_load = send_btc
+    state.refresh()
+    exchange.during_load = None
+
+    assert state.position("BTCUSDT") == 15  # dirty: reloaded on read
@@ -0,0 +1,40 @@
+import pytest
+
+from agent import resilience
+from agent.resilience import CircuitBreaker, LLMUnavailable, guarded_invoke
+
+
+@pytest.fixture
+def half_open(monkeypatch):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    monkeypatch.setattr(resilience, "_breaker", breaker)
+    return breaker
+
+
+def test_provider_build_failure_leaves_the_probe_slot(half_open, monkeypatch):
+    def broken():
+        raise RuntimeError("no credentials")
+
+    monkeypatch.setattr(resilience, "get_llm", broken)
+
+    with pytest.raises(LLMUnavailable):
+        guarded_invoke("parse", "Buy 0.01 BTC", budget_ms=100)
+
+    # The next call may still probe.
+    assert half_open.allow()
+
+
+def test_unexpected_error_after_allow_releases_the_probe(half_open, monkeypatch):
+    class Closed:
+        def submit(self, *args):
+            raise RuntimeError("cannot schedule new futures after shutdown")
+
+    monkeypatch.setattr(resilience, "_executor", Closed())
+
+    with pytest.raises(RuntimeError):
+        guarded_invoke("parse", "Buy 0.01 BTC", budget_ms=100)
+
+    assert half_open.state == CircuitBreaker.OPEN
+    assert half_open.allow()  # reset_timeout=0: a new probe is let through
@@ -0,0 +1,43 @@
+import pytest
+
+from bot.config import settings
+from bot.mock_client import MockBinanceFuturesClient
+from bot.orders import OrderService
+from bot.risk import RiskError
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "RISK_MAX_QTY", "BTCUSDT:0.05")
+    monkeypatch.setattr(settings, "RISK_MAX_NOTIONAL", 1000.0)
+    return OrderService(client=MockBinanceFuturesClient(latency=0), account="test")
+
+
+def test_service_enforces_quantity_cap(service):
+    with pytest.raises(RiskError):
+        service.execute_order("BTCUSDT", "BUY", "MARKET", "0.06")
+    assert service.client.round_trips == 0
+
+
+def test_service_enforces_notional_cap_on_limit_orders(service):
+    with pytest.raises(RiskError):
+        service.execute_order("BTCUSDT", "BUY", "LIMIT", "0.05", "45000")
+    with pytest.raises(RiskError):
+        service.modify_order("BTCUSDT", 1, "BUY", "0.05", "45000")
+    assert service.client.round_trips == 0
+
+
+def test_notional_cap_is_limit_only(service):
+    # No reference price: a MARKET order is bounded by RISK_MAX_QTY alone.
+    report = service.execute_order("BTCUSDT", "BUY", "MARKET", "0.05")
+    assert report.status == "FILLED"
+
+
+def test_closes_pass_the_limits(service, monkeypatch):
+    service.execute_order("BTCUSDT", "BUY", "MARKET", "0.05")
+    service.execute_order("BTCUSDT", "BUY", "MARKET", "0.05")
+    monkeypatch.setattr(settings, "RISK_MAX_QTY", "BTCUSDT:0.01")
+
+    report = service.close_position("BTCUSDT")
+
+    assert report.executed_qty == 100  # 0.1 BTC at 3 decimals
@@ -0,0 +1,59 @@
+import pytest
+
+from bot.accounts import AccountRouter, set_router
+from bot.config import settings
+from bot.mock_client import MockBinanceFuturesClient, MockOrderBook
+from bot.snapshot import encode_snapshot, read_snapshot, restore_snapshot, snapshot_path, take_snapshot, _write_file
+
+
+def _zero_latency_clients(name, config):
+    book = MockOrderBook()
+    return lambda: MockBinanceFuturesClient(latency=0, book=book)
+
+
+@pytest.fixture
+def router():
+    router = AccountRouter(client_factory=_zero_latency_clients, rate_limit=0)
+    set_router(router)
+    yield router
+    set_router(None)
+
+
+def _book(router):
+    return router.get(None).client.book
+
+
+def test_books_round_trip_with_their_decimals(router, tmp_path, monkeypatch):
+    service = router.service()
+    resting = service.execute_order("BTCUSDT", "BUY", "LIMIT", "0.01", "40000.5")
+    service.execute_order("BTCUSDT", "BUY", "MARKET", "0.025")
+
+    path = str(tmp_path / "snapshot.bin")
+    _write_file(path, encode_snapshot(take_snapshot()))
+
+    # Restart into a process whose BTCUSDT precision has changed since.
+    monkeypatch.setattr(settings, "SYMBOL_PRECISION", "BTCUSDT:4:2")
+    restarted = AccountRouter(client_factory=_zero_latency_clients, rate_limit=0)
+    set_router(restarted)
+    assert restore_snapshot(path) >= 1
+
+    book = _book(restarted)
+    restored = book.orders[resting.order_id]
+    assert restored == resting
+    assert restored.to_dict() == resting.to_dict()  # still 0.01 @ 40000.5
+    assert book.position_text("BTCUSDT") == "0.025"
+    assert restarted.service().account_state.position("BTCUSDT") == 250  # 0.025 at 4 decimals
+
+
+def test_other_format_versions_start_cold(tmp_path):
+    path = tmp_path / "snapshot.bin"
+    data = bytearray(encode_snapshot({"books": b"{}"}))
+    data[8] ^= 0xFF  # format version
+    path.write_bytes(bytes(data))
+
+    assert read_snapshot(str(path)) is None
+
+
+def test_each_role_has_its_own_file():
+    assert snapshot_path("state/snapshot.bin", "worker-1") == "state/snapshot.worker-1.bin"
+    assert snapshot_path("state/snapshot.bin", "cli") != snapshot_path("state/snapshot.bin", "ui")
@@ -0,0 +1,77 @@
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from agent.workers import DONE, FAILED, RUNNING, WorkerPool
+from benchmarks.bench_workers import _install_stubs
+
+
+def _wait_for(predicate, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="needs SIGKILL")
+def test_killed_worker_fails_its_job_and_is_replaced():
+    # A slow stub LLM keeps the first job RUNNING long enough to kill its worker.
+    with WorkerPool(workers=1, initializer=_install_stubs, initargs=(1500,)) as pool:
+        assert pool.wait_ready(60)
+
+        doomed = pool.submit("Buy 0.01 BTC at market")
+        queued = pool.submit("Sell 0.5 ETH at 3000")
+        assert _wait_for(lambda: pool.status(doomed)["status"] == RUNNING)
+
+        os.kill(pool.status(doomed)["worker"], signal.SIGKILL)
+
+        job = pool.result(doomed, timeout=30)
+        assert job["status"] == FAILED
+        assert "exited" in job["error"]
+
+        # The queued job runs on the replacement worker.
+        assert pool.result(queued, timeout=60)["status"] == DONE
+        assert pool.stats()["alive"] == 1
+        assert pool.stats()["restarts"] == 1
+
+
+def test_run_times_out_instead_of_hanging():
+    with WorkerPool(workers=1, initializer=_install_stubs, initargs=(1500,)) as pool:
+        with pytest.raises(TimeoutError):
+            pool.run("Buy 0.01 BTC at market", timeout=0.1)
+
+
+def test_worker_routers_share_the_account_rate_limit():
+    from bot.accounts import AccountRouter, set_rate_share
+
+    workers, rate, burst, window = 4, 40.0, 4, 0.5
+    set_rate_share(workers)
+    try:
+        # One router per worker process, as each worker builds its own.
+        limiters = [AccountRouter(rate_limit=rate, rate_burst=burst).get(None).client.limiter
+                    for _ in range(workers)]
+    finally:
+        set_rate_share(1)
+
+    sent = []
+    end = time.monotonic() + window
+
+    def hammer(limiter):
+        while True:
+            limiter.acquire()
+            if time.monotonic() >= end:
+                return
+            sent.append(1)
+
+    threads = [threading.Thread(target=hammer, args=(limiter,)) for limiter in limiters]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(sent) <= rate * window + burst + 2
@@ -1,17 +1,36 @@
+import time
+
+# Taken before any other import so the footer covers the whole rerun.
+_rerun_started = time.perf_counter()
+
 import streamlit as st
-import logging
 
-from bot.logging_config import setup_logging
-from bot.orders import OrderService
-from agent.graph import run_agent
+from bot.models import as_dict
 from bot.validators import ValidationError
+from bot.config import settings
+from bot.tracing import span
+from agent.graph import run_agent
+from agent.workers import get_pool
+from ui.resources import (
+    get_graph,
+    get_order_service,
+    init_logging,
+    init_session,
+    log_tail,
+    record_order,
+    render_dashboard,
+    render_history,
+    render_rerun_footer,
+    warm_resources,
+)
 
 # -------------------------------------------------------
 # Setup
 # -------------------------------------------------------
+# Heavy objects come from st.cache_resource (ui/resources.py), so a
+# rerun only re-renders; per-user history lives in st.session_state.
 
-setup_logging()
-logger = logging.getLogger(__name__)
+logger = init_logging()
 
 st.set_page_config(
     page_title="Agentic Trading System",
@@ -93,6 +112,11 @@ div.stAlert {
 </style>
 """, unsafe_allow_html=True)
 
+if init_session():
+    # Resources are shared by all sessions; touching them once per
+    # session keeps the first click from paying for their construction.
+    warm_resources()
+
 # -------------------------------------------------------
 # Sidebar Layout
 # -------------------------------------------------------
@@ -120,7 +144,7 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-tab1, tab2 = st.tabs(["🧾 Trade", "📜 Execution Logs"])
+tab1, tab2, tab3 = st.tabs(["🧾 Trade", "📈 Dashboard", "📜 Execution Logs"])
 
 # =======================================================
 # ======================= TRADE TAB ======================
@@ -147,28 +171,37 @@ with tab1:
 
         if st.button("🚀 Execute Order"):
 
-            try:
-                service = OrderService()
+            instruction = f"{side} {quantity} {symbol} {order_type}" + (f" @ {price}" if price else "")
 
-                with st.spinner("Executing trade..."):
-                    result = service.execute_order(
-                        symbol=symbol,
-                        side=side,
-                        order_type=order_type,
-                        quantity=quantity,
-                        price=price,
-                    )
+            # One trace per click: its id is shown and tags every log line.
+            with span("ui.manual_order") as trace:
+                try:
+                    service = get_order_service()
 
-                st.success("Order Executed Successfully")
+                    with st.spinner("Executing trade..."):
+                        result = service.execute_order(
+                            symbol=symbol,
+                            side=side,
+                            order_type=order_type,
+                            quantity=quantity,
+                            price=price,
+                        )
 
-                st.markdown("### 📊 Execution Result")
-                st.json(result)
+                    st.success("Order Executed Successfully")
 
-            except ValidationError as ve:
-                st.error(f"Validation Error: {ve}")
+                    st.markdown("### 📊 Execution Result")
+                    st.json(result.to_dict())
+                    st.caption(f"Trace ID: {trace.trace_id}")
 
-            except Exception as e:
-                st.error(f"Execution Error: {e}")
+                    record_order("Manual", instruction, None, result, trace_id=trace.trace_id)
+
+                except ValidationError as ve:
+                    st.error(f"Validation Error: {ve}")
+                    record_order("Manual", instruction, None, None, error=str(ve), trace_id=trace.trace_id)
+
+                except Exception as e:
+                    st.error(f"Execution Error: {e}")
+                    record_order("Manual", instruction, None, None, error=str(e), trace_id=trace.trace_id)
 
     # ===================================================
     # ============ NATURAL LANGUAGE MODE ================
@@ -188,8 +221,24 @@ with tab1:
             if not user_input.strip():
                 st.warning("Please enter a trading instruction.")
             else:
-                with st.spinner("Agent processing..."):
-                    result = run_agent(user_input)
+                with st.spinner("Agent processing..."), span("ui.agent") as trace:
+                    # Worker jobs carry the traceparent, so their spans join this trace.
+                    if settings.AGENT_WORKERS:
+                        try:
+                            result = get_pool().run(user_input, timeout=settings.AGENT_JOB_TIMEOUT_S)
+                        except (TimeoutError, RuntimeError) as e:
+                            # Crashed worker or job still queued: report it, don't hang the session.
+                            result = {
+                                "structured_order": None, "execution_result": None, "summary": None,
+                                "validation_error": f"Agent job failed: {e}",
+                            }
+                    else:
+                        result = run_agent(user_input, graph=get_graph())
+
+                record_order(
+                    "Agent", user_input, result["structured_order"], result["execution_result"],
+                    error=result["validation_error"], summary=result["summary"], trace_id=trace.trace_id,
+                )
 
                 if result["validation_error"]:
                     st.error(result["validation_error"])
@@ -200,30 +249,49 @@ with tab1:
 
                     with colA:
                         st.markdown("### 🧠 Parsed Order")
-                        st.json(result["structured_order"])
+                        st.json(as_dict(result["structured_order"]))
 
                     with colB:
                         st.markdown("### 📦 Execution Data")
-                        st.json(result["execution_result"])
+                        st.json(as_dict(result["execution_result"]))
 
                     st.markdown("### 📘 Agent Explanation")
                     st.info(result["summary"])
 
+                st.caption(f"Trace ID: {trace.trace_id}")
+
+    # ===================================================
+    # ================ SESSION HISTORY ==================
+    # ===================================================
+
+    render_history()
+
 # =======================================================
-# ======================= LOGS TAB ======================
+# ===================== DASHBOARD TAB ====================
 # =======================================================
 
 with tab2:
 
+    st.subheader("Orders & Fills")
+
+    render_dashboard()
+
+# =======================================================
+# ======================= LOGS TAB ======================
+# =======================================================
+
+with tab3:
+
     st.subheader("Application Logs")
 
     try:
-        with open("logs/trading.log", "r") as f:
-            logs = f.readlines()
+        st.text(log_tail(lines=80))
 
-        last_logs = logs[-80:]
+    except FileNotFoundError:
+        st.warning("Log file not found.")
 
-        st.text("".join(last_logs))
+# =======================================================
+# ======================== FOOTER =======================
+# =======================================================
 
-    except FileNotFoundError:
-        st.warning("Log file not found.")
\ No newline at end of file
+render_rerun_footer(_rerun_started)
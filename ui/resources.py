@@ -0,0 +1,227 @@
+import logging
+import os
+import time
+from typing import Any, Optional
+
+import streamlit as st
+
+from agent.graph import build_graph
+from agent.llm import get_llm
+from bot.accounts import get_router
+from bot.analytics import ResultsTail, order_aggregates
+from bot.config import settings, watch_settings
+from bot.logging_config import read_log_tail, setup_logging
+from bot.metrics import metrics
+from bot.models import as_dict
+from bot.orders import OrderService
+
+# =========================================================
+# ================== CACHED RESOURCES =====================
+# =========================================================
+# Streamlit re-executes the app script on every widget interaction.
+# These are built once per server process and shared by all sessions;
+# defining them here rather than in the script also means the cache
+# decorators run once instead of on every rerun.
+
+
+@st.cache_resource(show_spinner=False)
+def init_logging() -> logging.Logger:
+    setup_logging()
+    return logging.getLogger("app")
+
+
+@st.cache_resource(show_spinner=False)
+def get_graph():
+    return build_graph()
+
+
+def get_order_service() -> OrderService:
+    # The default account's pooled client and symbol cache. Not cached
+    # here: the router swaps in a new client when settings are reloaded.
+    return get_router().service()
+
+
+def get_llm_client():
+    # Likewise replaced on reload; get_llm() builds it once per provider.
+    return get_llm()
+
+
+@st.cache_resource(show_spinner=False)
+def get_config_watcher():
+    # Applies .env edits to the running server (bot/config.py).
+    return watch_settings()
+
+
+def warm_resources():
+    get_config_watcher()
+    get_graph()
+    get_order_service()
+    get_llm_client()
+
+
+# (path, mtime, size, lines) → text. A plain dict rather than
+# st.cache_data: the tail is small, and hashing plus pickling it on
+# every rerun would cost more than the read it saves.
+_tail_cache = {}
+
+
+def log_tail(lines: int = 80) -> str:
+    """
+    Last lines of the log file, re-read only when its mtime or size changed.
+    Raises FileNotFoundError like read_log_tail.
+    """
+
+    stat = os.stat(settings.LOG_FILE)
+    key = (settings.LOG_FILE, stat.st_mtime_ns, stat.st_size, lines)
+
+    text = _tail_cache.get(key)
+    if text is None:
+        text = read_log_tail(settings.LOG_FILE, lines=lines)
+        _tail_cache.clear()
+        _tail_cache[key] = text
+
+    return text
+
+
+# =========================================================
+# ==================== SESSION STATE ======================
+# =========================================================
+
+HISTORY_LIMIT = 200
+
+
+def init_session() -> bool:
+    """
+    Create this session's state on its first run. Returns True if new.
+    """
+
+    if "history" in st.session_state:
+        return False
+
+    st.session_state.history = []
+    st.session_state.rerun_ms = []
+    return True
+
+
+def record_order(mode: str, instruction: str, order: Any, result: Any,
+                 error: Optional[str] = None, summary: Optional[str] = None, trace_id: Optional[str] = None):
+    """
+    Append one submission to this session's history (newest last).
+    """
+
+    history = st.session_state.history
+    history.append({
+        "time": time.strftime("%H:%M:%S"),
+        "mode": mode,
+        "instruction": instruction,
+        "order": as_dict(order),
+        "result": as_dict(result),
+        "error": error,
+        "summary": summary,
+        "trace_id": trace_id,
+    })
+    del history[:-HISTORY_LIMIT]
+
+
+def render_history(limit: int = 20):
+    history = st.session_state.history
+    if not history:
+        return
+
+    with st.expander(f"🗂 Session History ({len(history)})"):
+        lines = []
+        for entry in reversed(history[-limit:]):
+            status = "❌ " + entry["error"] if entry["error"] else (entry["result"] or {}).get("status", "OK")
+            trace = f" · trace `{entry['trace_id']}`" if entry.get("trace_id") else ""
+            lines.append(f"- `{entry['time']}` **{entry['mode']}** · {entry['instruction']} → {status}{trace}")
+        # One element for the whole list keeps the rerun cost flat.
+        st.markdown("\n".join(lines))
+
+
+# =========================================================
+# ======================= DASHBOARD =======================
+# =========================================================
+# Everything here reads pre-aggregated totals and buckets from
+# bot/analytics.py; nothing scans order history on a rerun.
+
+@st.cache_resource(show_spinner=False)
+def get_results_tails():
+    return [ResultsTail(path, order_aggregates) for path in settings.DASHBOARD_RESULTS_FILES]
+
+
+def _fmt_ms(value: Optional[float]) -> str:
+    return "—" if value is None else f"{value:,.1f} ms"
+
+
+def _fmt_rate(value: Optional[float]) -> str:
+    return "—" if value is None else f"{value:.1%}"
+
+
+def render_dashboard():
+    import pandas as pd
+
+    for tail in get_results_tails():
+        tail.poll()
+
+    totals = order_aggregates.totals()
+    if not totals["orders"]:
+        st.info("No orders yet. Executions from this app and bulk result files show up here.")
+        return
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Orders", f"{totals['orders']:,}")
+    col2.metric("Fill Rate", _fmt_rate(totals["fill_rate"]))
+    col3.metric("Rejected / Failed", f"{totals['rejected']:,} / {totals['failed']:,}")
+    col4.metric("Latency p50", _fmt_ms(totals["p50_ms"]))
+    col5.metric("Latency p95", _fmt_ms(totals["p95_ms"]))
+
+    st.markdown("### 📊 Per Symbol")
+    st.dataframe(pd.DataFrame(order_aggregates.symbol_rows()).set_index("symbol"), use_container_width=True)
+
+    field = st.radio("Series", ["notional", "volume", "orders"], horizontal=True)
+
+    colA, colB = st.columns(2)
+
+    with colA:
+        st.markdown("### ⏱ Last 60 Active Minutes")
+        minutes, series = order_aggregates.minute_series(field, last=60)
+        if minutes:
+            st.bar_chart(pd.DataFrame(series, index=pd.to_datetime(minutes, unit="s")))
+
+    with colB:
+        st.markdown("### 📅 Daily")
+        days, series = order_aggregates.daily_series(field)
+        if days:
+            st.bar_chart(pd.DataFrame(series, index=days))
+
+    st.markdown("### 🚦 Execution Latency")
+    symbols = ["All"] + [row["symbol"] for row in order_aggregates.symbol_rows()]
+    choice = st.selectbox("Symbol", symbols)
+    buckets = order_aggregates.latency_buckets(None if choice == "All" else choice)
+    if buckets:
+        labels, counts = zip(*buckets)
+        # Keep bucket order on the x axis (labels would otherwise sort as text).
+        st.bar_chart(pd.DataFrame({"orders": counts}, index=pd.CategoricalIndex(labels, categories=labels)))
+    else:
+        st.caption("No latency samples yet.")
+
+
+# =========================================================
+# ==================== RERUN LATENCY ======================
+# =========================================================
+
+def render_rerun_footer(started: float, window: int = 50):
+    """
+    Footer with this rerun's duration (from `started`, a perf_counter()
+    taken at the top of the script) and the session's recent median.
+    """
+
+    rerun_ms = (time.perf_counter() - started) * 1000
+    samples = st.session_state.rerun_ms
+    samples.append(rerun_ms)
+    del samples[:-window]
+    metrics.histogram("ui.rerun_ms").observe(rerun_ms)
+
+    median_ms = sorted(samples)[len(samples) // 2]
+    st.markdown("---")
+    st.caption(f"⏱ Rerun {rerun_ms:.1f} ms · median {median_ms:.1f} ms over last {len(samples)} reruns")